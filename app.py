@@ -1,17 +1,27 @@
 import streamlit as st
-import google.generativeai as genai
 import os
 import io
+import hashlib
+import concurrent.futures
 import uuid
 import time
-from duckduckgo_search import DDGS
-import requests
 import re
 import datetime
-from PIL import Image
-import numpy as np
 import logging
 import json
+import blob_store
+import chat_search
+import chat_store
+import context_budget
+import i18n
+import image_pipeline
+import metrics
+import research
+import research_cache
+import streaming
+import summarizer
+# Heavy dependencies (Gemini SDK, web search, PIL, embeddings/numpy, requests) are imported
+# inside the functions that first need them, so a cold start only loads what the first render uses.
 
 # --- Global Variables and Settings ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,13 +35,13 @@ if not GOOGLE_API_KEY:
     logger.error("GOOGLE_API_KEY not found. Application stopped.")
     st.stop()
 
-try:
+@st.cache_resource
+def configure_gemini():
+    """Configures the Gemini SDK once per process (on first model use); reconfiguring on every rerun would drop its cached clients."""
+    import google.generativeai as genai
+
     genai.configure(api_key=GOOGLE_API_KEY)
     logger.info("Google API Key successfully configured.")
-except Exception as e:
-    logger.error(f"General API Configuration Error: {e}")
-    st.error(f"API key could not be configured: {e}. Please check your key.")
-    st.stop()
 
 # Gemini Model Parameters
 GLOBAL_MODEL_NAME = 'gemini-1.5-flash-latest'
@@ -40,6 +50,70 @@ GLOBAL_TOP_P = 0.95
 GLOBAL_TOP_K = 40
 GLOBAL_MAX_OUTPUT_TOKENS = 4096
 
+# Knowledge Base Tier Settings
+KB_TIER_LANGUAGES = {"TR"} # The local knowledge base only holds Turkish answers
+KB_WARMUP_ON_START = os.environ.get("KB_WARMUP", "0") == "1" # Preload the encoder when the server starts
+
+# Semantic Response Cache Settings (first-turn prompts only)
+RESPONSE_CACHE_THRESHOLD = 0.95 # Minimum cosine similarity for a cache hit
+RESPONSE_CACHE_TTL = 6 * 3600 # Seconds
+RESPONSE_CACHE_MAX_ENTRIES = 2000
+
+# Context Window Settings (tokens are counted with tiktoken and cached on each message)
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "8000")) # Max history + prompt tokens per request
+CONTEXT_TRIM_TARGET_TOKENS = int(CONTEXT_TOKEN_BUDGET * 0.75) # Trim below the budget so the window can grow again before the next trim
+CONTEXT_KEEP_FIRST_MESSAGES = 2 # The first turn is always kept
+
+# Rolling Summary Settings (messages trimmed out of the window are summarised in the background)
+SUMMARY_MODEL_NAME = 'gemini-1.5-flash-8b' # Cheaper model used only for summaries
+SUMMARY_MAX_WORDS = 250
+SUMMARY_MAX_OUTPUT_TOKENS = 512
+
+# Streaming Render Settings (the placeholder is redrawn at most this often)
+STREAM_RENDER_INTERVAL = 0.1 # Seconds between redraws
+STREAM_RENDER_MIN_CHARS = 400 # Redraw early once this many new characters are buffered
+
+# Research Settings (per-source deadlines in seconds; sources run concurrently)
+RESEARCH_SOURCE_TIMEOUTS = {"web": 6.0, "wiki": 4.0}
+RESEARCH_CACHE_TTL = 3600 # Seconds a cached result counts as fresh
+RESEARCH_CACHE_STALE_TTL = 7 * 24 * 3600 # Stale results are served instantly and refreshed in the background
+RESEARCH_CACHE_MAX_ENTRIES = 20000
+PASSAGE_TOP_K = 5 # Ranked passages kept per research query
+PASSAGE_TOKEN_BUDGET = 1500 # Max tokens across the kept passages
+PASSAGE_FETCH_DEADLINE = 6.0 # Seconds for all full-text page fetches together; late pages fall back to the search snippet
+GROUNDING_TIMEOUT = 20 # Seconds to wait for research + ranking before answering
+PREFETCH_RESEARCH = os.environ.get("PREFETCH_RESEARCH", "0") == "1" # Opt-in: start research in the background as soon as a message is sent
+PREFETCH_MIN_WORDS = 4 # Shorter messages (greetings, follow-ups) are not worth a search
+PREFETCH_MAX_CHARS = 300 # Longer messages (pasted text, code) are not search queries
+PREFETCH_MAX_WORKERS = 2 # Kept small so prefetches never starve foreground research
+PREFETCH_MAX_PENDING = 4 # New prefetches are dropped while this many are queued or running
+WIKIPEDIA_API_URL = os.environ.get("WIKIPEDIA_API_URL", "https://en.wikipedia.org/w/api.php") # Overridable for a local stand-in server
+
+# Chat Storage Settings (messages are persisted; session memory only holds a bounded window of each chat)
+CHAT_STORE_URL = os.environ.get("CHAT_STORE_URL", "") # Empty: local SQLite file; "postgresql://..." for a shared Postgres (e.g. Supabase)
+CHAT_MEMORY_MAX_MESSAGES = 200 # Recent messages kept in session memory per chat, besides the first turn
+CHAT_MEMORY_TRIM_BATCH = 50 # Older messages are dropped from memory in batches of this size
+CHAT_HISTORY_PAGE_SIZE = 50 # Older messages loaded per "show older messages" click
+CHAT_HISTORY_MAX_LOADED = 500 # Cap on older messages paged back into memory
+CHAT_SEARCH_RESULTS = 20 # Ranked message hits shown for a chat search
+SESSION_COOKIE_NAME = "hanogt_sid" # Browser cookie holding the id that keys a user's stored chats (never put in the URL)
+SESSION_COOKIE_MAX_AGE = 365 * 24 * 3600 # Seconds
+
+# Image Pipeline Settings (uploads are oriented, downsized and re-encoded once before use)
+IMAGE_MAX_SIDE = 1536 # Longest side in pixels sent to the model and kept in history
+IMAGE_FORMAT = "WEBP" # "WEBP" or "JPEG"
+IMAGE_QUALITY = 80
+BLOB_DECODED_CACHE_BYTES = 32 * 1024 * 1024 # Pixel memory budget for decoded chat images shared across sessions
+CHAT_IMAGE_DISPLAY_WIDTH = 768 # Chat images are rendered from a pre-sized variant of at most this width
+AVATAR_DISPLAY_SIZE = 160 # The user avatar is decoded once and kept at this size
+
+# Vision Answer Cache Settings (near-duplicate uploads are matched by perceptual hash)
+VISION_CACHE_MAX_DISTANCE = 6 # Max differing bits out of 64 for two images to count as the same
+VISION_CACHE_TTL = 24 * 3600 # Seconds
+VISION_CACHE_MAX_ENTRIES = 1000
+VISION_BATCH_CONCURRENCY = 4 # Max concurrent Gemini vision requests for a multi-image upload
+VISION_BATCH_TIMEOUT = 90 # Seconds to wait for a whole multi-image batch
+
 # --- Language Settings ---
 LANGUAGES = {
     "TR": {"name": "Türkçe", "emoji": "🇹🇷", "speech_code": "tr-TR"},
@@ -53,794 +127,30 @@ LANGUAGES = {
     "JP": {"name": "日本語", "emoji": "🇯🇵", "speech_code": "ja-JP"},
     "KR": {"name": "한국어", "emoji": "🇰🇷", "speech_code": "ko-KR"},
 }
+I18N_STRICT = os.environ.get("I18N_STRICT", "0") == "1" # Development: stop at startup if a get_text() key is missing from the catalogue
 
 # --- Helper Functions ---
 
 def get_text(key):
-    """Returns text based on the selected language."""
-    texts = {
-        "TR": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "Yeni Kişisel Yapay Zeka Asistanınız!",
-            "profile_title": "Size Nasıl Hitap Etmeliyim?",
-            "profile_name_label": "Adınız:",
-            "profile_upload_label": "Profil Resmi Yükle (isteğe bağlı)",
-            "profile_save_button": "Kaydet",
-            "profile_greeting": "Merhaba, {name}!",
-            "profile_edit_info": "Ayarlar & Kişiselleştirme bölümünden profilinizi düzenleyebilirsiniz.",
-            "ai_features_title": "Hanogt AI Özellikleri:",
-            "feature_general_chat": "Genel sohbet",
-            "feature_web_search": "Web araması (DuckDuckGo)",
-            "feature_wikipedia_search": "Wikipedia araması",
-            "feature_research_overview": "Araştırma (Web, Wikipedia)",
-            "feature_knowledge_base": "Bilgi tabanı yanıtları",
-            "feature_creative_text": "Yaratıcı metin üretimi",
-            "feature_image_generation": "Basit görsel oluşturma (örnek)",
-            "feature_feedback": "Geri bildirim mekanizması",
-            "settings_button": "⚙️ Ayarlar & Kişiselleştirme",
-            "about_button": "ℹ️ Hakkımızda",
-            "chat_input_placeholder": "Mesajınızı yazın veya bir komut girin: Örn: 'Merhaba', 'resim oluştur: bir kedi', 'web ara: Streamlit'...",
-            "generating_response": "Yanıt oluşturuluyor...",
-            "feedback_button": "👍",
-            "feedback_toast": "Geri bildirim için teşekkürler!",
-            "image_gen_title": "Oluşturulan Görsel",
-            "image_gen_input_label": "Oluşturmak istediğiniz görseli tanımlayın:", # No longer used in main chat, but kept for clarity if a dedicated image mode is re-added.
-            "image_gen_button": "Görsel Oluştur", # No longer used in main chat
-            "image_gen_warning_placeholder": "Görsel oluşturma özelliği şu anda bir placeholder'dır ve gerçek bir API'ye bağlı değildir.",
-            "image_gen_warning_prompt_missing": "Lütfen bir görsel açıklaması girin.",
-            "creative_studio_title": "Yaratıcı Stüdyo", # This mode is conceptually removed, but text keys remain.
-            "creative_studio_info": "Bu bölüm, yaratıcı metin üretimi gibi gelişmiş özellikler için tasarlanmıştır.",
-            "creative_studio_input_label": "Yaratıcı metin isteğinizi girin:",
-            "creative_studio_button": "Metin Oluştur",
-            "creative_studio_warning_prompt_missing": "Lütfen bir yaratıcı metin isteği girin.",
-            "research_title": "🔍 Araştırma Sonuçları",
-            "research_info": "Aşağıda son aramanızla ilgili hem web'den hem de Wikipedia'dan toplanan bilgiler bulunmaktadır.",
-            "research_button_text_on": "Araştırmayı Kapat",
-            "research_button_text_off": "Araştır",
-            "creative_text_button_text_on": "Yaratıcı Metni Kapat",
-            "creative_text_button_text_off": "Yaratıcı Metin Oluştur",
-            "creative_text_input_required": "Yaratıcı metin oluşturmak için önce bir mesaj girin.",
-            "settings_personalization_title": "Ayarlar & Kişiselleştirme",
-            "settings_name_change_label": "Adınızı Değiştir:",
-            "settings_avatar_change_label": "Profil Resmini Değiştir (isteğe bağlı)",
-            "settings_update_profile_button": "Profil Bilgilerini Güncelle",
-            "settings_profile_updated_toast": "Profil güncellendi!",
-            "settings_chat_management_title": "Sohbet Yönetimi",
-            "settings_clear_chat_button": "🧹 Aktif Sohbet Geçmişini Temizle",
-            "about_us_title": "ℹ️ Hakkımızda",
-            "about_us_text": "Hanogt AI HanStudios'un Sahibi Oğuz Han Guluzade Tarafından 2025 Yılında Yapılmıştır, Açık Kaynak Kodludur, Gemini Tarafından Eğitilmiştir Ve Bütün Telif Hakları Saklıdır.",
-            "footer_user": "Kullanıcı: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "AI: Aktif ({model_name}) | Log: Aktif",
-            "model_init_success": "Gemini Modeli başarıyla başlatıldı!",
-            "model_init_error": "Gemini modelini başlatırken bir hata oluştu: {error}. Lütfen API anahtarınızın doğru ve aktif olduğundan emin olun.",
-            "gemini_model_not_initialized": "Gemini modeli başlatılmamış. Lütfen API anahtarınızı kontrol edin.",
-            "image_load_error": "Görsel yüklenemedi: {error}",
-            "image_not_convertible": "Bu içerik konuşmaya çevrilemez (metin değil).",
-            "duckduckgo_error": "DuckDuckGo araması yapılırken hata oluştu: {error}",
-            "wikipedia_network_error": "Wikipedia araması yapılırken ağ hatası oluştu: {error}",
-            "wikipedia_json_error": "Wikipedia yanıtı çözümlenirken hata oluştu: {error}",
-            "wikipedia_general_error": "Wikipedia araması yapılırken genel bir hata oluştu: {error}",
-            "unexpected_response_error": "Yanıt alınırken beklenmeyen bir hata oluştu: {error}",
-            "source_error": "Kaynak: Hata ({error})",
-            "chat_cleared_toast": "Aktif sohbet temizlendi!",
-            "profile_image_load_error": "Profil resmi yüklenemedi: {error}",
-            "web_search_results": "Web'den Bilgiler:",
-            "web_search_no_results": "Web'de ilgili bilgi bulunamadı.",
-            "wikipedia_search_results": "Wikipedia'dan Bilgiler:",
-            "wikipedia_search_no_results": "Wikipedia'da ilgili bilgi bulunamadı.",
-            "image_generated_example": "'{prompt}' için bir görsel oluşturuldu (örnek).",
-            "image_upload_caption": "Yüklenen Görsel",
-            "image_processing_error": "Görsel işlenirken bir hata oluştu: {error}",
-            "image_vision_query": "Bu görselde ne görüyorsun?",
-            "gemini_response_error": "Yanıt alınırken beklenmeyen bir hata oluştu: {error}",
-            "creative_text_generated": "Yaratıcı Metin Oluşturuldu: {text}",
-            "research_input_required": "Araştırma yapmak için önce bir mesaj girin."
-        },
-        "EN": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "Your New Personal AI Assistant!",
-            "profile_title": "How Should I Address You?",
-            "profile_name_label": "Your Name:",
-            "profile_upload_label": "Upload Profile Picture (optional)",
-            "profile_save_button": "Save",
-            "profile_greeting": "Hello, {name}!",
-            "profile_edit_info": "You can edit your profile in the Settings & Personalization section.",
-            "ai_features_title": "Hanogt AI Features:",
-            "feature_general_chat": "General chat",
-            "feature_web_search": "Web search (DuckDuckGo)",
-            "feature_wikipedia_search": "Wikipedia search",
-            "feature_research_overview": "Research (Web, Wikipedia)",
-            "feature_knowledge_base": "Knowledge base responses",
-            "feature_creative_text": "Creative text generation",
-            "feature_image_generation": "Simple image generation (placeholder)",
-            "feature_feedback": "Feedback mechanism",
-            "settings_button": "⚙️ Settings & Personalization",
-            "about_button": "ℹ️ About Us",
-            "chat_input_placeholder": "Type your message or enter a command: E.g., 'Hello', 'image generate: a cat', 'web search: Streamlit'...",
-            "generating_response": "Generating response...",
-            "feedback_button": "👍",
-            "feedback_toast": "Thanks for your feedback!",
-            "image_gen_title": "Generated Image",
-            "image_gen_input_label": "Describe the image you want to create:",
-            "image_gen_button": "Generate Image",
-            "image_gen_warning_placeholder": "Image generation feature is currently a placeholder and not connected to a real API.",
-            "image_gen_warning_prompt_missing": "Please enter an image description.",
-            "creative_studio_title": "Creative Studio",
-            "creative_studio_info": "This section is designed for advanced features like creative text generation.",
-            "creative_studio_input_label": "Enter your creative text request:",
-            "creative_studio_button": "Generate Text",
-            "creative_studio_warning_prompt_missing": "Please enter a creative text request.",
-            "research_title": "🔍 Research Results",
-            "research_info": "Below is information gathered from both the web and Wikipedia related to your last query.",
-            "research_button_text_on": "Close Research",
-            "research_button_text_off": "Research",
-            "creative_text_button_text_on": "Close Creative Text",
-            "creative_text_button_text_off": "Generate Creative Text",
-            "creative_text_input_required": "Please enter a message first to generate creative text.",
-            "settings_personalization_title": "Settings & Personalization",
-            "settings_name_change_label": "Change Your Name:",
-            "settings_avatar_change_label": "Change Profile Picture (optional)",
-            "settings_update_profile_button": "Update Profile Info",
-            "settings_profile_updated_toast": "Profile updated!",
-            "settings_chat_management_title": "Chat Management",
-            "settings_clear_chat_button": "🧹 Clear Active Chat History",
-            "about_us_title": "ℹ️ About Us",
-            "about_us_text": "Hanogt AI was created by Oğuz Han Guluzade, owner of HanStudios, in 2025. It is open-source, trained by Gemini, and all copyrights are reserved.",
-            "footer_user": "User: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "AI: Active ({model_name}) | Log: Active",
-            "model_init_success": "Gemini Model successfully initialized!",
-            "model_init_error": "An error occurred while initializing the Gemini model: {error}. Please ensure your API key is correct and active.",
-            "gemini_model_not_initialized": "Gemini model not initialized. Please check your API key.",
-            "image_load_error": "Could not load image: {error}",
-            "image_not_convertible": "This content cannot be converted to speech (not text).",
-            "duckduckgo_error": "An error occurred while performing DuckDuckGo search: {error}",
-            "wikipedia_network_error": "Network error occurred while performing Wikipedia search: {error}",
-            "wikipedia_json_error": "Error occurred while parsing Wikipedia response: {error}",
-            "wikipedia_general_error": "A general error occurred while performing Wikipedia search: {error}",
-            "unexpected_response_error": "An unexpected error occurred while getting a response: {error}",
-            "source_error": "Source: Error ({error})",
-            "chat_cleared_toast": "Active chat cleared!",
-            "profile_image_load_error": "Could not load profile image: {error}",
-            "web_search_results": "Information from Web:",
-            "web_search_no_results": "No relevant information found on the web.",
-            "wikipedia_search_results": "Information from Wikipedia:",
-            "wikipedia_search_no_results": "No relevant information found on Wikipedia.",
-            "image_generated_example": "An image for '{prompt}' was generated (example).",
-            "image_upload_caption": "Uploaded Image",
-            "image_processing_error": "An error occurred while processing the image: {error}",
-            "image_vision_query": "What do you see in this image?",
-            "gemini_response_error": "An unexpected error occurred while getting a response: {error}",
-            "creative_text_generated": "Creative Text Generated: {text}",
-            "research_input_required": "Please enter a message first to perform research."
-        },
-        "FR": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "Votre Nouvel Assistant IA Personnel !",
-            "profile_title": "Comment dois-je vous appeler ?",
-            "profile_name_label": "Votre nom :",
-            "profile_upload_label": "Télécharger une photo de profil (facultatif)",
-            "profile_save_button": "Enregistrer",
-            "profile_greeting": "Bonjour, {name} !",
-            "profile_edit_info": "Vous pouvez modifier votre profil dans la section Paramètres et Personnalisation.",
-            "ai_features_title": "Fonctionnalités de Hanogt AI :",
-            "feature_general_chat": "Chat général",
-            "feature_web_search": "Recherche Web (DuckDuckGo)",
-            "feature_wikipedia_search": "Recherche Wikipédia",
-            "feature_research_overview": "Recherche (Web, Wikipédia)",
-            "feature_knowledge_base": "Réponses basées sur la connaissance",
-            "feature_creative_text": "Génération de texte créatif",
-            "feature_image_generation": "Génération d'images simple (aperçu)",
-            "feature_feedback": "Mécanisme de feedback",
-            "settings_button": "⚙️ Paramètres & Personnalisation",
-            "about_button": "ℹ️ À Propos",
-            "chat_input_placeholder": "Tapez votre message ou une commande : Ex: 'Bonjour', 'générer image: un chat', 'recherche web: Streamlit'...",
-            "generating_response": "Génération de la réponse...",
-            "feedback_button": "👍",
-            "feedback_toast": "Merci pour votre feedback !",
-            "image_gen_title": "Image Générée",
-            "image_gen_input_label": "Décrivez l'image que vous voulez créer :",
-            "image_gen_button": "Générer l'Image",
-            "image_gen_warning_placeholder": "La fonction de génération d'images est actuellement un aperçu et n'est pas connectée à une véritable API.",
-            "image_gen_warning_prompt_missing": "Veuillez entrer une description d'image.",
-            "creative_studio_title": "Studio Créatif",
-            "creative_studio_info": "Cette section est conçue pour des fonctionnalités avancées comme la génération de texte créatif.",
-            "creative_studio_input_label": "Entrez votre demande de texte créatif :",
-            "creative_studio_button": "Générer du Texte",
-            "creative_studio_warning_prompt_missing": "Veuillez entrer une demande de texte créatif.",
-            "research_title": "🔍 Résultats de Recherche",
-            "research_info": "Voici les informations recueillies sur le web et Wikipédia concernant votre dernière requête.",
-            "research_button_text_on": "Fermer la Recherche",
-            "research_button_text_off": "Rechercher",
-            "creative_text_button_text_on": "Fermer Texte Créatif",
-            "creative_text_button_text_off": "Générer Texte Créatif",
-            "creative_text_input_required": "Veuillez d'abord entrer un message pour générer du texte créatif.",
-            "settings_personalization_title": "Paramètres & Personnalisation",
-            "settings_name_change_label": "Changer votre nom :",
-            "settings_avatar_change_label": "Changer la photo de profil (facultatif)",
-            "settings_update_profile_button": "Mettre à jour les informations du profil",
-            "settings_profile_updated_toast": "Profil mis à jour !",
-            "settings_chat_management_title": "Gestion du Chat",
-            "settings_clear_chat_button": "🧹 Effacer l'historique du chat actif",
-            "about_us_title": "ℹ️ À Propos de Nous",
-            "about_us_text": "Hanogt AI a été créé par Oğuz Han Guluzade, propriétaire de HanStudios, en 2025. Il est open-source, entraîné par Gemini, et tous les droits d'auteur sont réservés.",
-            "footer_user": "Utilisateur : {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "IA : Actif ({model_name}) | Journal : Actif",
-            "model_init_success": "Modèle Gemini initialisé avec succès !",
-            "model_init_error": "Une erreur s'est produite lors de l'initialisation du modèle Gemini : {error}. Veuillez vous assurer que votre clé API est correcte et active.",
-            "gemini_model_not_initialized": "Modèle Gemini non initialisé. Veuillez vérifier votre clé API.",
-            "image_load_error": "Impossible de charger l'image : {error}",
-            "image_not_convertible": "Ce contenu ne peut pas être converti en parole (pas du texte).",
-            "duckduckgo_error": "Une erreur s'est produite lors de la recherche DuckDuckGo : {error}",
-            "wikipedia_network_error": "Erreur réseau lors de la recherche Wikipédia : {error}",
-            "wikipedia_json_error": "Erreur lors de l'analyse de la réponse Wikipédia : {error}",
-            "wikipedia_general_error": "Une erreur générale s'est produite lors de la recherche Wikipédia : {error}",
-            "unexpected_response_error": "Une erreur inattendue s'est produite lors de l'obtention d'une réponse : {error}",
-            "source_error": "Source : Erreur ({error})",
-            "chat_cleared_toast": "Chat actif effacé !",
-            "profile_image_load_error": "Impossible de charger l'image de profil : {error}",
-            "web_search_results": "Informations du Web :",
-            "web_search_no_results": "Aucune information pertinente trouvée sur le web.",
-            "wikipedia_search_results": "Informations de Wikipédia :",
-            "wikipedia_search_no_results": "Aucune information pertinente trouvée sur Wikipédia.",
-            "image_generated_example": "Une image pour '{prompt}' a été générée (exemple).",
-            "image_upload_caption": "Image Téléchargée",
-            "image_processing_error": "Une erreur s'est produite lors du traitement de l'image : {error}",
-            "image_vision_query": "Que voyez-vous dans cette image ?",
-            "gemini_response_error": "Une erreur inattendue s'est produite lors de l'obtention d'une réponse : {error}",
-            "creative_text_generated": "Texte Créatif Généré : {text}",
-            "research_input_required": "Veuillez d'abord entrer un message pour effectuer une recherche."
-        },
-        "ES": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "¡Tu Nuevo Asistente Personal de IA!",
-            "profile_title": "¿Cómo debo llamarte?",
-            "profile_name_label": "Tu nombre:",
-            "profile_upload_label": "Subir foto de perfil (opcional)",
-            "profile_save_button": "Guardar",
-            "profile_greeting": "¡Hola, {name}!",
-            "profile_edit_info": "Puedes editar tu perfil en la sección de Configuración y Personalización.",
-            "ai_features_title": "Características de Hanogt AI:",
-            "feature_general_chat": "Chat general",
-            "feature_web_search": "Búsqueda web (DuckDuckGo)",
-            "feature_wikipedia_search": "Búsqueda en Wikipedia",
-            "feature_research_overview": "Investigación (Web, Wikipedia)",
-            "feature_knowledge_base": "Respuestas de la base de conocimientos",
-            "feature_creative_text": "Generación de texto creativo",
-            "feature_image_generation": "Generación simple de imágenes (ejemplo)",
-            "feature_feedback": "Mecanismo de retroalimentación",
-            "settings_button": "⚙️ Configuración & Personalización",
-            "about_button": "ℹ️ Acerca de Nosotros",
-            "chat_input_placeholder": "Escribe tu mensaje o un comando: Ej.: 'Hola', 'generar imagen: un gato', 'búsqueda web: Streamlit'...",
-            "generating_response": "Generando respuesta...",
-            "feedback_button": "👍",
-            "feedback_toast": "¡Gracias por tu comentario!",
-            "image_gen_title": "Imagen Generada",
-            "image_gen_input_label": "Describe la imagen que quieres crear:",
-            "image_gen_button": "Generar Imagen",
-            "image_gen_warning_placeholder": "La función de generación de imágenes es actualmente un marcador de posición y no está conectada a una API real.",
-            "image_gen_warning_prompt_missing": "Por favor, introduce una descripción de la imagen.",
-            "creative_studio_title": "Estudio Creativo",
-            "creative_studio_info": "Esta sección está diseñada para funciones avanzadas como la generación de texto creativo.",
-            "creative_studio_input_label": "Introduce tu solicitud de texto creativo:",
-            "creative_studio_button": "Generar Texto",
-            "creative_studio_warning_prompt_missing": "Por favor, introduce una solicitud de texto creativo.",
-            "research_title": "🔍 Resultados de Investigación",
-            "research_info": "Aquí tienes la información recopilada de la web y Wikipedia relacionada con tu última consulta.",
-            "research_button_text_on": "Cerrar Investigación",
-            "research_button_text_off": "Investigar",
-            "creative_text_button_text_on": "Cerrar Texto Creativo",
-            "creative_text_button_text_off": "Generar Texto Creativo",
-            "creative_text_input_required": "Por favor, introduce un mensaje primero para generar texto creativo.",
-            "settings_personalization_title": "Configuración & Personalización",
-            "settings_name_change_label": "Cambiar tu nombre:",
-            "settings_avatar_change_label": "Cambiar foto de perfil (opcional)",
-            "settings_update_profile_button": "Actualizar información de perfil",
-            "settings_profile_updated_toast": "¡Perfil actualizado!",
-            "settings_chat_management_title": "Gestión de Chat",
-            "settings_clear_chat_button": "🧹 Borrar Historial de Chat Activo",
-            "about_us_title": "ℹ️ Acerca de Nosotros",
-            "about_us_text": "Hanogt AI fue creado por Oğuz Han Guluzade, propietario de HanStudios, en 2025. Es de código abierto, entrenado por Gemini y todos los derechos de autor están reservados.",
-            "footer_user": "Usuario: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "IA: Activa ({model_name}) | Registro: Activo",
-            "model_init_success": "¡Modelo Gemini inicializado con éxito!",
-            "model_init_error": "Se produjo un error al inicializar el modelo Gemini: {error}. Asegúrate de que tu clave API sea correcta y esté activa.",
-            "gemini_model_not_initialized": "Modelo Gemini no inicializado. Por favor, verifica tu clave API.",
-            "image_load_error": "No se pudo cargar la imagen: {error}",
-            "image_not_convertible": "Este contenido no se puede convertir a voz (no es texto).",
-            "duckduckgo_error": "Se produjo un error al realizar la búsqueda en DuckDuckGo: {error}",
-            "wikipedia_network_error": "Se produjo un error de red al realizar la búsqueda en Wikipedia: {error}",
-            "wikipedia_json_error": "Error al analizar la respuesta de Wikipedia: {error}",
-            "wikipedia_general_error": "Se produjo un error general al realizar la búsqueda en Wikipedia: {error}",
-            "unexpected_response_error": "Se produjo un error inesperado al obtener una respuesta: {error}",
-            "source_error": "Fuente: Error ({error})",
-            "chat_cleared_toast": "¡Chat activo borrado!",
-            "profile_image_load_error": "No se pudo cargar la imagen de perfil: {error}",
-            "web_search_results": "Información de la Web:",
-            "web_search_no_results": "No se encontró información relevante en la web.",
-            "wikipedia_search_results": "Información de Wikipedia:",
-            "wikipedia_search_no_results": "No se encontró información relevante en Wikipedia.",
-            "image_generated_example": "Se generó una imagen para '{prompt}' (ejemplo).",
-            "image_upload_caption": "Imagen Subida",
-            "image_processing_error": "Se produjo un error al procesar la imagen: {error}",
-            "image_vision_query": "¿Qué ves en esta imagen?",
-            "gemini_response_error": "Se produjo un error inesperado al obtener una respuesta: {error}",
-            "creative_text_generated": "Texto Creativo Generado: {text}",
-            "research_input_required": "Por favor, introduce un mensaje primero para realizar la investigación."
-        },
-        "DE": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "Ihr Neuer Persönlicher KI-Assistent!",
-            "profile_title": "Wie soll ich Sie ansprechen?",
-            "profile_name_label": "Ihr Name:",
-            "profile_upload_label": "Profilbild hochladen (optional)",
-            "profile_save_button": "Speichern",
-            "profile_greeting": "Hallo, {name}!",
-            "profile_edit_info": "Sie können Ihr Profil im Bereich Einstellungen & Personalisierung bearbeiten.",
-            "ai_features_title": "Hanogt AI Funktionen:",
-            "feature_general_chat": "Allgemeiner Chat",
-            "feature_web_search": "Websuche (DuckDuckGo)",
-            "feature_wikipedia_search": "Wikipedia-Suche",
-            "feature_research_overview": "Recherche (Web, Wikipedia)",
-            "feature_knowledge_base": "Wissensdatenbank-Antworten",
-            "feature_creative_text": "Kreative Texterstellung",
-            "feature_image_generation": "Einfache Bilderzeugung (Beispiel)",
-            "feature_feedback": "Feedback-Mechanismus",
-            "settings_button": "⚙️ Einstellungen & Personalisierung",
-            "about_button": "ℹ️ Über Uns",
-            "chat_input_placeholder": "Geben Sie Ihre Nachricht oder einen Befehl ein: Z.B. 'Hallo', 'bild erzeugen: eine Katze', 'websuche: Streamlit'...",
-            "generating_response": "Antwort wird generiert...",
-            "feedback_button": "👍",
-            "feedback_toast": "Vielen Dank für Ihr Feedback!",
-            "image_gen_title": "Erzeugtes Bild",
-            "image_gen_input_label": "Beschreiben Sie das Bild, das Sie erstellen möchten:",
-            "image_gen_button": "Bild erzeugen",
-            "image_gen_warning_placeholder": "Die Bilderzeugungsfunktion ist derzeit ein Platzhalter und nicht mit einer echten API verbunden.",
-            "image_gen_warning_prompt_missing": "Bitte geben Sie eine Bildbeschreibung ein.",
-            "creative_studio_title": "Kreativ-Studio",
-            "creative_studio_info": "Dieser Bereich ist für erweiterte Funktionen wie die Erstellung kreativer Texte konzipiert.",
-            "creative_studio_input_label": "Geben Sie Ihre kreative Textanfrage ein:",
-            "creative_studio_button": "Text erzeugen",
-            "creative_studio_warning_prompt_missing": "Bitte geben Sie eine kreative Textanfrage ein.",
-            "research_title": "🔍 Rechercheergebnisse",
-            "research_info": "Nachfolgend finden Sie Informationen, die sowohl aus dem Web als auch von Wikipedia zu Ihrer letzten Anfrage gesammelt wurden.",
-            "research_button_text_on": "Recherche schließen",
-            "research_button_text_off": "Recherchieren",
-            "creative_text_button_text_on": "Kreativen Text schließen",
-            "creative_text_button_text_off": "Kreativen Text erstellen",
-            "creative_text_input_required": "Bitte geben Sie zuerst eine Nachricht ein, um kreativen Text zu generieren.",
-            "settings_personalization_title": "Einstellungen & Personalisierung",
-            "settings_name_change_label": "Namen ändern:",
-            "settings_avatar_change_label": "Profilbild ändern (optional)",
-            "settings_update_profile_button": "Profilinformationen aktualisieren",
-            "settings_profile_updated_toast": "Profil aktualisiert!",
-            "settings_chat_management_title": "Chat-Verwaltung",
-            "settings_clear_chat_button": "🧹 Aktuellen Chatverlauf löschen",
-            "about_us_title": "ℹ️ Über Uns",
-            "about_us_text": "Hanogt AI wurde 2025 von Oğuz Han Guluzade, dem Eigentümer von HanStudios, entwickelt. Es ist quelloffen, von Gemini trainiert und alle Urheberrechte sind vorbehalten.",
-            "footer_user": "Benutzer: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "KI: Aktiv ({model_name}) | Protokoll: Aktiv",
-            "model_init_success": "Gemini-Modell erfolgreich initialisiert!",
-            "model_init_error": "Beim Initialisieren des Gemini-Modells ist ein Fehler aufgetreten: {error}. Stellen Sie sicher, dass Ihr API-Schlüssel korrekt und aktiv ist.",
-            "gemini_model_not_initialized": "Gemini-Modell nicht initialisiert. Bitte überprüfen Sie Ihren API-Schlüssel.",
-            "image_load_error": "Bild konnte nicht geladen werden: {error}",
-            "image_not_convertible": "Dieser Inhalt kann nicht in Sprache umgewandelt werden (kein Text).",
-            "duckduckgo_error": "Beim Durchführen der DuckDuckGo-Suche ist ein Fehler aufgetreten: {error}",
-            "wikipedia_network_error": "Netzwerkfehler bei der Wikipedia-Suche: {error}",
-            "wikipedia_json_error": "Fehler beim Parsen der Wikipedia-Antwort: {error}",
-            "wikipedia_general_error": "Ein allgemeiner Fehler bei der Wikipedia-Suche: {error}",
-            "unexpected_response_error": "Beim Abrufen einer Antwort ist ein unerwarteter Fehler aufgetreten: {error}",
-            "source_error": "Quelle: Fehler ({error})",
-            "chat_cleared_toast": "Aktueller Chat gelöscht!",
-            "profile_image_load_error": "Profilbild konnte nicht geladen werden: {error}",
-            "web_search_results": "Informationen aus dem Web:",
-            "web_search_no_results": "Keine relevanten Informationen im Web gefunden.",
-            "wikipedia_search_results": "Informationen aus Wikipedia:",
-            "wikipedia_search_no_results": "Keine relevanten Informationen in Wikipedia gefunden.",
-            "image_generated_example": "Ein Bild für '{prompt}' wurde generiert (Beispiel).",
-            "image_upload_caption": "Hochgeladenes Bild",
-            "image_processing_error": "Beim Verarbeiten des Bildes ist ein Fehler aufgetreten: {error}",
-            "image_vision_query": "Was sehen Sie auf diesem Bild?",
-            "gemini_response_error": "Ein unerwarteter Fehler beim Abrufen einer Antwort: {error}",
-            "creative_text_generated": "Kreativer Text generiert: {text}",
-            "research_input_required": "Bitte geben Sie zuerst eine Nachricht ein, um eine Recherche durchzuführen."
-        },
-        "RU": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "Ваш новый персональный ИИ-ассистент!",
-            "profile_title": "Как мне к вам обращаться?",
-            "profile_name_label": "Ваше имя:",
-            "profile_upload_label": "Загрузить фото профиля (необязательно)",
-            "profile_save_button": "Сохранить",
-            "profile_greeting": "Привет, {name}!",
-            "profile_edit_info": "Вы можете редактировать свой профиль в разделе «Настройки и персонализация».",
-            "ai_features_title": "Функции Hanogt AI:",
-            "feature_general_chat": "Общий чат",
-            "feature_web_search": "Веб-поиск (DuckDuckGo)",
-            "feature_wikipedia_search": "Поиск в Википедии",
-            "feature_research_overview": "Исследование (Веб, Википедия)",
-            "feature_knowledge_base": "Ответы из базы знаний",
-            "feature_creative_text": "Генерация креативного текста",
-            "feature_image_generation": "Простая генерация изображений (пример)",
-            "feature_feedback": "Механизм обратной связи",
-            "settings_button": "⚙️ Настройки и персонализация",
-            "about_button": "ℹ️ О нас",
-            "chat_input_placeholder": "Введите сообщение или команду: Например, 'Привет', 'сгенерировать изображение: кошка', 'веб-поиск: Streamlit'...",
-            "generating_response": "Генерация ответа...",
-            "feedback_button": "👍",
-            "feedback_toast": "Спасибо за ваш отзыв!",
-            "image_gen_title": "Сгенерированное изображение",
-            "image_gen_input_label": "Опишите изображение, которое вы хотите создать:",
-            "image_gen_button": "Сгенерировать изображение",
-            "image_gen_warning_placeholder": "Функция генерации изображений в настоящее время является заглушкой и не подключена к реальному API.",
-            "image_gen_warning_prompt_missing": "Пожалуйста, введите описание изображения.",
-            "creative_studio_title": "Креативная студия",
-            "creative_studio_info": "Этот раздел предназначен для расширенных функций, таких как генерация креативного текста.",
-            "creative_studio_input_label": "Введите свой запрос на креативный текст:",
-            "creative_studio_button": "Сгенерировать текст",
-            "creative_studio_warning_prompt_missing": "Пожалуйста, введите запрос на креативный текст.",
-            "research_title": "🔍 Результаты исследования",
-            "research_info": "Ниже представлена информация, собранная как из интернета, так и из Википедии по вашему последнему запросу.",
-            "research_button_text_on": "Закрыть исследование",
-            "research_button_text_off": "Исследовать",
-            "creative_text_button_text_on": "Закрыть креативный текст",
-            "creative_text_button_text_off": "Сгенерировать креативный текст",
-            "creative_text_input_required": "Пожалуйста, сначала введите сообщение для генерации креативного текста.",
-            "settings_personalization_title": "Настройки и персонализация",
-            "settings_name_change_label": "Изменить ваше имя:",
-            "settings_avatar_change_label": "Изменить фото профиля (необязательно)",
-            "settings_update_profile_button": "Обновить информацию профиля",
-            "settings_profile_updated_toast": "Профиль обновлен!",
-            "settings_chat_management_title": "Управление чатом",
-            "settings_clear_chat_button": "🧹 Очистить историю активного чата",
-            "about_us_title": "ℹ️ О нас",
-            "about_us_text": "Hanogt AI был создан Огузом Ханом Гулузаде, владельцем HanStudios, в 2025 году. Он имеет открытый исходный код, обучен Gemini, и все авторские права защищены.",
-            "footer_user": "Пользователь: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "ИИ: Активен ({model_name}) | Журнал: Активен",
-            "model_init_success": "Модель Gemini успешно инициализирована!",
-            "model_init_error": "Произошла ошибка при инициализации модели Gemini: {error}. Убедитесь, что ваш ключ API верен и активен.",
-            "gemini_model_not_initialized": "Модель Gemini не инициализирована. Пожалуйста, проверьте свой ключ API.",
-            "image_load_error": "Не удалось загрузить изображение: {error}",
-            "image_not_convertible": "Этот контент не может быть преобразован в речь (не текст).",
-            "duckduckgo_error": "Произошла ошибка при выполнении поиска DuckDuckGo: {error}",
-            "wikipedia_network_error": "Произошла сетевая ошибка при выполнении поиска в Википедии: {error}",
-            "wikipedia_json_error": "Ошибка при разборе ответа Википедии: {error}",
-            "wikipedia_general_error": "Произошла общая ошибка при выполнении поиска в Википедии: {error}",
-            "unexpected_response_error": "Произошла непредвиденная ошибка при получении ответа: {error}",
-            "source_error": "Источник: Ошибка ({error})",
-            "chat_cleared_toast": "Активный чат очищен!",
-            "profile_image_load_error": "Не удалось загрузить изображение профиля: {error}",
-            "web_search_results": "Информация из Интернета:",
-            "web_search_no_results": "В Интернете не найдено соответствующей информации.",
-            "wikipedia_search_results": "Информация из Википедии:",
-            "wikipedia_search_no_results": "В Википедии не найдено соответствующей информации.",
-            "image_generated_example": "Изображение для '{prompt}' сгенерировано (пример).",
-            "image_upload_caption": "Загруженное изображение",
-            "image_processing_error": "Произошла ошибка при обработке изображения: {error}",
-            "image_vision_query": "Что вы видите на этом изображении?",
-            "gemini_response_error": "Произошла непредвиденная ошибка при получении ответа: {error}",
-            "creative_text_generated": "Креативный текст сгенерирован: {text}",
-            "research_input_required": "Пожалуйста, сначала введите сообщение для выполнения исследования."
-        },
-        "SA": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "مساعدك الشخصي الجديد للذكاء الاصطناعي!",
-            "profile_title": "كيف أجب أن أناديك؟",
-            "profile_name_label": "اسمك:",
-            "profile_upload_label": "تحميل صورة ملف شخصي (اختياري)",
-            "profile_save_button": "حفظ",
-            "profile_greeting": "مرحبًا، {name}!",
-            "profile_edit_info": "يمكنك تعديل ملفك الشخصي في قسم الإعدادات والتخصيص.",
-            "ai_features_title": "ميزات Hanogt AI:",
-            "feature_general_chat": "دردشة عامة",
-            "feature_web_search": "بحث الويب (DuckDuckGo)",
-            "feature_wikipedia_search": "بحث ويكيبيديا",
-            "feature_research_overview": "بحث (ويب، ويكيبيديا)",
-            "feature_knowledge_base": "استجابات قاعدة المعرفة",
-            "feature_creative_text": "إنشاء نص إبداعي",
-            "feature_image_generation": "إنشاء صور بسيطة (مثال)",
-            "feature_feedback": "آلية التغذية الراجعة",
-            "settings_button": "⚙️ الإعدادات والتخصيص",
-            "about_button": "ℹ️ حولنا",
-            "chat_input_placeholder": "اكتب رسالتك أو أدخل أمرًا: مثال: 'مرحبًا', 'إنشاء صورة: قطة', 'بحث ويب: Streamlit'...",
-            "generating_response": "جاري إنشاء الرد...",
-            "feedback_button": "👍",
-            "feedback_toast": "شكرًا لملاحظاتك!",
-            "image_gen_title": "الصورة التي تم إنشاؤها",
-            "image_gen_input_label": "صف الصورة التي تريد إنشاءها:",
-            "image_gen_button": "إنشاء صورة",
-            "image_gen_warning_placeholder": "ميزة إنشاء الصور هي حاليًا مكان مؤقت وغير متصلة بواجهة برمجة تطبيقات حقيقية.",
-            "image_gen_warning_prompt_missing": "الرجاء إدخال وصف للصورة.",
-            "creative_studio_title": "استوديو إبداعي",
-            "creative_studio_info": "تم تصميم هذا القسم للميزات المتقدمة مثل إنشاء النص الإبداعي.",
-            "creative_studio_input_label": "أدخل طلب النص الإبداعي الخاص بك:",
-            "creative_studio_button": "إنشاء نص",
-            "creative_studio_warning_prompt_missing": "الرجاء إدخال طلب نص إبداعي.",
-            "research_title": "🔍 نتائج البحث",
-            "research_info": "أدناه معلومات تم جمعها من الويب وويكيبيديا تتعلق بآخر استعلام لك.",
-            "research_button_text_on": "إغلاق البحث",
-            "research_button_text_off": "بحث",
-            "creative_text_button_text_on": "إغلاق النص الإبداعي",
-            "creative_text_button_text_off": "إنشاء نص إبداعي",
-            "creative_text_input_required": "الرجاء إدخال رسالة أولاً لإنشاء نص إبداعي.",
-            "settings_personalization_title": "الإعدادات والتخصيص",
-            "settings_name_change_label": "تغيير اسمك:",
-            "settings_avatar_change_label": "تغيير صورة الملف الشخصي (اختياري)",
-            "settings_update_profile_button": "تحديث معلومات الملف الشخصي",
-            "settings_profile_updated_toast": "تم تحديث الملف الشخصي!",
-            "settings_chat_management_title": "إدارة الدردشة",
-            "settings_clear_chat_button": "🧹 مسح سجل الدردشة النشط",
-            "about_us_title": "ℹ️ حولنا",
-            "about_us_text": "تم إنشاء Hanogt AI بواسطة أوغوز هان جولوزاده، مالك HanStudios، في عام 2025. إنه مفتوح المصدر، تم تدريبه بواسطة Gemini، وجميع حقوق النشر محفوظة.",
-            "footer_user": "المستخدم: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "الذكاء الاصطناعي: نشط ({model_name}) | السجل: نشط",
-            "model_init_success": "تم تهيئة نموذج Gemini بنجاح!",
-            "model_init_error": "حدث خطأ أثناء تهيئة نموذج Gemini: {error}. يرجى التأكد من أن مفتاح API الخاص بك صحيح ونشط.",
-            "gemini_model_not_initialized": "نموذج Gemini غير مهيأ. يرجى التحقق من مفتاح API الخاص بك.",
-            "image_load_error": "تعذر تحميل الصورة: {error}",
-            "image_not_convertible": "لا يمكن تحويل هذا المحتوى إلى كلام (ليس نصًا).",
-            "duckduckgo_error": "حدث خطأ أثناء إجراء بحث DuckDuckGo: {error}",
-            "wikipedia_network_error": "حدث خطأ في الشبكة أثناء إجراء بحث ويكيبيديا: {error}",
-            "wikipedia_json_error": "خطأ أثناء تحليل استجابة ويكيبيديا: {error}",
-            "wikipedia_general_error": "حدث خطأ عام أثناء إجراء بحث ويكيبيديا: {error}",
-            "unexpected_response_error": "حدث خطأ غير متوقع أثناء تلقي رد: {error}",
-            "source_error": "المصدر: خطأ ({error})",
-            "chat_cleared_toast": "تم مسح الدردشة النشطة!",
-            "profile_image_load_error": "تعذر تحميل صورة الملف الشخصي: {error}",
-            "web_search_results": "معلومات من الويب:",
-            "web_search_no_results": "لم يتم العثور على معلومات ذات صلة على الويب.",
-            "wikipedia_search_results": "معلومات من ويكيبيديا:",
-            "wikipedia_search_no_results": "لم يتم العثور على معلومات ذات صلة في ويكيبيديا.",
-            "image_generated_example": "تم إنشاء صورة لـ '{prompt}' (مثال).",
-            "image_upload_caption": "الصورة المحملة",
-            "image_processing_error": "حدث خطأ أثناء معالجة الصورة: {error}",
-            "image_vision_query": "ماذا ترى في هذه الصورة؟",
-            "gemini_response_error": "حدث خطأ غير متوقع أثناء تلقي رد: {error}",
-            "creative_text_generated": "تم إنشاء النص الإبداعي: {text}",
-            "research_input_required": "الرجاء إدخال رسالة أولاً لإجراء البحث."
-        },
-        "AZ": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "Yeni Şəxsi Süni İntellekt Köməkçiniz!",
-            "profile_title": "Sizə necə müraciət edim?",
-            "profile_name_label": "Adınız:",
-            "profile_upload_label": "Profil şəkli yükləyin (isteğe bağlı)",
-            "profile_save_button": "Yadda saxla",
-            "profile_greeting": "Salam, {name}!",
-            "profile_edit_info": "Profilinizi Ayarlar və Fərdiləşdirmə bölməsində redaktə edə bilərsiniz.",
-            "ai_features_title": "Hanogt AI Xüsusiyyətləri:",
-            "feature_general_chat": "Ümumi söhbət",
-            "feature_web_search": "Veb axtarış (DuckDuckGo)",
-            "feature_wikipedia_search": "Vikipediya axtarışı",
-            "feature_research_overview": "Araşdırma (Veb, Vikipediya)",
-            "feature_knowledge_base": "Bilik bazası cavabları",
-            "feature_creative_text": "Yaradıcı mətn yaratma",
-            "feature_image_generation": "Sadə şəkil yaratma (nümunə)",
-            "feature_feedback": "Rəy mexanizmi",
-            "settings_button": "⚙️ Ayarlar & Fərdiləşdirmə",
-            "about_button": "ℹ️ Haqqımızda",
-            "chat_input_placeholder": "Mesajınızı yazın və ya əmr daxil edin: Məsələn: 'Salam', 'şəkil yarat: pişik', 'veb axtar: Streamlit'...",
-            "generating_response": "Cavab yaradılır...",
-            "feedback_button": "👍",
-            "feedback_toast": "Rəyiniz üçün təşəkkür edirik!",
-            "image_gen_title": "Yaradılmış Şəkil",
-            "image_gen_input_label": "Yaratmaq istədiyiniz şəkli təsvir edin:",
-            "image_gen_button": "Şəkil Yarat",
-            "image_gen_warning_placeholder": "Şəkil yaratma xüsusiyyəti hazırda bir yer tutucudur və real API-yə qoşulmayıb.",
-            "image_gen_warning_prompt_missing": "Zəhmət olmasa, bir şəkil təsviri daxil edin.",
-            "creative_studio_title": "Yaradıcı Studiya",
-            "creative_studio_info": "Bu bölmə yaradıcı mətn yaratma kimi qabaqcıl xüsusiyyətlər üçün nəzərdə tutulub.",
-            "creative_studio_input_label": "Yaradıcı mətn istəyinizi daxil edin:",
-            "creative_studio_button": "Mətn Yarat",
-            "creative_studio_warning_prompt_missing": "Zəhmət olmasa, bir yaradıcı mətn istəyi daxil edin.",
-            "research_title": "🔍 Araşdırma Nəticələri",
-            "research_info": "Aşağıda son sorğunuzla əlaqədar vebdən və Vikipediyadan toplanmış məlumatlar verilmişdir.",
-            "research_button_text_on": "Araşdırmanı Bağla",
-            "research_button_text_off": "Araşdır",
-            "creative_text_button_text_on": "Yaradıcı Mətni Bağla",
-            "creative_text_button_text_off": "Yaradıcı Mətn Yarat",
-            "creative_text_input_required": "Yaradıcı mətn yaratmaq üçün əvvəlcə mesaj daxil edin.",
-            "settings_personalization_title": "Ayarlar & Fərdiləşdirmə",
-            "settings_name_change_label": "Adınızı Dəyişdirin:",
-            "settings_avatar_change_label": "Profil Şəklini Dəyişdirin (isteğe bağlı)",
-            "settings_update_profile_button": "Profil Məlumatlarını Yeniləyin",
-            "settings_profile_updated_toast": "Profil yeniləndi!",
-            "settings_chat_management_title": "Söhbət İdarəetməsi",
-            "settings_clear_chat_button": "🧹 Aktiv Söhbət Keçmişini Təmizlə",
-            "about_us_title": "ℹ️ Haqqımızda",
-            "about_us_text": "Hanogt AI 2025-ci ildə HanStudios-un Sahibi Oğuz Xan Quluzadə tərəfindən hazırlanmışdır. Açıq Mənbə Kodludur, Gemini tərəfindən öyrədilmişdir və Bütün Müəllif Hüquqları Qorunur.",
-            "footer_user": "İstifadəçi: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "AI: Aktiv ({model_name}) | Log: Aktiv",
-            "model_init_success": "Gemini Modeli uğurla başladıldı!",
-            "model_init_error": "Gemini modelini başladarkən bir səhv baş verdi: {error}. Zəhmət olmasa, API açarınızın doğru və aktiv olduğundan əmin olun.",
-            "gemini_model_not_initialized": "Gemini modeli başladılmayıb. Zəhmət olmasa, API açarınızı yoxlayın.",
-            "image_load_error": "Şəkil yüklənmədi: {error}",
-            "image_not_convertible": "Bu məzmun səsə çevrilə bilməz (mətn deyil).",
-            "duckduckgo_error": "DuckDuckGo axtarışı zamanı səhv baş verdi: {error}",
-            "wikipedia_network_error": "Vikipediya axtarışı zamanı şəbəkə səhvi baş verdi: {error}",
-            "wikipedia_json_error": "Vikipediya cavabı ayrıştırılarkən səhv baş verdi: {error}",
-            "wikipedia_general_error": "Vikipediya axtarışı zamanı ümumi bir səhv baş verdi: {error}",
-            "unexpected_response_error": "Cavab alınarkən gözlənilməz bir səhv baş verdi: {error}",
-            "source_error": "Mənbə: Səhv ({error})",
-            "chat_cleared_toast": "Aktiv söhbət təmizləndi!",
-            "profile_image_load_error": "Profil şəkli yüklənmədi: {error}",
-            "web_search_results": "Vebdən Məlumat:",
-            "web_search_no_results": "Vebdə əlaqəli məlumat tapılmadı.",
-            "wikipedia_search_results": "Vikipediyadan Məlumat:",
-            "wikipedia_search_no_results": "Vikipediyada əlaqəli məlumat tapılmadı.",
-            "image_generated_example": "'{prompt}' üçün bir şəkil yaradıldı (nümunə).",
-            "image_upload_caption": "Yüklənən Şəkil",
-            "image_processing_error": "Şəkil işlənərkən bir səhv baş verdi: {error}",
-            "image_vision_query": "Bu şəkildə nə görürsən?",
-            "gemini_response_error": "Cavab alınarkən gözlənilməz bir səhv baş verdi: {error}",
-            "creative_text_generated": "Yaradıcı Mətn Yaradıldı: {text}",
-            "research_input_required": "Araşdırma aparmaq üçün əvvəlcə mesaj daxil edin."
-        },
-        "JP": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "あなたの新しいパーソナルAIアシスタント！",
-            "profile_title": "何とお呼びしましょうか？",
-            "profile_name_label": "あなたの名前：",
-            "profile_upload_label": "プロフィール画像をアップロード (オプション)",
-            "profile_save_button": "保存",
-            "profile_greeting": "こんにちは、{name}！",
-            "profile_edit_info": "プロフィールは「設定とパーソナライズ」セクションで編集できます。",
-            "ai_features_title": "Hanogt AI の機能：",
-            "feature_general_chat": "一般チャット",
-            "feature_web_search": "ウェブ検索 (DuckDuckGo)",
-            "feature_wikipedia_search": "Wikipedia検索",
-            "feature_research_overview": "リサーチ (ウェブ, Wikipedia)",
-            "feature_knowledge_base": "ナレッジベースの回答",
-            "feature_creative_text": "クリエイティブテキスト生成",
-            "feature_image_generation": "簡易画像生成 (例)",
-            "feature_feedback": "フィードバックメカニズム",
-            "settings_button": "⚙️ 設定とパーソナライズ",
-            "about_button": "ℹ️ 会社概要",
-            "chat_input_placeholder": "メッセージまたはコマンドを入力してください: 例: 'こんにちは', '画像生成: 猫', 'ウェブ検索: Streamlit'...",
-            "generating_response": "応答を生成中...",
-            "feedback_button": "👍",
-            "feedback_toast": "フィードバックありがとうございます！",
-            "image_gen_title": "生成された画像",
-            "image_gen_input_label": "作成したい画像を説明してください：",
-            "image_gen_button": "画像を生成",
-            "image_gen_warning_placeholder": "画像生成機能は現在プレースホルダーであり、実際のAPIには接続されていません。",
-            "image_gen_warning_prompt_missing": "画像の説明を入力してください。",
-            "creative_studio_title": "クリエイティブスタジオ",
-            "creative_studio_info": "このセクションは、クリエイティブなテキスト生成などの高度な機能向けに設計されています。",
-            "creative_studio_input_label": "クリエイティブなテキストリクエストを入力してください：",
-            "creative_studio_button": "テキストを生成",
-            "creative_studio_warning_prompt_missing": "クリエイティブなテキストリクエストを入力してください。",
-            "research_title": "🔍 リサーチ結果",
-            "research_info": "以下は、最新のクエリに関連するウェブとWikipediaからの情報です。",
-            "research_button_text_on": "リサーチを閉じる",
-            "research_button_text_off": "リサーチ",
-            "creative_text_button_text_on": "クリエイティブテキストを閉じる",
-            "creative_text_button_text_off": "クリエイティブテキストを生成",
-            "creative_text_input_required": "クリエイティブなテキストを生成するには、まずメッセージを入力してください。",
-            "settings_personalization_title": "設定とパーソナライズ",
-            "settings_name_change_label": "名前を変更：",
-            "settings_avatar_change_label": "プロフィール画像を変更 (オプション)",
-            "settings_update_profile_button": "プロフィール情報を更新",
-            "settings_profile_updated_toast": "プロフィールが更新されました！",
-            "settings_chat_management_title": "チャット管理",
-            "settings_clear_chat_button": "🧹 アクティブなチャット履歴をクリア",
-            "about_us_title": "ℹ️ 会社概要",
-            "about_us_text": "Hanogt AI は、HanStudios のオーナーである Oğuz Han Guluzade によって2025年に作成されました。オープンソースであり、Gemini によって訓練されており、すべての著作権は留保されています。",
-            "footer_user": "ユーザー: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "AI: アクティブ ({model_name}) | ログ: アクティブ",
-            "model_init_success": "Geminiモデルが正常に初期化されました！",
-            "model_init_error": "Geminiモデルの初期化中にエラーが発生しました：{error}。APIキーが正しいことを確認してください。",
-            "gemini_model_not_initialized": "Geminiモデルが初期化されていません。APIキーを確認してください。",
-            "image_load_error": "画像を読み込めませんでした：{error}",
-            "image_not_convertible": "このコンテンツは音声に変換できません (テキストではありません)。",
-            "duckduckgo_error": "DuckDuckGo検索の実行中にエラーが発生しました：{error}",
-            "wikipedia_network_error": "Wikipedia検索の実行中にネットワークエラーが発生しました：{error}",
-            "wikipedia_json_error": "Wikipediaの応答を解析中にエラーが発生しました：{error}",
-            "wikipedia_general_error": "Wikipedia検索の実行中に一般的なエラーが発生しました：{error}",
-            "unexpected_response_error": "応答の取得中に予期しないエラーが発生しました：{error}",
-            "source_error": "ソース: エラー ({error})",
-            "chat_cleared_toast": "アクティブなチャットがクリアされました！",
-            "profile_image_load_error": "プロフィール画像を読み込めませんでした：{error}",
-            "web_search_results": "ウェブからの情報：",
-            "web_search_no_results": "ウェブに関連情報は見つかりませんでした。",
-            "wikipedia_search_results": "Wikipediaからの情報：",
-            "wikipedia_search_no_results": "Wikipediaに関連情報は見つかりませんでした。",
-            "image_generated_example": "'{prompt}'の画像が生成されました (例)。",
-            "image_upload_caption": "アップロードされた画像",
-            "image_processing_error": "画像の処理中にエラーが発生しました：{error}",
-            "image_vision_query": "この画像に何が見えますか？",
-            "gemini_response_error": "応答の取得中に予期しないエラーが発生しました：{error}",
-            "creative_text_generated": "クリエイティブテキスト生成済み：{text}",
-            "research_input_required": "リサーチを実行するには、まずメッセージを入力してください。"
-        },
-        "KR": {
-            "welcome_title": "Hanogt AI",
-            "welcome_subtitle": "새로운 개인 AI 어시스턴트!",
-            "profile_title": "어떻게 불러드릴까요?",
-            "profile_name_label": "이름:",
-            "profile_upload_label": "프로필 사진 업로드 (선택 사항)",
-            "profile_save_button": "저장",
-            "profile_greeting": "안녕하세요, {name}님!",
-            "profile_edit_info": "설정 및 개인화 섹션에서 프로필을 편집할 수 있습니다.",
-            "ai_features_title": "Hanogt AI 기능:",
-            "feature_general_chat": "일반 채팅",
-            "feature_web_search": "웹 검색 (DuckDuckGo)",
-            "feature_wikipedia_search": "위키백과 검색",
-            "feature_research_overview": "연구 (웹, 위키백과)",
-            "feature_knowledge_base": "지식 기반 응답",
-            "feature_creative_text": "창의적인 텍스트 생성",
-            "feature_image_generation": "간단한 이미지 생성 (예시)",
-            "feature_feedback": "피드백 메커니즘",
-            "settings_button": "⚙️ 설정 및 개인화",
-            "about_button": "ℹ️ 회사 소개",
-            "chat_input_placeholder": "메시지를 입력하거나 명령을 입력하세요: 예: '안녕하세요', '이미지 생성: 고양이', '웹 검색: Streamlit'...",
-            "generating_response": "응답 생성 중...",
-            "feedback_button": "👍",
-            "feedback_toast": "피드백 감사합니다!",
-            "image_gen_title": "생성된 이미지",
-            "image_gen_input_label": "생성하려는 이미지를 설명하세요:",
-            "image_gen_button": "이미지 생성",
-            "image_gen_warning_placeholder": "이미지 생성 기능은 현재 플레이스홀더이며 실제 API에 연결되어 있지 않습니다.",
-            "image_gen_warning_prompt_missing": "이미지 설명을 입력하세요.",
-            "creative_studio_title": "크리에이티브 스튜디오",
-            "creative_studio_info": "이 섹션은 창의적인 텍스트 생성과 같은 고급 기능을 위해 설계되었습니다.",
-            "creative_studio_input_label": "창의적인 텍스트 요청을 입력하세요:",
-            "creative_studio_button": "텍스트 생성",
-            "creative_studio_warning_prompt_missing": "창의적인 텍스트 요청을 입력하세요.",
-            "research_title": "🔍 연구 결과",
-            "research_info": "아래는 마지막 쿼리와 관련된 웹 및 위키백과에서 수집된 정보입니다.",
-            "research_button_text_on": "연구 닫기",
-            "research_button_text_off": "연구",
-            "creative_text_button_text_on": "창의적인 텍스트 닫기",
-            "creative_text_button_text_off": "창의적인 텍스트 생성",
-            "creative_text_input_required": "창의적인 텍스트를 생성하려면 먼저 메시지를 입력하세요.",
-            "settings_personalization_title": "설정 및 개인화",
-            "settings_name_change_label": "이름 변경:",
-            "settings_avatar_change_label": "프로필 사진 변경 (선택 사항)",
-            "settings_update_profile_button": "프로필 정보 업데이트",
-            "settings_profile_updated_toast": "프로필이 업데이트되었습니다!",
-            "settings_chat_management_title": "채팅 관리",
-            "settings_clear_chat_button": "🧹 활성 채팅 기록 지우기",
-            "about_us_title": "ℹ️ 회사 소개",
-            "about_us_text": "Hanogt AI는 HanStudios의 소유자인 Oğuz Han Guluzade에 의해 2025년에 만들어졌습니다. 오픈 소스이며 Gemini에 의해 훈련되었으며 모든 저작권은 보호됩니다.",
-            "footer_user": "사용자: {user_name}",
-            "footer_version": "Hanogt AI v5.1.5 Pro+ Enhanced (Refactored) © {year}",
-            "footer_ai_status": "AI: 활성 ({model_name}) | 로그: 활성",
-            "model_init_success": "Gemini 모델이 성공적으로 초기화되었습니다!",
-            "model_init_error": "Gemini 모델 초기화 중 오류가 발생했습니다: {error}. API 키가 올바르고 활성 상태인지 확인하세요.",
-            "gemini_model_not_initialized": "Gemini 모델이 초기화되지 않았습니다. API 키를 확인하세요.",
-            "image_load_error": "이미지를 로드할 수 없습니다: {error}",
-            "image_not_convertible": "이 콘텐츠는 음성으로 변환할 수 없습니다(텍스트가 아님).",
-            "duckduckgo_error": "DuckDuckGo 검색 수행 중 오류가 발생했습니다: {error}",
-            "wikipedia_network_error": "Wikipedia 검색 수행 중 네트워크 오류가 발생했습니다: {error}",
-            "wikipedia_json_error": "Wikipedia 응답을 파싱하는 중 오류가 발생했습니다: {error}",
-            "wikipedia_general_error": "Wikipedia 검색 수행 중 일반적인 오류가 발생했습니다: {error}",
-            "unexpected_response_error": "응답을 가져오는 중 예기치 않은 오류가 발생했습니다: {error}",
-            "source_error": "출처: 오류 ({error})",
-            "chat_cleared_toast": "활성 채팅이 지워졌습니다!",
-            "profile_image_load_error": "프로필 이미지를 로드할 수 없습니다: {error}",
-            "web_search_results": "웹에서 얻은 정보:",
-            "web_search_no_results": "웹에서 관련 정보를 찾을 수 없습니다.",
-            "wikipedia_search_results": "위키백과에서 얻은 정보:",
-            "wikipedia_search_no_results": "위키백과에서 관련 정보를 찾을 수 없습니다.",
-            "image_generated_example": "'{prompt}'에 대한 이미지가 생성되었습니다(예시).",
-            "image_upload_caption": "업로드된 이미지",
-            "image_processing_error": "이미지 처리 중 오류가 발생했습니다: {error}",
-            "image_vision_query": "이 이미지에서 무엇을 보시나요?",
-            "gemini_response_error": "응답을 가져오는 중 예기치 않은 오류가 발생했습니다: {error}",
-            "creative_text_generated": "창의적인 텍스트 생성됨: {text}",
-            "research_input_required": "연구를 수행하려면 먼저 메시지를 입력하세요."
-        },
-    }
-    return texts.get(st.session_state.current_language, texts["TR"]).get(key, "TEXT_MISSING")
+    """Returns text based on the selected language (translations live in locales/*.json)."""
+    return i18n.get_text(st.session_state.current_language, key)
+
+@st.cache_resource
+def check_translations():
+    """Reports locale keys missing from any supported language (once per process).
+
+    Keys used through get_text() in this file are required too, so a key missing from the
+    reference catalogue is caught here instead of showing TEXT_MISSING at runtime.
+    With I18N_STRICT=1 (development) a missing reference key stops the app.
+    """
+    used_keys = i18n.find_text_keys(os.path.abspath(__file__))
+    problems = i18n.check_catalogs(LANGUAGES.keys(), required_keys=used_keys)
+    missing = problems.get(i18n.DEFAULT_LANGUAGE)
+    if missing:
+        logger.error(f"Text keys used in app.py are missing from the {i18n.DEFAULT_LANGUAGE} catalogue: {', '.join(missing)}")
+        if I18N_STRICT:
+            raise KeyError(f"Missing translation keys: {', '.join(missing)}")
+    return problems
 
 def initialize_session_state():
     """Initializes application session state."""
@@ -848,16 +158,29 @@ def initialize_session_state():
         st.session_state.user_name = ""
     if "user_avatar" not in st.session_state:
         st.session_state.user_avatar = None
+    if "processed_upload_ids" not in st.session_state:
+        st.session_state.processed_upload_ids = set() # Uploads already analysed; the uploader keeps returning them on every rerun
+    if "user_avatar_image" not in st.session_state:
+        st.session_state.user_avatar_image = None # (avatar hash, decoded thumbnail) for the current avatar
     if "models_initialized" not in st.session_state:
         st.session_state.models_initialized = False
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = get_session_id()
     if "all_chats" not in st.session_state:
         st.session_state.all_chats = {}
+    if "older_messages" not in st.session_state:
+        st.session_state.older_messages = {} # {chat_id: {"messages": [...], "exhausted": bool}}, display only
     if "active_chat_id" not in st.session_state:
         st.session_state.active_chat_id = "chat_0"
+    # Rolling conversation summaries: {chat_id: {"text", "covered", "covered_seq", "tokens"}} and in-flight updates
+    if "chat_summaries" not in st.session_state:
+        st.session_state.chat_summaries = {}
+    if "pending_summaries" not in st.session_state:
+        st.session_state.pending_summaries = {}
     
-    # Initialize chat_history for the active chat ID if it doesn't exist
+    # Initialize chat_history for the active chat ID if it doesn't exist (restored from the chat store after a refresh)
     if st.session_state.active_chat_id not in st.session_state.all_chats:
-        st.session_state.all_chats[st.session_state.active_chat_id] = []
+        st.session_state.all_chats[st.session_state.active_chat_id] = load_chat_window(st.session_state.active_chat_id)
     
     # Unified mode management
     if "current_view" not in st.session_state:
@@ -875,6 +198,12 @@ def initialize_session_state():
         st.session_state.last_research_query = ""
     if "last_research_results" not in st.session_state:
         st.session_state.last_research_results = None
+    if "grounded_mode" not in st.session_state:
+        st.session_state.grounded_mode = False
+    if "last_grounded_timings" not in st.session_state:
+        st.session_state.last_grounded_timings = {}
+    if "research_prefetch" not in st.session_state:
+        st.session_state.research_prefetch = None # {"query": normalized query, "future": Future} for the latest message
 
     # Creative text specific states
     if "show_creative_text_results" not in st.session_state:
@@ -892,109 +221,856 @@ def initialize_session_state():
     if "current_language" not in st.session_state:
         st.session_state.current_language = "TR"
 
-    # Initialize chat_session if not present or models not initialized
-    if "chat_session" not in st.session_state or not st.session_state.models_initialized:
-        initialize_gemini_model()
-        # If model initialized, then also initialize chat_session
-        if st.session_state.models_initialized and "gemini_model" in st.session_state:
-            st.session_state.chat_session = st.session_state.gemini_model.start_chat(history=[])
-
+    # Incremental Gemini history: converted messages per chat and how much of the active chat the session already holds
+    if "converted_history" not in st.session_state:
+        st.session_state.converted_history = {}
+    if "chat_session_chat_id" not in st.session_state:
+        st.session_state.chat_session_chat_id = None
+    if "chat_session_synced" not in st.session_state:
+        st.session_state.chat_session_synced = 0
+    if "chat_session_tokens" not in st.session_state:
+        st.session_state.chat_session_tokens = 0
+    if "last_request_tokens" not in st.session_state:
+        st.session_state.last_request_tokens = 0
+
+    # The Gemini model is attached on first use (see get_active_model) so the first render does not load the SDK;
+    # the chat session is created by get_chat_session when the first message is sent
+    if "gemini_model" not in st.session_state:
+        st.session_state.gemini_model = None
+    if "chat_session" not in st.session_state:
+        st.session_state.chat_session = None
+
+
+@st.cache_resource
+def get_gemini_model(model_name, temperature=None, top_p=None, top_k=None, max_output_tokens=None):
+    """Process-wide Gemini model handle for one generation config.
+
+    Every session with the same config shares the handle (and the SDK's client
+    connections); sessions only keep their own lightweight chat sessions.
+    """
+    import google.generativeai as genai
+
+    configure_gemini()
+    logger.info(f"Gemini Model initialized: {model_name}")
+    return genai.GenerativeModel(
+        model_name=model_name,
+        generation_config=genai.GenerationConfig(
+            temperature=temperature,
+            top_p=top_p,
+            top_k=top_k,
+            max_output_tokens=max_output_tokens,
+        )
+    )
 
 def initialize_gemini_model():
-    """Initializes the Gemini model and saves it to session state."""
+    """Attaches the shared Gemini model to session state."""
     if st.session_state.get("gemini_model") is None or not st.session_state.get("models_initialized", False):
         try:
-            st.session_state.gemini_model = genai.GenerativeModel(
-                model_name=GLOBAL_MODEL_NAME,
-                generation_config=genai.GenerationConfig(
-                    temperature=GLOBAL_TEMPERATURE,
-                    top_p=GLOBAL_TOP_P,
-                    top_k=GLOBAL_TOP_K,
-                    max_output_tokens=GLOBAL_MAX_OUTPUT_TOKENS,
-                )
+            st.session_state.gemini_model = get_gemini_model(
+                GLOBAL_MODEL_NAME,
+                temperature=GLOBAL_TEMPERATURE,
+                top_p=GLOBAL_TOP_P,
+                top_k=GLOBAL_TOP_K,
+                max_output_tokens=GLOBAL_MAX_OUTPUT_TOKENS,
             )
+            # No toast: attaching the shared handle is instant, and the handle itself is logged once per process when built
             st.session_state.models_initialized = True
-            st.toast(get_text("model_init_success"), icon="✅")
-            logger.info(f"Gemini Model initialized: {GLOBAL_MODEL_NAME}")
         except Exception as e:
             st.error(get_text("model_init_error").format(error=e))
             st.session_state.models_initialized = False
             logger.error(f"Gemini model initialization error: {e}")
 
+def get_active_model():
+    """Returns the session's Gemini model, attaching the shared handle on first use (None if it failed)."""
+    if not st.session_state.models_initialized:
+        initialize_gemini_model()
+    return st.session_state.gemini_model
+
 def add_to_chat_history(chat_id, role, content):
     """Adds a message to the chat history."""
     if chat_id not in st.session_state.all_chats:
         st.session_state.all_chats[chat_id] = []
 
-    # Handle image content for storage
-    if isinstance(content, Image.Image):
-        img_byte_arr = io.BytesIO()
-        content.save(img_byte_arr, format='PNG')
-        st.session_state.all_chats[chat_id].append({"role": role, "parts": [img_byte_arr.getvalue()]})
-    elif isinstance(content, bytes):
-        st.session_state.all_chats[chat_id].append({"role": role, "parts": [content]})
-    else:
-        st.session_state.all_chats[chat_id].append({"role": role, "parts": [content]})
+    # Images are stored in the blob store; the message only keeps the content hash and metadata
+    message = {"role": role, "parts": [content if isinstance(content, str) else store_image_part(content)]}
+    try:
+        message["seq"] = get_chat_store().append(st.session_state.session_id, chat_id, role, message["parts"])
+    except Exception as e:
+        logger.error(f"Could not persist chat message: {e}")
+    st.session_state.all_chats[chat_id].append(message)
+    trim_chat_memory(chat_id)
+    if isinstance(content, str):
+        try:
+            get_chat_search().add(st.session_state.session_id, chat_id, role, content, seq=message.get("seq"))
+        except Exception as e:
+            logger.error(f"Could not index chat message for search: {e}")
 
     logger.info(f"Added to chat history: Chat ID: {chat_id}, Role: {role}, Content Type: {type(content)}")
 
+@st.cache_resource
+def get_chat_store():
+    """Persistent chat store shared by every session (SQLite by default, Postgres via CHAT_STORE_URL)."""
+    return chat_store.create_store(CHAT_STORE_URL)
+
+@st.cache_resource
+def get_chat_search():
+    """Full-text search index over the text messages of every chat (local SQLite FTS5, updated as messages arrive)."""
+    return chat_search.ChatSearchIndex()
+
+def search_chats(query):
+    """Returns ranked message hits with highlighted snippets for `query` across this session's chats."""
+    try:
+        return get_chat_search().search(st.session_state.session_id, query, limit=CHAT_SEARCH_RESULTS)
+    except Exception as e:
+        logger.error(f"Chat search failed: {e}")
+        return []
+
+def get_session_id():
+    """Returns a stable per-browser session id kept in a first-party cookie, so chats survive a refresh.
+
+    The id is the only key to a browser's stored chats, so it is kept out of the URL (links,
+    history and screenshots would leak it) and is never taken from one: a missing cookie always
+    gets a fresh id, so a crafted link cannot fix another visitor's session.
+    """
+    if "sid" in st.query_params:
+        del st.query_params["sid"]
+    sid = st.context.cookies.get(SESSION_COOKIE_NAME, "")
+    if re.fullmatch(r"[0-9a-f]{32}", sid):
+        return sid
+    sid = uuid.uuid4().hex
+    persist_session_cookie(sid)
+    return sid
+
+def persist_session_cookie(sid):
+    """Stores the session id in a cookie on the app's own origin (sent back on the next page load)."""
+    import streamlit.components.v1 as components
+
+    cookie = f"{SESSION_COOKIE_NAME}={sid}; Max-Age={SESSION_COOKIE_MAX_AGE}; Path=/; SameSite=Strict"
+    components.html(
+        f"<script>window.parent.document.cookie = '{cookie}'"
+        " + (window.parent.location.protocol === 'https:' ? '; Secure' : '');</script>",
+        height=0,
+    )
+
+def load_chat_window(chat_id):
+    """Loads the first turn and the most recent messages of a stored chat into memory and restores its summary.
+
+    Stored messages between the first turn and the recent window that the summary does not
+    cover yet are loaded too, so they stay in the model's context until they are summarised.
+    """
+    store = get_chat_store()
+    session_id = st.session_state.session_id
+    try:
+        messages = store.load_window(session_id, chat_id, CONTEXT_KEEP_FIRST_MESSAGES, CHAT_MEMORY_MAX_MESSAGES)
+        summary = store.load_summary(session_id, chat_id)
+        head = messages[:CONTEXT_KEEP_FIRST_MESSAGES]
+        if head and len(messages) > len(head):
+            covered_seq = max(summary["covered_seq"], head[-1]["seq"]) if summary else head[-1]["seq"]
+            gap = store.load_range(session_id, chat_id, covered_seq, messages[len(head)]["seq"], CHAT_HISTORY_MAX_LOADED)
+            if len(gap) == CHAT_HISTORY_MAX_LOADED:
+                logger.warning(f"Chat {chat_id} has more than {CHAT_HISTORY_MAX_LOADED} unsummarised messages outside the window.")
+            messages = head + gap + messages[len(head):]
+    except Exception as e:
+        logger.error(f"Could not load chat {chat_id} from the chat store: {e}")
+        return []
+    if summary:
+        st.session_state.chat_summaries[chat_id] = {
+            "text": summary["text"],
+            "covered": max(CONTEXT_KEEP_FIRST_MESSAGES, sum(1 for m in messages if m["seq"] <= summary["covered_seq"])),
+            "covered_seq": summary["covered_seq"],
+            "tokens": context_budget.count_text_tokens(summary["text"]),
+        }
+    return messages
+
+def trim_chat_memory(chat_id):
+    """Drops the oldest messages after the first turn once a chat exceeds CHAT_MEMORY_MAX_MESSAGES in memory.
+
+    Messages stay in the chat store, but only messages the rolling summary already covers are
+    dropped: otherwise a summary update is started and trimming waits for it, so nothing leaves
+    the model's context unsummarised. If summaries keep failing, a chat that grows a further
+    CHAT_MEMORY_MAX_MESSAGES past the limit is trimmed anyway to keep memory bounded.
+    Index-based state (converted history, chat session sync position, summary coverage) is
+    shifted so it keeps pointing at the same messages.
+    """
+    messages = st.session_state.all_chats[chat_id]
+    start = CONTEXT_KEEP_FIRST_MESSAGES
+    overflow = len(messages) - start - CHAT_MEMORY_MAX_MESSAGES
+    if overflow < CHAT_MEMORY_TRIM_BATCH:
+        return
+    summary = st.session_state.chat_summaries.get(chat_id)
+    covered = summary["covered"] if summary else start
+    if covered < start + overflow:
+        schedule_chat_summary(chat_id, messages, start + overflow)
+        if overflow < CHAT_MEMORY_MAX_MESSAGES:
+            overflow = covered - start
+            if overflow < CHAT_MEMORY_TRIM_BATCH:
+                return
+        else:
+            metrics.incr("chat_memory.unsummarised_trims")
+            logger.warning(f"Trimming {overflow - (covered - start)} unsummarised messages from chat {chat_id} to bound memory.")
+    del messages[start:start + overflow]
+    converted = st.session_state.converted_history.get(chat_id)
+    if converted is not None:
+        del converted[start:start + overflow]
+
+    def shift(index):
+        return max(start, index - overflow) if index > start else index
+
+    if st.session_state.chat_session_chat_id == chat_id:
+        st.session_state.chat_session_synced = shift(st.session_state.chat_session_synced)
+    for state in (st.session_state.chat_summaries.get(chat_id), st.session_state.pending_summaries.get(chat_id)):
+        if state is not None:
+            state["covered"] = shift(state["covered"])
+    # Older messages can be paged back in for display
+    st.session_state.older_messages.pop(chat_id, None)
+    metrics.incr("chat_memory.trimmed_messages", overflow)
+
+def load_older_messages(chat_id):
+    """Pages the next batch of older messages of a chat in from the chat store (display only)."""
+    messages = st.session_state.all_chats.get(chat_id, [])
+    start = CONTEXT_KEEP_FIRST_MESSAGES
+    older = st.session_state.older_messages.setdefault(chat_id, {"messages": [], "exhausted": False})
+    oldest = older["messages"][0] if older["messages"] else (messages[start] if len(messages) > start else None)
+    if oldest is None or "seq" not in oldest:
+        older["exhausted"] = True
+        return
+    after_seq = messages[start - 1].get("seq", 0) if len(messages) >= start else 0
+    page = get_chat_store().load_before(st.session_state.session_id, chat_id, oldest["seq"], CHAT_HISTORY_PAGE_SIZE, after_seq=after_seq)
+    older["messages"] = page + older["messages"]
+    older["exhausted"] = len(page) < CHAT_HISTORY_PAGE_SIZE or len(older["messages"]) >= CHAT_HISTORY_MAX_LOADED
+
+@st.cache_resource
+def get_blob_store():
+    """Content-addressed image store shared by every session; unreferenced blobs are collected on startup.
+
+    Blob references are kept by persisted chats, so blobs are never dropped just for being idle.
+    """
+    store = blob_store.BlobStore(decoded_cache_bytes=BLOB_DECODED_CACHE_BYTES, max_idle=None)
+    try:
+        store.gc()
+    except Exception as e:
+        logger.warning(f"Blob store garbage collection failed: {e}")
+    return store
+
+def get_user_avatar():
+    """Returns the user's avatar as a small decoded image; it is only decoded again when the avatar changes."""
+    avatar = st.session_state.user_avatar
+    if not avatar:
+        return None
+    digest = hashlib.sha1(avatar).hexdigest()
+    cached = st.session_state.user_avatar_image
+    if cached is None or cached[0] != digest:
+        from PIL import Image
+
+        try:
+            image = Image.open(io.BytesIO(avatar))
+            image.draft("RGB", image_pipeline.draft_size(image.size, AVATAR_DISPLAY_SIZE))
+            image = image_pipeline.shrink_image(image, max_side=AVATAR_DISPLAY_SIZE)
+        except Exception as e:
+            logger.warning(f"Failed to load user avatar: {e}")
+            image = None
+        cached = (digest, image)
+        st.session_state.user_avatar_image = cached
+    return cached[1]
+
+def store_image_part(image):
+    """Stores an image (prepared, PIL or encoded bytes) and returns the blob reference part for a chat message."""
+    if isinstance(image, bytes):
+        image = image_pipeline.prepare_image(image, max_side=IMAGE_MAX_SIDE, image_format=IMAGE_FORMAT, quality=IMAGE_QUALITY)
+    elif not isinstance(image, image_pipeline.PreparedImage): # PIL image
+        image = image_pipeline.shrink_image(image, max_side=IMAGE_MAX_SIDE)
+        data, mime_type = image_pipeline.encode_image(image, image_format=IMAGE_FORMAT, quality=IMAGE_QUALITY)
+        image = image_pipeline.PreparedImage(data, mime_type, image.size[0], image.size[1], len(data))
+    digest = get_blob_store().put(image.data, image.mime_type)
+    return {"blob": digest, "mime_type": image.mime_type, "width": image.width, "height": image.height, "size": len(image.data)}
+
 # The `load_chat_history` function is now redundant because initialization handles it.
 # def load_chat_history():
 #     """Loads chat history."""
 #     if st.session_state.active_chat_id not in st.session_state.all_chats:
 #         st.session_state.all_chats[st.session_state.active_chat_id] = []
 
+@st.cache_resource
+def get_knowledge():
+    """Loads the local knowledge base once per process."""
+    import knowledge_base
+
+    return knowledge_base.load_knowledge()
+
+@st.cache_resource
+def warm_up_knowledge_base():
+    """Preloads the knowledge base encoder and index in the background (once per process)."""
+    import knowledge_base
+
+    return knowledge_base.warm_up(background=True)
+
+def fill_knowledge_template(answer):
+    """Fills {name}/{date} placeholders in a knowledge base answer from session state."""
+    name = st.session_state.user_name or ("Misafir" if st.session_state.current_language == "TR" else "Guest")
+    return answer.replace("{name}", name).replace("{date}", datetime.date.today().strftime("%d.%m.%Y"))
+
+def get_knowledge_base_response(user_input):
+    """Returns a local knowledge base answer if similarity clears the threshold, otherwise None."""
+    if st.session_state.current_language not in KB_TIER_LANGUAGES:
+        return None
+    import knowledge_base
+
+    start_time = time.perf_counter()
+    try:
+        answer = knowledge_base.chatbot_response(user_input, get_knowledge())
+    except Exception as e:
+        metrics.incr("kb_tier.errors")
+        logger.error(f"Knowledge base lookup error: {e}")
+        return None
+    finally:
+        metrics.observe("kb_tier.latency", time.perf_counter() - start_time)
+
+    if answer is None:
+        metrics.incr("kb_tier.misses")
+        return None
+    metrics.incr("kb_tier.hits")
+    logger.info(f"Knowledge base answered locally (hit rate: {metrics.hit_rate('kb_tier'):.0%})")
+    return fill_knowledge_template(answer)
+
+@st.cache_resource
+def get_response_cache():
+    """Process-wide semantic cache for context-free Gemini answers."""
+    import knowledge_base
+    import semantic_cache
+
+    return semantic_cache.SemanticResponseCache(
+        encoder=knowledge_base.encode,
+        threshold=RESPONSE_CACHE_THRESHOLD,
+        ttl=RESPONSE_CACHE_TTL,
+        max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    )
+
+@st.cache_resource
+def get_vision_cache():
+    """Process-wide cache of vision answers keyed by perceptual image hash, prompt and scope (see get_vision_cache_scope)."""
+    import vision_cache
+
+    return vision_cache.VisionAnswerCache(
+        threshold=VISION_CACHE_MAX_DISTANCE,
+        ttl=VISION_CACHE_TTL,
+        max_entries=VISION_CACHE_MAX_ENTRIES,
+    )
+
+def get_vision_cache_scope(image_digest=None):
+    """Scope for vision answers.
+
+    Answers from the chat session depend on that user's conversation, so they are only
+    reused within the same browser session (near-duplicates allowed). Stateless answers
+    are also shared across sessions, but only for byte-identical images (`image_digest`).
+    """
+    if image_digest is not None:
+        return get_response_cache_scope() + ("image", image_digest)
+    return get_response_cache_scope() + ("session", st.session_state.session_id)
+
+def lookup_vision_answer(prepared, vision_prompt):
+    """Returns a cached answer for the image from this session, or a shared stateless one for the exact same image."""
+    cache = get_vision_cache()
+    # Only one hit or miss is counted per lookup, whichever scope answers it
+    answer = cache.lookup(prepared.perceptual_hash, vision_prompt, get_vision_cache_scope(), record_metrics=False)
+    if answer is not None:
+        metrics.incr(f"{cache.name}.hits")
+        return answer
+    digest = hashlib.sha256(prepared.data).hexdigest()
+    return cache.lookup(prepared.perceptual_hash, vision_prompt, get_vision_cache_scope(digest))
+
+def store_vision_answer(prepared, vision_prompt, answer, stateless=False):
+    """Caches a vision answer for this session; stateless answers are shared for the exact same image too."""
+    cache = get_vision_cache()
+    cache.store(prepared.perceptual_hash, vision_prompt, get_vision_cache_scope(), answer)
+    if stateless:
+        cache.store(prepared.perceptual_hash, vision_prompt, get_vision_cache_scope(hashlib.sha256(prepared.data).hexdigest()), answer)
+
+def get_response_cache_scope():
+    """Cached answers are only shared between users with the same language and model settings."""
+    return (st.session_state.current_language, GLOBAL_MODEL_NAME, GLOBAL_TEMPERATURE, GLOBAL_TOP_P, GLOBAL_TOP_K, GLOBAL_MAX_OUTPUT_TOKENS)
+
+def iter_cached_chunks(text, words_per_chunk=8):
+    """Splits a cached answer into chunks so it can be replayed through the streaming UI."""
+    words = re.findall(r"\S+\s*", text)
+    for i in range(0, len(words), words_per_chunk):
+        yield "".join(words[i:i + words_per_chunk])
+
+def stream_to_placeholder(chunks, response_placeholder, name="gemini_stream", start_time=None):
+    """Renders streamed text chunks into a placeholder (batched, not per chunk) and returns the full text."""
+    renderer = streaming.StreamRenderer(
+        response_placeholder,
+        min_interval=STREAM_RENDER_INTERVAL,
+        min_chars=STREAM_RENDER_MIN_CHARS,
+        name=name,
+        start_time=start_time,
+    )
+    return renderer.consume(chunks)
+
+def convert_message_for_gemini(message):
+    """Converts a stored chat message into Gemini history format.
+
+    Blob references are kept as they are, so the per-session converted history holds no
+    image bytes; they are resolved by resolve_gemini_history when a request is built.
+    Only unrecognised bytes go through PIL.
+    """
+    parts = []
+    for part in message["parts"]:
+        if blob_store.is_blob_part(part):
+            parts.append(part)
+        elif isinstance(part, bytes):
+            mime_type = image_pipeline.sniff_mime_type(part)
+            if mime_type.startswith("image/"):
+                parts.append({"mime_type": mime_type, "data": part})
+                continue
+            try:
+                from PIL import Image
+
+                parts.append(Image.open(io.BytesIO(part)))
+            except Exception as e:
+                logger.error(f"Error converting stored image bytes to PIL Image for chat history: {e}")
+                # Fallback: if image cannot be loaded, represent it as text
+                parts.append("(Uploaded Image - could not display)")
+        else:
+            parts.append(part)
+    return {"role": message["role"], "parts": parts}
+
+def resolve_gemini_history(history):
+    """Replaces blob references in converted messages with inline image parts for a Gemini request."""
+    resolved = []
+    for message in history:
+        parts = []
+        for part in message["parts"]:
+            if not blob_store.is_blob_part(part):
+                parts.append(part)
+                continue
+            try:
+                parts.append({"mime_type": part["mime_type"], "data": get_blob_store().get(part["blob"])})
+            except KeyError:
+                logger.error(f"Chat image blob {part['blob']} is missing from the blob store.")
+                parts.append("(Uploaded Image - could not display)")
+        resolved.append({"role": message["role"], "parts": parts})
+    return resolved
+
+def get_converted_history(chat_id):
+    """Returns the Gemini-format history of a chat, converting only messages added since the last call."""
+    messages = st.session_state.all_chats.get(chat_id, [])
+    converted = st.session_state.converted_history.setdefault(chat_id, [])
+    if len(converted) > len(messages): # Chat was cleared or replaced
+        converted.clear()
+    for message in messages[len(converted):]:
+        converted.append(convert_message_for_gemini(message))
+    return converted
+
+def reset_chat_session(chat_id=None):
+    """Drops the Gemini chat session (and a chat's converted history) so the next turn rebuilds it."""
+    st.session_state.chat_session = None
+    st.session_state.chat_session_chat_id = None
+    st.session_state.chat_session_synced = 0
+    st.session_state.chat_session_tokens = 0
+    if chat_id is not None:
+        st.session_state.converted_history.pop(chat_id, None)
+        st.session_state.chat_summaries.pop(chat_id, None)
+        st.session_state.pending_summaries.pop(chat_id, None)
+
+def get_summary_model():
+    """Cheaper Gemini model used for background conversation summaries (shared per process)."""
+    return get_gemini_model(SUMMARY_MODEL_NAME, temperature=0.2, max_output_tokens=SUMMARY_MAX_OUTPUT_TOKENS)
+
+def collect_chat_summary(chat_id):
+    """Stores a finished background summary with the chat. Returns True if the summary changed."""
+    pending = st.session_state.pending_summaries.get(chat_id)
+    if pending is None or not pending["future"].done():
+        return False
+    del st.session_state.pending_summaries[chat_id]
+    try:
+        text = pending["future"].result()
+    except Exception as e:
+        metrics.incr("summary.errors")
+        logger.error(f"Conversation summary error: {e}")
+        return False
+    messages = st.session_state.all_chats.get(chat_id, [])
+    covered_seq = messages[pending["covered"] - 1].get("seq") if 0 < pending["covered"] <= len(messages) else None
+    st.session_state.chat_summaries[chat_id] = {
+        "text": text,
+        "covered": pending["covered"],
+        "covered_seq": covered_seq,
+        "tokens": context_budget.count_text_tokens(text),
+    }
+    # Stored with the chat so a refresh restores it together with the message window
+    if covered_seq is not None:
+        try:
+            get_chat_store().save_summary(st.session_state.session_id, chat_id, text, covered_seq)
+        except Exception as e:
+            logger.error(f"Could not persist conversation summary for chat {chat_id}: {e}")
+    logger.info(f"Conversation summary updated for chat {chat_id} (covers {pending['covered']} messages).")
+    return True
+
+def schedule_chat_summary(chat_id, messages, covered):
+    """Extends the chat summary in the background so it covers messages up to `covered`.
+
+    Only messages not yet in the summary are sent, together with the previous summary text.
+    """
+    if chat_id in st.session_state.pending_summaries:
+        return
+    summary = st.session_state.chat_summaries.get(chat_id)
+    previous_text = summary["text"] if summary else ""
+    already_covered = summary["covered"] if summary else CONTEXT_KEEP_FIRST_MESSAGES
+    if covered <= already_covered:
+        return
+    try:
+        future = summarizer.summarize_async(get_summary_model(), previous_text, messages[already_covered:covered], max_words=SUMMARY_MAX_WORDS)
+    except Exception as e:
+        logger.error(f"Could not schedule conversation summary: {e}")
+        return
+    st.session_state.pending_summaries[chat_id] = {"future": future, "covered": covered}
+
+def summary_history_turn(summary_text):
+    """The summary is injected as a user/model exchange so the roles keep alternating."""
+    return [
+        {"role": "user", "parts": [f"Summary of our earlier conversation:\n{summary_text}"]},
+        {"role": "model", "parts": ["Understood, I will keep this context in mind."]},
+    ]
+
+def _build_chat_session(chat_id, history, target, pending_tokens):
+    """Starts a new session from the first turns plus the most recent messages that fit the token budget."""
+    messages = st.session_state.all_chats.get(chat_id, [])[:target]
+    summary = st.session_state.chat_summaries.get(chat_id)
+    summary_tokens = summary["tokens"] + 2 * context_budget.MESSAGE_OVERHEAD_TOKENS if summary else 0
+    window, window_tokens = context_budget.select_window(
+        messages,
+        budget=max(0, CONTEXT_TRIM_TARGET_TOKENS - pending_tokens - summary_tokens),
+        keep_first=CONTEXT_KEEP_FIRST_MESSAGES,
+    )
+    head = [i for i in window if i < CONTEXT_KEEP_FIRST_MESSAGES]
+    tail = window[len(head):]
+    session_history = [history[i] for i in head]
+    if len(window) < len(messages):
+        metrics.incr("chat_session.trims")
+        logger.info(f"Context window trimmed: {len(window)}/{len(messages)} messages, {window_tokens} tokens.")
+        # Older turns are replaced by the running summary, which is extended in the background
+        schedule_chat_summary(chat_id, messages, tail[0] if tail else len(messages))
+        if summary:
+            session_history += summary_history_turn(summary["text"])
+            window_tokens += summary_tokens
+    session_history += [history[i] for i in tail]
+    st.session_state.chat_session = get_active_model().start_chat(history=resolve_gemini_history(session_history))
+    st.session_state.chat_session_chat_id = chat_id
+    st.session_state.chat_session_tokens = window_tokens
+    metrics.incr("chat_session.rebuilds")
+    return st.session_state.chat_session
+
+def get_chat_session(chat_id, pending=0):
+    """Returns a Gemini chat session holding the chat's history except the last `pending` messages.
+
+    The session is kept between turns and only messages it has not seen yet are appended;
+    it is rebuilt from scratch only when there is none for this chat (new, cleared or switched chat)
+    or when the history would exceed CONTEXT_TOKEN_BUDGET, in which case a trimmed window is used.
+    """
+    messages = st.session_state.all_chats.get(chat_id, [])
+    history = get_converted_history(chat_id)
+    target = len(history) - pending
+    synced = st.session_state.chat_session_synced
+    pending_tokens = sum(context_budget.count_message_tokens(m) for m in messages[target:])
+    new_tokens = sum(context_budget.count_message_tokens(m) for m in messages[synced:target]) if synced < target else 0
+
+    session = st.session_state.get("chat_session")
+    summary_updated = collect_chat_summary(chat_id)
+    if session is None or st.session_state.chat_session_chat_id != chat_id or synced > target or summary_updated:
+        session = _build_chat_session(chat_id, history, target, pending_tokens)
+    elif st.session_state.chat_session_tokens + new_tokens + pending_tokens > CONTEXT_TOKEN_BUDGET:
+        session = _build_chat_session(chat_id, history, target, pending_tokens)
+    elif synced < target:
+        # Messages added outside the session (knowledge base, cache hits, commands)
+        session.history = session.history + resolve_gemini_history(history[synced:target])
+        st.session_state.chat_session_tokens += new_tokens
+        metrics.incr("chat_session.appends")
+    st.session_state.chat_session_synced = target
+
+    # Report what this request will send: the session history plus the new message(s)
+    st.session_state.last_request_tokens = st.session_state.chat_session_tokens + pending_tokens
+    metrics.record("context.tokens_sent", st.session_state.last_request_tokens)
+    full_tokens = sum(context_budget.count_message_tokens(m) for m in messages)
+    metrics.record("context.tokens_saved", max(0, full_tokens - st.session_state.last_request_tokens))
+    logger.info(f"Gemini request context: {st.session_state.last_request_tokens} tokens (budget {CONTEXT_TOKEN_BUDGET}).")
+    return session
+
+def mark_chat_session_synced(chat_id, extra_tokens=0):
+    """Records that the session now contains every stored message of the chat.
+
+    `extra_tokens` accounts for turns sent through the session but not stored (e.g. prompt templates).
+    """
+    if st.session_state.chat_session_chat_id == chat_id:
+        messages = st.session_state.all_chats.get(chat_id, [])
+        synced = st.session_state.chat_session_synced
+        st.session_state.chat_session_tokens += extra_tokens + sum(context_budget.count_message_tokens(m) for m in messages[synced:])
+        st.session_state.chat_session_synced = len(messages)
+
 def clear_active_chat():
     """Clears the content of the active chat."""
     if st.session_state.active_chat_id in st.session_state.all_chats:
-        st.session_state.all_chats[st.session_state.active_chat_id] = []
+        chat_id = st.session_state.active_chat_id
+        try:
+            deleted = get_chat_store().clear(st.session_state.session_id, chat_id)
+        except Exception as e:
+            logger.error(f"Could not clear chat {chat_id} in the chat store: {e}")
+            deleted = []
+        try:
+            get_chat_search().remove_chat(st.session_state.session_id, chat_id)
+        except Exception as e:
+            logger.error(f"Could not remove chat {chat_id} from the search index: {e}")
+        # Drop this chat's image references (stored and unsaved messages) so unused blobs can be garbage collected
+        unsaved = [m for m in st.session_state.all_chats[chat_id] if "seq" not in m]
+        get_blob_store().release_parts(deleted + unsaved)
+        get_blob_store().gc()
+        st.session_state.all_chats[chat_id] = []
+        st.session_state.older_messages.pop(chat_id, None)
         # Reset chat session history as well when chat is cleared
-        if "gemini_model" in st.session_state and st.session_state.gemini_model:
-            st.session_state.chat_session = st.session_state.gemini_model.start_chat(history=[])
-        else:
-            # If model isn't initialized, just remove the session
-            if "chat_session" in st.session_state:
-                del st.session_state.chat_session
+        reset_chat_session(st.session_state.active_chat_id)
         st.toast(get_text("chat_cleared_toast"), icon="🧹")
         logger.info(f"Active chat ({st.session_state.active_chat_id}) cleared.")
     st.rerun()
 
-@st.cache_data(ttl=3600)
-def duckduckgo_search(query):
-    """Performs a web search using DuckDuckGo."""
+@st.cache_resource
+def get_research_cache():
+    """Disk-backed research cache shared by every session and process using the same cache directory."""
+    return research_cache.ResearchCache(
+        ttl=RESEARCH_CACHE_TTL,
+        stale_ttl=RESEARCH_CACHE_STALE_TTL,
+        max_entries=RESEARCH_CACHE_MAX_ENTRIES,
+    )
+
+@st.cache_resource
+def get_research_prefetcher():
+    """Low-priority background pool that warms the research cache before the Research button is pressed."""
+    return research.BackgroundPrefetcher(max_workers=PREFETCH_MAX_WORKERS, max_pending=PREFETCH_MAX_PENDING)
+
+def should_prefetch_research(query):
+    """Cheap heuristic: only question-like messages of search-query length are prefetched."""
+    text = query.strip()
+    return len(text) <= PREFETCH_MAX_CHARS and len(text.split()) >= PREFETCH_MIN_WORDS and "```" not in text
+
+def prefetch_research(query):
+    """Starts research and passage ranking for `query` in the background.
+
+    Results land in the shared research cache, so opening the Research view for
+    the same query is served from the cache. Only the latest message of a session
+    is prefetched: a queued prefetch for an older message is cancelled, and the
+    prefetch is dropped entirely while the pool is saturated.
+    """
+    if not should_prefetch_research(query):
+        metrics.incr("prefetch.skipped")
+        return
+    prefetcher = get_research_prefetcher()
+    previous = st.session_state.research_prefetch
+    if previous:
+        prefetcher.cancel(previous["future"])
+    future = prefetcher.submit(run_grounding_pipeline, query, st.session_state.current_language, get_research_cache())
+    st.session_state.research_prefetch = {"query": research_cache.normalize_query(query), "future": future} if future else None
+
+def claim_research_prefetch(query):
+    """Records whether research for `query` was prefetched; waits for a prefetch that is still running."""
+    prefetch = st.session_state.research_prefetch
+    st.session_state.research_prefetch = None
+    if not prefetch or prefetch["query"] != research_cache.normalize_query(query) or prefetch["future"].cancelled():
+        metrics.incr("prefetch.misses")
+        return
+    future = prefetch["future"]
+    if future.done():
+        if future.exception() is not None:
+            # A failed prefetch left nothing in the cache
+            metrics.incr("prefetch.misses")
+            metrics.incr("prefetch.errors")
+            return
+        metrics.incr("prefetch.hits")
+        return
+    # Joining the running prefetch is cheaper than starting the same requests again
+    metrics.incr("prefetch.misses")
+    metrics.incr("prefetch.late")
     try:
-        with DDGS() as ddgs:
-            results = [r for r in ddgs.text(query, max_results=5)]
-            return results
+        future.result(timeout=GROUNDING_TIMEOUT)
     except Exception as e:
-        st.error(get_text("duckduckgo_error").format(error=e))
-        return []
+        logger.warning(f"Research prefetch did not complete: {e}")
+
+def duckduckgo_search(query):
+    """Performs a web search using DuckDuckGo (runs in a research worker thread; errors are raised)."""
+    from duckduckgo_search import DDGS
+
+    with DDGS(timeout=RESEARCH_SOURCE_TIMEOUTS["web"]) as ddgs:
+        return [r for r in ddgs.text(query, max_results=5)]
 
-@st.cache_data(ttl=3600)
 def wikipedia_search(query):
-    """Searches Wikipedia."""
+    """Searches Wikipedia (runs in a research worker thread; errors are raised)."""
+    import http_client
+
+    response = http_client.get_session().get(
+        WIKIPEDIA_API_URL,
+        params={"action": "query", "list": "search", "srsearch": query, "format": "json"},
+        timeout=(3.05, RESEARCH_SOURCE_TIMEOUTS["wiki"]),
+    )
+    response.raise_for_status()
+    data = response.json()
+    if data and "query" in data and "search" in data["query"]:
+        return data["query"]["search"]
+    return []
+
+# Research sources run concurrently in perform_combined_research; new sources only need to be registered here
+research.register_source("web", duckduckgo_search, timeout=RESEARCH_SOURCE_TIMEOUTS["web"])
+research.register_source("wiki", wikipedia_search, timeout=RESEARCH_SOURCE_TIMEOUTS["wiki"])
+
+def describe_research_error(source_name, error):
+    """Returns the localized error message for a failed research source."""
+    if source_name == "web":
+        return get_text("duckduckgo_error").format(error=error)
+    if source_name == "wiki":
+        import requests
+
+        if isinstance(error, json.JSONDecodeError):
+            return get_text("wikipedia_json_error").format(error=error)
+        if isinstance(error, requests.exceptions.RequestException):
+            return get_text("wikipedia_network_error").format(error=error)
+        return get_text("wikipedia_general_error").format(error=error)
+    return get_text("source_error").format(error=f"{source_name}: {error}")
+
+def perform_combined_research(query):
+    """Performs combined research across all registered sources concurrently.
+
+    Each source has its own deadline; slow or failing sources return no results
+    while the others are still shown.
+    """
+    results, errors, _ = research.run_sources(query, language=st.session_state.current_language, cache=get_research_cache())
+    for source_name, error in errors.items():
+        st.error(describe_research_error(source_name, error))
+    return dict(results)
+
+def rank_research_passages(query, research_results, language, cache):
+    """Returns the top passages for the research results (safe to call from worker threads)."""
+    import knowledge_base
+    import passage_retrieval
+
+    return passage_retrieval.retrieve_passages(
+        query,
+        research_results,
+        encoder=knowledge_base.encode,
+        wikipedia_api_url=WIKIPEDIA_API_URL,
+        cache=cache,
+        language=language,
+        top_k=PASSAGE_TOP_K,
+        token_budget=PASSAGE_TOKEN_BUDGET,
+        fetch_deadline=PASSAGE_FETCH_DEADLINE,
+    )
+
+def retrieve_research_passages(query, research_results):
+    """Fetches full text for the research results and returns the top passages ranked against the query."""
     try:
-        response = requests.get(f"https://en.wikipedia.org/w/api.php?action=query&list=search&srsearch={query}&format=json")
-        response.raise_for_status()
-        data = response.json()
-        if data and "query" in data and "search" in data["query"]:
-            return data["query"]["search"]
-        return []
-    except requests.exceptions.RequestException as e:
-        st.error(get_text("wikipedia_network_error").format(error=e))
-        return []
-    except json.JSONDecodeError as e:
-        st.error(get_text("wikipedia_json_error").format(error=e))
-        return []
+        return rank_research_passages(query, research_results, st.session_state.current_language, get_research_cache())
     except Exception as e:
-        st.error(get_text("wikipedia_general_error").format(error=e))
+        logger.error(f"Passage retrieval error: {e}")
+        st.error(get_text("source_error").format(error=e))
         return []
 
-def perform_combined_research(query):
-    """Performs combined web and Wikipedia research."""
-    web_results = duckduckgo_search(query)
-    wiki_results = wikipedia_search(query)
-    return {"web": web_results, "wiki": wiki_results}
+def run_grounding_pipeline(query, language, cache):
+    """Research fan-out followed by passage ranking; runs in a worker thread, so it makes no UI calls."""
+    timings = {}
+    start_time = time.perf_counter()
+    results, errors, _ = research.run_sources(query, language=language, cache=cache)
+    timings["research"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    try:
+        passages = rank_research_passages(query, results, language, cache)
+    except Exception as e:
+        errors["passages"] = e
+        passages = []
+    timings["ranking"] = time.perf_counter() - start_time
+    results = dict(results)
+    results["passages"] = passages
+    return {"results": results, "errors": errors, "timings": timings}
+
+def build_grounded_prompt(query, passages):
+    """Builds a single prompt containing the numbered passages and their sources."""
+    sources = "\n\n".join(f"[{i}] {p['title']} ({p['url']})\n{p['text']}" for i, p in enumerate(passages, start=1))
+    return (
+        "Answer the question using the numbered sources below. Cite the sources you use inline as [1], [2], ... "
+        "If the sources do not contain the answer, say so and answer from general knowledge. "
+        "Reply in the same language as the question.\n\n"
+        f"Sources:\n{sources}\n\n"
+        f"Question: {query}"
+    )
+
+def format_citations(passages):
+    """Markdown list of the sources cited in a grounded answer."""
+    lines = []
+    for i, p in enumerate(passages, start=1):
+        lines.append(f"[{i}] [{p['title']}]({p['url']})")
+    return "\n\n---\n" + "  \n".join(lines) if lines else ""
+
+def generate_grounded_answer(query):
+    """Answers with a single Gemini call grounded in ranked research passages.
+
+    Research and passage ranking run in the background while the chat history is prepared,
+    so end-to-end latency stays close to one model call. Per-stage timings are recorded.
+    If research times out or fails, the question is answered without sources instead.
+    """
+    chat_id = st.session_state.active_chat_id
+    total_start = time.perf_counter()
+    pipeline = research.submit_background(run_grounding_pipeline, query, st.session_state.current_language, get_research_cache())
+
+    with st.spinner(get_text("generating_response")):
+        try:
+            start_time = time.perf_counter()
+            chat_session = get_chat_session(chat_id, pending=1)
+            history_time = time.perf_counter() - start_time
+        except Exception as e:
+            reset_chat_session()
+            st.error(get_text("unexpected_response_error").format(error=e))
+            logger.error(f"Grounded answer error: {e}")
+            return
+
+        start_time = time.perf_counter()
+        outcome = None
+        try:
+            outcome = pipeline.result(timeout=GROUNDING_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            pipeline.cancel()
+            metrics.incr("grounded.timeouts")
+            logger.warning(f"Grounding research timed out after {GROUNDING_TIMEOUT}s, answering without sources: {query}")
+            st.warning(get_text("grounding_timeout_warning"))
+        except Exception as e:
+            metrics.incr("grounded.research_errors")
+            logger.error(f"Grounding research failed, answering without sources: {e}")
+            st.warning(get_text("grounding_failed_warning"))
+        wait_time = time.perf_counter() - start_time
+
+        passages = []
+        if outcome is not None:
+            for source_name, error in outcome["errors"].items():
+                st.warning(describe_research_error(source_name, error))
+            passages = outcome["results"]["passages"]
+            st.session_state.last_research_query = query
+            st.session_state.last_research_results = outcome["results"]
+
+        try:
+            grounded_prompt = build_grounded_prompt(query, passages) if passages else query
+            start_time = time.perf_counter()
+            response = chat_session.send_message(grounded_prompt, stream=True)
+            response_text = stream_to_placeholder((chunk.text for chunk in response), st.empty(), name="grounded_stream", start_time=start_time)
+            model_time = time.perf_counter() - start_time
+
+            add_to_chat_history(chat_id, "model", response_text + format_citations(passages))
+            # The session received the full grounded prompt rather than the stored user message
+            extra_tokens = context_budget.count_text_tokens(grounded_prompt) - context_budget.count_text_tokens(query)
+            mark_chat_session_synced(chat_id, extra_tokens=max(0, extra_tokens))
+        except Exception as e:
+            reset_chat_session()
+            st.error(get_text("unexpected_response_error").format(error=e))
+            logger.error(f"Grounded answer error: {e}")
+            return
+
+    timings = dict(outcome["timings"] if outcome else {}, history=history_time, research_wait=wait_time, model=model_time, total=time.perf_counter() - total_start)
+    for stage, seconds in timings.items():
+        metrics.observe(f"grounded.{stage}", seconds)
+    st.session_state.last_grounded_timings = {stage: round(seconds * 1000) for stage, seconds in timings.items()}
+    logger.info(f"Grounded answer stage timings (ms): {st.session_state.last_grounded_timings}")
 
 def generate_image_placeholder(prompt):
     """Image generation (example - placeholder)."""
@@ -1005,33 +1081,29 @@ def generate_image_placeholder(prompt):
 
 def generate_creative_text(prompt):
     """Generates creative text using Gemini."""
-    if st.session_state.gemini_model:
+    if get_active_model():
         with st.spinner(get_text("generating_response")):
             try:
-                # Start a fresh chat session for creative generation to avoid history influencing
-                # Use the existing chat_session for general context or create if missing
-                if "chat_session" not in st.session_state or st.session_state.chat_session is None:
-                     st.session_state.chat_session = st.session_state.gemini_model.start_chat(history=[])
+                # Use the existing chat_session for general context (created or caught up if needed)
+                chat_session = get_chat_session(st.session_state.active_chat_id)
                 
                 # Add a system instruction or a specific prompt for creative writing
                 creative_prompt_template = f"Write a creative story, poem, or script about: {prompt}"
-                response = st.session_state.chat_session.send_message(creative_prompt_template, stream=True)
+                start_time = time.perf_counter()
+                response = chat_session.send_message(creative_prompt_template, stream=True)
                 
-                response_text = ""
-                # Stream the response to the user interface
-                for chunk in response:
-                    if chunk.text:
-                        response_text += chunk.text
-                        st.session_state.last_creative_text_result = response_text
-                        # This part will be displayed in the creative_text_display area, no need for placeholder here
-                        # if st.session_state.current_view == "creative_text_display":
-                        #     st.markdown(response_text) 
+                # Collect the stream into a buffer; the result is displayed in the creative_text_display area
+                renderer = streaming.StreamRenderer(name="creative_stream", start_time=start_time)
+                response_text = renderer.consume(chunk.text for chunk in response)
+                st.session_state.last_creative_text_result = response_text
                 
                 add_to_chat_history(st.session_state.active_chat_id, "model", response_text) # Log the full generated text
+                mark_chat_session_synced(st.session_state.active_chat_id, extra_tokens=context_budget.count_text_tokens(creative_prompt_template))
                 st.session_state.current_view = "creative_text_display" # Switch to creative text display view
                 logger.info(f"Generated creative text for prompt: {prompt}")
 
             except Exception as e:
+                reset_chat_session()
                 st.error(get_text("unexpected_response_error").format(error=e))
                 logger.error(f"Gemini creative text generation error: {e}")
     else:
@@ -1041,20 +1113,38 @@ def process_image_input(uploaded_file):
     """Processes the uploaded image and converts it to text (vision)."""
     if uploaded_file is not None:
         try:
-            image = Image.open(uploaded_file)
-            add_to_chat_history(st.session_state.active_chat_id, "user", image)
-            
-            if st.session_state.gemini_model:
-                # Use the existing chat_session for vision, or create a new one if it doesn't exist
+            # One decode pass: EXIF orientation, downsizing and compact re-encoding
+            prepared = image_pipeline.prepare_image(
+                uploaded_file.getvalue(),
+                max_side=IMAGE_MAX_SIDE,
+                image_format=IMAGE_FORMAT,
+                quality=IMAGE_QUALITY,
+            )
+            add_to_chat_history(st.session_state.active_chat_id, "user", prepared)
+
+            vision_prompt = get_text("image_vision_query")
+            cached_answer = lookup_vision_answer(prepared, vision_prompt)
+            if cached_answer is not None:
+                # Same or nearly the same image was analysed before; the chat session picks both messages up on the next turn
+                add_to_chat_history(st.session_state.active_chat_id, "model", cached_answer)
+                st.session_state.current_view = "chat"
+            elif get_active_model():
+                # Use the existing chat_session for vision (the just-added image is sent, not replayed)
                 # This ensures vision context is part of the ongoing chat if desired
-                if "chat_session" not in st.session_state or st.session_state.chat_session is None:
-                    st.session_state.chat_session = st.session_state.gemini_model.start_chat(history=[])
+                chat_session = get_chat_session(st.session_state.active_chat_id, pending=1)
 
                 with st.spinner(get_text("generating_response")):
                     # Send image and prompt to the existing chat session
-                    response = st.session_state.chat_session.send_message([image, get_text("image_vision_query")])
+                    try:
+                        response = chat_session.send_message([{"mime_type": prepared.mime_type, "data": prepared.data}, vision_prompt])
+                    except Exception:
+                        reset_chat_session()
+                        raise
                     response_text = response.text
                     add_to_chat_history(st.session_state.active_chat_id, "model", response_text)
+                    mark_chat_session_synced(st.session_state.active_chat_id)
+                    # Answered in the context of this conversation, so it is not shared with other sessions
+                    store_vision_answer(prepared, vision_prompt, response_text)
                     st.session_state.current_view = "chat" # Return to chat view after vision
             else:
                 st.error(get_text("gemini_model_not_initialized"))
@@ -1062,6 +1152,80 @@ def process_image_input(uploaded_file):
             st.error(get_text("image_processing_error").format(error=e))
         st.rerun()
 
+def get_upload_id(uploaded_file):
+    """Returns a stable id for an uploaded file so that reruns do not analyse it again."""
+    return getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+
+def process_image_batch(uploaded_files):
+    """Analyses several uploaded images concurrently and adds each image with its answer to the chat.
+
+    Images are prepared in a thread pool, near-duplicates are answered from the vision
+    cache and the rest are sent as concurrent async requests, so the batch takes about
+    as long as its slowest image instead of the sum of all of them. Answers are shown as
+    they arrive but stored as (image, answer) pairs in upload order; an image whose
+    request failed or timed out gets a placeholder answer.
+    """
+    if not get_active_model():
+        st.error(get_text("gemini_model_not_initialized"))
+        return
+    batch_start = time.perf_counter()
+    chat_id = st.session_state.active_chat_id
+    vision_prompt = get_text("image_vision_query")
+    failed_text = get_text("image_analysis_failed")
+
+    entries = [] # {"name", "prepared", "answer"} in upload order
+    prepared_futures = image_pipeline.prepare_images(
+        [uploaded_file.getvalue() for uploaded_file in uploaded_files],
+        max_side=IMAGE_MAX_SIDE,
+        image_format=IMAGE_FORMAT,
+        quality=IMAGE_QUALITY,
+    )
+    for uploaded_file, future in zip(uploaded_files, prepared_futures):
+        try:
+            prepared = future.result()
+        except Exception as e:
+            st.error(get_text("image_processing_error").format(error=e))
+            continue
+        entries.append({"name": uploaded_file.name, "prepared": prepared, "answer": lookup_vision_answer(prepared, vision_prompt)})
+
+    pending = [entry for entry in entries if entry["answer"] is None]
+    if pending:
+        import vision_batch
+
+        futures = vision_batch.analyze_images(
+            get_active_model(),
+            [{"mime_type": entry["prepared"].mime_type, "data": entry["prepared"].data} for entry in pending],
+            vision_prompt,
+            max_concurrency=VISION_BATCH_CONCURRENCY,
+        )
+        owners = dict(zip(futures, pending))
+        try:
+            with st.spinner(get_text("generating_response")):
+                for future in concurrent.futures.as_completed(futures, timeout=VISION_BATCH_TIMEOUT):
+                    entry = owners[future]
+                    try:
+                        entry["answer"] = future.result()
+                    except Exception as e:
+                        logger.error(f"Vision batch request for {entry['name']} failed: {e}")
+                        st.error(get_text("image_processing_error").format(error=e))
+                        continue
+                    # Batch requests carry no chat history, so the answer may be shared for the exact same image
+                    store_vision_answer(entry["prepared"], vision_prompt, entry["answer"], stateless=True)
+                    # Show the answer right away; the rerun afterwards redraws the whole history
+                    with st.chat_message("model"):
+                        st.markdown(f"**{entry['name']}**\n\n{entry['answer']}")
+        except concurrent.futures.TimeoutError:
+            for future in futures:
+                future.cancel()
+            st.warning(get_text("image_batch_timeout"))
+
+    # Each image is immediately followed by its own answer, so history and the next chat session keep them paired
+    for entry in entries:
+        add_to_chat_history(chat_id, "user", entry["prepared"])
+        add_to_chat_history(chat_id, "model", f"**{entry['name']}**\n\n{entry['answer'] or failed_text}")
+    metrics.observe("vision_batch.wall_time", time.perf_counter() - batch_start)
+    st.session_state.current_view = "chat"
+
 # --- UI Components ---
 
 def display_welcome_and_profile_setup():
@@ -1090,11 +1254,11 @@ def display_welcome_and_profile_setup():
         st.subheader(get_text("profile_title"))
         
         if st.session_state.user_avatar:
-            try:
-                profile_image = Image.open(io.BytesIO(st.session_state.user_avatar))
+            profile_image = get_user_avatar()
+            if profile_image is not None:
                 st.image(profile_image, caption=st.session_state.user_name if st.session_state.user_name else "User", width=150)
-            except Exception as e:
-                st.warning(get_text("profile_image_load_error").format(error=e))
+            else:
+                st.warning(get_text("profile_image_load_error").format(error="invalid image"))
                 st.image("https://via.placeholder.com/150?text=Profile", width=150)
         else:
             st.image("https://via.placeholder.com/150?text=Profile", width=150)
@@ -1130,6 +1294,26 @@ def display_settings_and_personalization():
     if st.button(get_text("settings_clear_chat_button"), key="clear_active_chat_button"):
         clear_active_chat()
 
+    with st.expander(get_text("chat_search_title")):
+        query = st.text_input(get_text("chat_search_query_label"), key="chat_search_query")
+        if query.strip():
+            hits = search_chats(query)
+            if not hits:
+                st.info(get_text("chat_search_no_results"))
+            for hit in hits:
+                icon = "👤" if hit["role"] == "user" else "🤖"
+                st.markdown(f"{icon} `{hit['chat_id']}`  \n{hit['snippet']}")
+
+    with st.expander("📊 Performans" if st.session_state.current_language == "TR" else "📊 Performance"):
+        st.markdown(f"**Knowledge base hit rate:** {metrics.hit_rate('kb_tier'):.1%}")
+        st.markdown(f"**Last request context:** {st.session_state.last_request_tokens} / {CONTEXT_TOKEN_BUDGET} tokens")
+        if st.session_state.last_grounded_timings:
+            st.markdown(f"**Last grounded answer stages (ms):** {st.session_state.last_grounded_timings}")
+        st.markdown(f"**Vision cache hit rate:** {metrics.hit_rate('vision_cache'):.1%}")
+        st.markdown(f"**Research prefetch hit rate:** {metrics.hit_rate('prefetch'):.1%} (dropped: {metrics.get('prefetch.dropped')}, cancelled: {metrics.get('prefetch.cancelled')})")
+        st.markdown(f"**Research cache hit rate:** {metrics.hit_rate('research_cache'):.1%} (stale served: {metrics.get('research_cache.stale_hits')}, refreshed: {metrics.get('research_cache.refreshes')})")
+        st.json(metrics.snapshot())
+
     st.write("---")
 
 def display_about_section():
@@ -1186,6 +1370,12 @@ def display_unified_interface():
                 st.markdown(f"- **{r['title']}**: {r['snippet']}...") # Wikipedia API snippet is usually short
         else:
             st.info(get_text("wikipedia_search_no_results"))
+
+        # Passages ranked against the query from the full page/article text
+        if st.session_state.last_research_results.get("passages"):
+            st.markdown("#### " + ("En İlgili Pasajlar:" if st.session_state.current_language == "TR" else "Most Relevant Passages:"))
+            for i, p in enumerate(st.session_state.last_research_results["passages"], start=1):
+                st.markdown(f"{i}. {p['text']} — *[{p['title']}]({p['url']})*")
         
         # Add a "Close Research" button if research results are displayed
         if st.button(get_text("research_button_text_on"), key="close_research_from_display"):
@@ -1225,18 +1415,25 @@ def display_unified_interface():
         # Access the chat history for the active chat ID
         chat_messages = st.session_state.all_chats.get(st.session_state.active_chat_id, [])
 
-        # Display chat history
-        for message_data in chat_messages: # Displaying in order of addition
+        # Only a bounded window is kept in memory; older messages are paged in from the chat store on demand
+        older = st.session_state.older_messages.get(st.session_state.active_chat_id, {"messages": [], "exhausted": False})
+        if len(chat_messages) >= CONTEXT_KEEP_FIRST_MESSAGES + CHAT_MEMORY_MAX_MESSAGES and not older["exhausted"]:
+            if st.button(get_text("chat_load_older_button"), key="load_older_messages"):
+                load_older_messages(st.session_state.active_chat_id)
+                st.rerun()
+        first_turn = chat_messages[:CONTEXT_KEEP_FIRST_MESSAGES]
+        display_messages = first_turn + older["messages"] + chat_messages[CONTEXT_KEEP_FIRST_MESSAGES:]
+
+        # Display chat history (the avatar is decoded once; images come from cached, pre-sized variants)
+        render_start = time.perf_counter()
+        user_avatar = get_user_avatar()
+        for message_data in display_messages: # Displaying in order of addition
             role = message_data["role"]
             content_parts = message_data["parts"]
 
             avatar_src = None
-            if role == "user" and st.session_state.user_avatar:
-                try:
-                    avatar_src = Image.open(io.BytesIO(st.session_state.user_avatar))
-                except Exception as e:
-                    logger.warning(f"Failed to load user avatar for chat message: {e}")
-                    avatar_src = None
+            if role == "user":
+                avatar_src = user_avatar
             elif role == "model":
                 pass # Streamlit handles default AI avatar
 
@@ -1244,21 +1441,29 @@ def display_unified_interface():
                 for part in content_parts:
                     if isinstance(part, str):
                         st.markdown(part)
+                    elif blob_store.is_blob_part(part):
+                        try:
+                            st.image(get_blob_store().thumbnail(part["blob"], CHAT_IMAGE_DISPLAY_WIDTH), caption=get_text("image_upload_caption"), use_container_width=True)
+                        except Exception as e:
+                            st.warning(get_text("image_load_error").format(error=e))
                     elif isinstance(part, bytes):
                         try:
-                            image_content = Image.open(io.BytesIO(part))
                             # Changed use_column_width to use_container_width
-                            st.image(image_content, caption=get_text("image_upload_caption"), use_container_width=True)
+                            st.image(part, caption=get_text("image_upload_caption"), use_container_width=True)
                         except Exception as e:
                             st.warning(get_text("image_load_error").format(error=e))
                 # Feedback button - ensure unique key for each button
                 st.button(get_text("feedback_button"), key=f"fb_btn_{uuid.uuid4()}", on_click=lambda: st.toast(get_text("feedback_toast"), icon="🙏"))
+        metrics.observe("render_history", time.perf_counter() - render_start)
 
         # Check the *actual* chat history for the active chat ID to display the initial message
         if not chat_messages: # Initial message for empty chat
             st.info("Merhaba! Size nasıl yardımcı olabilirim? 'Resim oluştur: bir kedi' gibi komutlar veya doğrudan mesajlar kullanabilirsiniz." if st.session_state.current_language == "TR" else "Hello! How can I help you? You can use commands like 'image generate: a cat' or direct messages.")
 
 
+    # Research-grounded answer mode: chat messages are answered from ranked research passages with citations
+    st.toggle("📚 Kaynaklı yanıt" if st.session_state.current_language == "TR" else "📚 Research-grounded answers", key="grounded_mode")
+
     # --- Chat Input and Action Buttons (Research, Creative Text) ---
     col_input, col_research_btn, col_creative_btn = st.columns([6, 1.5, 1.5])
 
@@ -1293,7 +1498,10 @@ def display_unified_interface():
                     st.session_state.current_view = "research_results"
                     st.session_state.last_research_query = query_to_research
                     with st.spinner(get_text("generating_response")):
-                        st.session_state.last_research_results = perform_combined_research(query_to_research)
+                        claim_research_prefetch(query_to_research)
+                        research_results = perform_combined_research(query_to_research)
+                        research_results["passages"] = retrieve_research_passages(query_to_research, research_results)
+                        st.session_state.last_research_results = research_results
                 else:
                     st.warning(get_text("research_input_required"))
             st.rerun() # Crucial for state change to reflect immediately
@@ -1332,6 +1540,8 @@ def display_unified_interface():
 
     # Process user input if available (after button actions, as button clicks trigger reruns)
     if user_input:
+        # Only context-free turns are eligible for the semantic response cache
+        is_first_turn = not st.session_state.all_chats.get(st.session_state.active_chat_id)
         st.session_state.last_research_query = user_input # Update last research query
         st.session_state.last_creative_text_query = user_input # Update last creative text query
         add_to_chat_history(st.session_state.active_chat_id, "user", user_input)
@@ -1354,54 +1564,70 @@ def display_unified_interface():
         #     generate_creative_text(creative_prompt)
         #     st.session_state.current_view = "creative_text_display"
 
+        elif st.session_state.grounded_mode and get_active_model():
+            generate_grounded_answer(user_input)
+
         else:
+            # Local knowledge base tier: greetings and FAQs are answered without a Gemini round-trip
+            kb_answer = get_knowledge_base_response(user_input) if st.session_state.current_view == "chat" else None
+            if kb_answer is not None:
+                add_to_chat_history(st.session_state.active_chat_id, "model", kb_answer)
+
             # Regular chat interaction with Gemini (only if no specific command or view active)
             # Ensure we are in "chat" view before processing a regular chat message
-            if st.session_state.current_view == "chat" and st.session_state.gemini_model:
-                with st.spinner(get_text("generating_response")):
-                    try:
-                        # Prepare history for Gemini, handling image content
-                        processed_history = []
-                        for msg in st.session_state.all_chats[st.session_state.active_chat_id]:
-                            if msg["role"] == "user" and isinstance(msg["parts"][0], bytes):
-                                try:
-                                    processed_history.append({"role": msg["role"], "parts": [Image.open(io.BytesIO(msg["parts"][0]))]})
-                                except Exception as e:
-                                    logger.error(f"Error converting stored image bytes to PIL Image for chat history: {e}")
-                                    # Fallback: if image cannot be loaded, represent it as text
-                                    processed_history.append({"role": msg["role"], "parts": ["(Uploaded Image - could not display)"]})
-                            else:
-                                processed_history.append(msg)
-                        
-                        # Re-initialize chat_session with the complete history for consistency
-                        st.session_state.chat_session = st.session_state.gemini_model.start_chat(history=processed_history)
-
-                        response = st.session_state.chat_session.send_message(user_input, stream=True)
-                        
-                        response_text = ""
-                        response_placeholder = st.empty()
-                        for chunk in response:
-                            response_text += chunk.text
-                            with response_placeholder.container():
-                                st.markdown(response_text)
-                        
-                        add_to_chat_history(st.session_state.active_chat_id, "model", response_text)
-                        st.session_state.current_view = "chat" # Ensure chat view after response
-                    except Exception as e:
-                        st.error(get_text("unexpected_response_error").format(error=e))
-                        logger.error(f"Gemini chat response error: {e}")
-            elif not st.session_state.gemini_model:
+            elif st.session_state.current_view == "chat" and get_active_model():
+                if PREFETCH_RESEARCH:
+                    # Runs while the answer streams, so the Research button usually opens from the cache
+                    prefetch_research(user_input)
+                response_cache = get_response_cache()
+                cache_scope = get_response_cache_scope()
+                cached_answer = response_cache.lookup(user_input, cache_scope) if is_first_turn else None
+                if cached_answer is not None:
+                    # Replay the cached answer through the same streaming UI
+                    stream_to_placeholder(iter_cached_chunks(cached_answer), st.empty(), name="cache_replay")
+                    add_to_chat_history(st.session_state.active_chat_id, "model", cached_answer)
+                    logger.info("Answered first-turn prompt from the semantic response cache.")
+                else:
+                    with st.spinner(get_text("generating_response")):
+                        try:
+                            # Reuse the chat session; only messages it has not seen yet are converted and appended.
+                            # The just-added user message is excluded because it is sent below.
+                            chat_session = get_chat_session(st.session_state.active_chat_id, pending=1)
+
+                            start_time = time.perf_counter()
+                            response = chat_session.send_message(user_input, stream=True)
+                            
+                            response_placeholder = st.empty()
+                            response_text = stream_to_placeholder((chunk.text for chunk in response), response_placeholder, start_time=start_time)
+                            
+                            add_to_chat_history(st.session_state.active_chat_id, "model", response_text)
+                            mark_chat_session_synced(st.session_state.active_chat_id)
+                            if is_first_turn and response_text:
+                                response_cache.store(user_input, cache_scope, response_text)
+                            st.session_state.current_view = "chat" # Ensure chat view after response
+                        except Exception as e:
+                            reset_chat_session() # A half-finished turn leaves the session inconsistent
+                            st.error(get_text("unexpected_response_error").format(error=e))
+                            logger.error(f"Gemini chat response error: {e}")
+            elif not get_active_model():
                 st.warning(get_text("gemini_model_not_initialized"))
         st.rerun() # Rerun to display new chat messages or command results
 
     # Handle image upload separately outside the main chat_input logic
-    uploaded_file = st.file_uploader("Bir görsel yükle (AI'ya analiz ettir)" if st.session_state.current_language == "TR" else "Upload an image (for AI analysis)", type=["png", "jpg", "jpeg"], key="image_upload_for_vision")
-    if uploaded_file:
+    uploaded_files = st.file_uploader("Görsel yükle (AI'ya analiz ettir, birden fazla seçilebilir)" if st.session_state.current_language == "TR" else "Upload images (for AI analysis, multiple allowed)", type=["png", "jpg", "jpeg"], accept_multiple_files=True, key="image_upload_for_vision")
+    # The uploader keeps returning the same files on every rerun; only new ones are analysed
+    new_files = [f for f in uploaded_files or [] if get_upload_id(f) not in st.session_state.processed_upload_ids]
+    if new_files:
+        st.session_state.processed_upload_ids.update(get_upload_id(f) for f in new_files)
         # Reset other displays when image is uploaded
         st.session_state.show_research_results = False
         st.session_state.show_creative_text_results = False
         st.session_state.generated_image_url = None
-        process_image_input(uploaded_file)
+        if len(new_files) == 1:
+            process_image_input(new_files[0]) # A single image goes through the chat session to keep its context
+        else:
+            process_image_batch(new_files)
+            st.rerun()
 
 
 # --- Main Application Logic ---
@@ -1415,8 +1641,12 @@ def main():
         initial_sidebar_state="collapsed"
     )
 
+    check_translations()
     initialize_session_state()
 
+    if KB_WARMUP_ON_START:
+        warm_up_knowledge_base()
+
     # CSS injection (limited effect on Streamlit)
     st.markdown("""
         <style>
@@ -0,0 +1,88 @@
+# benchmarks/bench_chat_search.py
+#
+# Sohbet arama dizininin ölçeklenmesini ölçer: geçici bir dizine sentetik
+# (Türkçe/İngilizce karışık) mesajlar eklenir, ardından rastgele sorgular
+# çalıştırılır. Gerçekçi bir söz dağarcığı için sık sözcüklere rastgele
+# üretilmiş nadir sözcükler eklenir; hem mesajlar hem sorgular sözcükleri Zipf
+# benzeri bir dağılımla seçer. Mesaj başına dizinleme süresi ve sorgu gecikmesi
+# (alıntılar dahil) raporlanır.
+#
+# Kullanım:
+#   python benchmarks/bench_chat_search.py
+#   python benchmarks/bench_chat_search.py --messages 50000 --sessions 5 --queries 500
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chat_search  # noqa: E402
+
+WORDS = (
+    "İstanbul Işık ılık kitap kitaplarımı okul öğrenci yazılım Python veritabanı SQLite dizin arama "
+    "sonuç model görsel resim hava durumu yemek tarif çay kahve müzik film tarih coğrafya matematik "
+    "fizik kimya algoritma performans önbellek bellek sunucu istemci ağ güvenlik şifre kullanıcı "
+    "the quick brown fox answer question search index cache latency memory thread process image"
+).split()
+
+
+def make_vocabulary(rng, size):
+    """Sık sözcükler + rastgele nadir sözcükler; Zipf yasasına göre (1 / sıra) birikimli ağırlıklarla döndürür."""
+    letters = "abcçdefgğhıijklmnoöprsştuüvyz"
+    rare = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(size)]
+    vocabulary = list(WORDS) + rare
+    return vocabulary, list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+
+def pick_words(rng, vocabulary, count):
+    words, cum_weights = vocabulary
+    return rng.choices(words, cum_weights=cum_weights, k=count)
+
+
+def make_message(rng, vocabulary, length):
+    return " ".join(pick_words(rng, vocabulary, length)).capitalize() + "."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat full-text search benchmark")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    sessions = [f"{i:032x}" for i in range(args.sessions)]
+    with tempfile.TemporaryDirectory() as tmp:
+        index = chat_search.ChatSearchIndex(os.path.join(tmp, "chat_search.sqlite3"))
+
+        start = time.perf_counter()
+        for seq in range(1, args.messages + 1):
+            index.add(rng.choice(sessions), f"chat_{seq % 10}", rng.choice(("user", "model")), make_message(rng, vocabulary, rng.randint(8, 120)), seq=seq)
+        elapsed = time.perf_counter() - start
+        print(f"indexed {args.messages} messages in {elapsed:.1f} s ({elapsed / args.messages * 1e6:.0f} us / message)")
+
+        latencies, hit_counts = [], []
+        for _ in range(args.queries):
+            query = " ".join(word[:rng.randint(3, 8)] for word in pick_words(rng, vocabulary, rng.randint(1, 3)))
+            start = time.perf_counter()
+            hits = index.search(rng.choice(sessions), query, limit=args.limit)
+            latencies.append(time.perf_counter() - start)
+            hit_counts.append(len(hits))
+        latencies = np.asarray(latencies) * 1000
+        print(f"{'queries':>8} {'mean hits':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        print(f"{args.queries:>8} {np.mean(hit_counts):>10.1f} {np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} {np.percentile(latencies, 99):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_get_text.py
+#
+# Arayüz metni aramasının bir yeniden çalıştırma (rerun) başına maliyetini
+# ölçer: eski yol (her çağrıda on dilin sözlük sabitini yeniden kurmak) ile
+# i18n kataloğu (dil başına bir kez yüklenen salt okunur sözlük) karşılaştırılır.
+# Eski fonksiyon, locales/*.json içeriğinden aynı sözlük sabitiyle üretilir.
+#
+# Kullanım:
+#   python benchmarks/bench_get_text.py
+#   python benchmarks/bench_get_text.py --calls-per-rerun 80 --reruns 2000 --language EN
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import i18n  # noqa: E402
+
+
+def build_legacy_get_text():
+    """Kataloğu eski `get_text` gövdesindeki gibi her çağrıda kurulan bir sözlük sabitine çevirir."""
+    catalogs = {language: dict(i18n.load_catalog(language)) for language in i18n.available_languages()}
+    source = (
+        "def legacy_get_text(language, key):\n"
+        f"    texts = {catalogs!r}\n"
+        "    return texts.get(language, texts['TR']).get(key, 'TEXT_MISSING')\n"
+    )
+    namespace = {}
+    exec(compile(source, "<legacy_get_text>", "exec"), namespace)
+    return namespace["legacy_get_text"]
+
+
+def run(name, fn, language, keys, reruns):
+    latencies = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        for key in keys:
+            fn(language, key)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.asarray(latencies)
+    per_call_us = latencies.mean() / len(keys) * 1e6
+    print(f"{name:>8} {per_call_us:>12.2f} {np.percentile(latencies, 50) * 1000:>10.3f} {np.percentile(latencies, 99) * 1000:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="get_text per-rerun lookup benchmark")
+    parser.add_argument("--calls-per-rerun", type=int, default=60)
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--language", default="TR")
+    args = parser.parse_args()
+
+    all_keys = sorted(i18n.load_catalog(i18n.DEFAULT_LANGUAGE))
+    keys = [all_keys[i % len(all_keys)] for i in range(args.calls_per_rerun)]
+    legacy_get_text = build_legacy_get_text()
+
+    start = time.perf_counter()
+    i18n.load_catalog.cache_clear()
+    i18n.get_text(args.language, keys[0])
+    print(f"catalogue first load ({args.language}): {(time.perf_counter() - start) * 1000:.3f} ms")
+    print(f"{'method':>8} {'us / call':>12} {'p50 ms':>10} {'p99 ms':>10}   ({args.calls_per_rerun} lookups per rerun)")
+    run("legacy", legacy_get_text, args.language, keys, args.reruns)
+    run("catalog", i18n.get_text, args.language, keys, args.reruns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_image_pipeline.py
+#
+# Görsel hazırlama hattını sentetik telefon fotoğrafları üzerinde ölçer;
+# görsel başına giriş/çıkış boyutunu, kazanılan bayt oranını ve p50/p99
+# gecikmeyi eski yolla (tam çözme + kayıpsız PNG) karşılaştırır.
+#
+# Kullanım:
+#   python benchmarks/bench_image_pipeline.py
+#   python benchmarks/bench_image_pipeline.py --sizes 4032x3024 1920x1080 --format JPEG --quality 85
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import image_pipeline  # noqa: E402
+
+
+def make_photo(width, height, rng, rotated=True):
+    """Yumuşak geçişli, gürültülü bir fotoğraf benzeri JPEG üretir (isteğe bağlı EXIF döndürmeli)."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        127 + 100 * np.sin(x / width * 6.0),
+        127 + 100 * np.cos(y / height * 4.0),
+        127 + 100 * np.sin((x + y) / (width + height) * 9.0),
+    ], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    image = Image.fromarray(pixels)
+    exif = image.getexif()
+    if rotated:
+        exif[0x0112] = 6 # Telefonun dik tutulduğu çekim
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=92, exif=exif)
+    return buffer.getvalue()
+
+
+def legacy_encode(data):
+    """Önceki yol: tam çözünürlükte çözüp kayıpsız PNG olarak saklamak."""
+    buffer = io.BytesIO()
+    Image.open(io.BytesIO(data)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q) * 1000)
+
+
+def measure(fn, data, repeats):
+    latencies = []
+    output = b""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = fn(data)
+        latencies.append(time.perf_counter() - start)
+    return output, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image preprocessing bytes/latency benchmark")
+    parser.add_argument("--sizes", nargs="+", default=["4032x3024", "3000x4000", "1920x1080", "800x600"])
+    parser.add_argument("--max-side", type=int, default=image_pipeline.MAX_SIDE)
+    parser.add_argument("--format", default=image_pipeline.DEFAULT_FORMAT, choices=["WEBP", "JPEG"])
+    parser.add_argument("--quality", type=int, default=image_pipeline.DEFAULT_QUALITY)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'size':>10} {'method':>8} {'in KB':>9} {'out KB':>9} {'saved':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    for size in args.sizes:
+        width, height = (int(v) for v in size.lower().split("x"))
+        data = make_photo(width, height, rng)
+
+        def pipeline(d):
+            return image_pipeline.prepare_image(d, max_side=args.max_side, image_format=args.format, quality=args.quality).data
+
+        for method, fn in (("png", legacy_encode), ("pipeline", pipeline)):
+            output, latencies = measure(fn, data, args.repeats)
+            saved = 1 - len(output) / len(data)
+            print(f"{size:>10} {method:>8} {len(data) / 1024:>9.0f} {len(output) / 1024:>9.0f} {saved:>7.1%} "
+                  f"{percentile_ms(latencies, 50):>9.1f} {percentile_ms(latencies, 99):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/bench_startup.py
+#
+# app.py'nin açılışta içe aktardığı modüllerin maliyetini `python -X importtime`
+# ile ölçer. Streamlit'in kendisi taban çizgisi olarak önce yüklenir; ölçüm
+# yalnızca uygulamanın eklediği içe aktarmaları kapsar. Ağır bağımlılıklardan
+# biri (Gemini SDK, arama, PIL, numpy, requests, gömme/çizim kütüphaneleri)
+# açılışta yüklenirse ya da süre bütçesi aşılırsa çıkış kodu 1 olur.
+#
+# Kullanım:
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --budget-ms 150 --top 20
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORBIDDEN_MODULES = (
+    "google.generativeai",
+    "duckduckgo_search",
+    "PIL",
+    "numpy",
+    "requests",
+    "bs4",
+    "tiktoken",
+    "sentence_transformers",
+    "torch",
+    "sklearn",
+    "matplotlib",
+)
+
+CHILD_SCRIPT = """
+import json, sys
+try:
+    import streamlit
+except ImportError:
+    pass
+baseline = set(sys.modules)
+print("--- app imports ---", file=sys.stderr, flush=True)
+for name in {modules!r}:
+    __import__(name)  # -X importtime yalnızca __import__ yolunu ölçer (importlib.import_module görünmez)
+print(json.dumps(sorted(set(sys.modules) - baseline)))
+"""
+
+
+def startup_modules(app_path):
+    """app.py'nin modül düzeyindeki içe aktarmalarını sırasıyla döndürür (streamlit hariç)."""
+    with open(app_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return [m for m in modules if m.split(".")[0] != "streamlit"]
+
+
+def parse_importtime(stderr):
+    """Taban çizgisinden sonraki `import time:` satırlarını (modül, öz, toplam µs, derinlik) olarak döndürür."""
+    rows = []
+    measuring = False
+    for line in stderr.splitlines():
+        if line.startswith("--- app imports ---"):
+            measuring = True
+            continue
+        if not measuring or not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time benchmark for app.py")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Max total import time added by app.py")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    modules = startup_modules(args.app)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT.format(modules=modules)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(result.returncode)
+
+    rows = parse_importtime(result.stderr)
+    loaded = set(ast.literal_eval(result.stdout.strip().splitlines()[-1]))
+    total_ms = sum(self_us for _, self_us, _, _ in rows) / 1000
+
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    for name, _, cumulative_us, _ in sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[:args.top]:
+        print(f"{name:<40} {cumulative_us / 1000:>14.1f}")
+    print(f"\ntotal import time added by app.py: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    forbidden = [f for f in FORBIDDEN_MODULES if any(m == f or m.startswith(f + ".") for m in loaded)]
+    failed = False
+    if forbidden:
+        print(f"FAIL: heavy modules loaded at startup: {', '.join(forbidden)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("FAIL: startup import budget exceeded")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_vector_search.py
+#
+# Exact ve IVF vektör arama arka uçlarını sentetik, kümelenmiş gömmeler
+# üzerinde karşılaştırır; recall@k ile p50/p99 sorgu gecikmesini raporlar.
+#
+# Kullanım:
+#   python benchmarks/bench_vector_search.py
+#   python benchmarks/bench_vector_search.py --sizes 1000 100000 --n-probe 4 8 16
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vector_search  # noqa: E402
+
+
+def make_embeddings(n, dim, rng, n_topics=None, chunk=100000):
+    """Gerçek cümle gömmelerine benzer şekilde konulara kümelenmiş birim vektörler üretir."""
+    n_topics = n_topics or max(8, int(np.sqrt(n)))
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, chunk):
+        size = min(chunk, n - start)
+        block = topics[rng.integers(0, n_topics, size)] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+        out[start:start + size] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return out
+
+
+def make_queries(embeddings, n_queries, rng):
+    """Var olan vektörlerin gürültülü kopyalarından sorgular üretir."""
+    base = embeddings[rng.integers(0, len(embeddings), n_queries)]
+    noisy = base + 0.3 * rng.standard_normal(base.shape).astype(np.float32)
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q) * 1000)
+
+
+def run(size, dim, k, n_queries, n_probes, seed):
+    rng = np.random.default_rng(seed)
+    embeddings = make_embeddings(size, dim, rng)
+    queries = make_queries(embeddings, n_queries, rng)
+
+    exact = vector_search.ExactIndex(embeddings)
+    truth = []
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        ids, _ = exact.search(q, k=k)
+        latencies.append(time.perf_counter() - start)
+        truth.append(set(ids.tolist()))
+    print(f"{size:>9} {'exact':>10} {'-':>7} {1.0:>9.3f} {percentile_ms(latencies, 50):>9.3f} {percentile_ms(latencies, 99):>9.3f}")
+
+    start = time.perf_counter()
+    ivf = vector_search.IVFIndex(embeddings, seed=seed)
+    build_s = time.perf_counter() - start
+    for n_probe in n_probes:
+        hits = 0
+        latencies = []
+        for q, expected in zip(queries, truth):
+            start = time.perf_counter()
+            ids, _ = ivf.search(q, k=k, n_probe=n_probe)
+            latencies.append(time.perf_counter() - start)
+            hits += len(expected.intersection(ids.tolist()))
+        recall = hits / (k * len(queries))
+        print(f"{size:>9} {'ivf':>10} {n_probe:>7} {recall:>9.3f} {percentile_ms(latencies, 50):>9.3f} {percentile_ms(latencies, 99):>9.3f}")
+    print(f"{'':>9} (ivf build: {build_s:.1f}s, {ivf.n_lists} lists)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector search recall/latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'keys':>9} {'backend':>10} {'n_probe':>7} {'recall@' + str(args.k):>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for size in args.sizes:
+        run(size, args.dim, args.k, args.queries, args.n_probe, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# blob_store.py
+#
+# Sohbet görselleri için içerik adresli (sha256) disk deposu. Sohbet mesajları
+# görsel baytlarını değil yalnızca özeti ve meta verileri taşır:
+#
+#   {"blob": "<sha256>", "mime_type": "image/webp", "width": 1024, "height": 768, "size": 81234}
+#
+# - Aynı içerik bir kez yazılır; her ekleme referans sayısını artırır
+# - Referans sayıları SQLite'ta tutulur, böylece tüm süreçler aynı depoyu paylaşır
+# - `gc()` referansı kalmayan (ve uzun süredir kullanılmayan) blob'ları siler
+# - Çözülmüş görseller ve ekran boyutlu küçük kopyalar bayt sınırlı LRU önbelleklerde tutulur
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+import sqlite_local
+
+logger = logging.getLogger(__name__)
+
+DISPLAY_WIDTHS = (256, 512, 768, 1024) # Ekran için üretilen küçük kopya genişlikleri
+
+DEFAULT_BLOB_DIR = os.path.join(
+    os.environ.get("HANOGT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")),
+    "blobs",
+)
+
+
+def is_blob_part(part):
+    """Mesaj parçasının bir blob referansı olup olmadığını döndürür."""
+    return isinstance(part, dict) and "blob" in part
+
+
+class BlobStore:
+    """Referans sayımlı, içerik adresli blob deposu.
+
+    - `root`: blob dosyalarının ve SQLite dizininin bulunduğu klasör
+    - `decoded_cache_bytes`: çözülmüş görseller önbelleğinin piksel bellek sınırı (genişlik * yükseklik * bant)
+    - `thumbnail_cache_bytes`: ekran kopyaları önbelleğinin bayt sınırı
+    - `gc_grace`: referansı sıfırlanan blob'un silinmeden önce beklediği süre (saniye)
+    - `max_idle`: referansı kalsa bile bu süre boyunca okunmayan blob'lar silinir
+      (kapanan oturumların bıraktığı referanslar için); None ise bu kural uygulanmaz
+    """
+
+    def __init__(self, root=None, decoded_cache_bytes=32 * 1024 * 1024, thumbnail_cache_bytes=64 * 1024 * 1024,
+                 gc_grace=3600, max_idle=7 * 24 * 3600):
+        self.root = root or DEFAULT_BLOB_DIR
+        self.decoded_cache_bytes = decoded_cache_bytes
+        self.thumbnail_cache_bytes = thumbnail_cache_bytes
+        self.gc_grace = gc_grace
+        self.max_idle = max_idle
+        self._connect = sqlite_local.ThreadLocalConnection(os.path.join(self.root, "blobs.sqlite3"))
+        self._decoded = OrderedDict()
+        self._decoded_bytes = 0
+        self._decoded_lock = threading.Lock()
+        self._thumbnails = OrderedDict()
+        self._thumbnail_bytes = 0
+        os.makedirs(self.root, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                " hash TEXT PRIMARY KEY,"
+                " mime_type TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " refs INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " released_at REAL)"
+            )
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def put(self, data, mime_type):
+        """Baytları kaydeder (zaten varsa yeniden yazmaz), referans sayısını artırır ve özeti döndürür."""
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        # Referans dosyadan önce yazılır. gc() satırı silip dosyayı kaldırana kadar yazma kilidini tuttuğundan
+        # bu INSERT ya gc()'den önce işlenir (gc silmez) ya da sonra (dosya artık yoktur ve aşağıda yeniden yazılır)
+        self._connect().execute(
+            "INSERT INTO blobs (hash, mime_type, size, refs, created_at, accessed_at) VALUES (?, ?, ?, 1, ?, ?)"
+            " ON CONFLICT(hash) DO UPDATE SET refs = refs + 1, accessed_at = excluded.accessed_at, released_at = NULL",
+            (digest, mime_type, len(data), now, now),
+        )
+        path = self._path(digest)
+        if os.path.exists(path):
+            metrics.incr("blob_store.dedup_hits")
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yazılır
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            metrics.incr("blob_store.bytes_written", len(data))
+        return digest
+
+    def get(self, digest):
+        """Blob baytlarını döndürür; blob yoksa KeyError fırlatır."""
+        try:
+            with open(self._path(digest), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            raise KeyError(digest) from None
+        self._connect().execute("UPDATE blobs SET accessed_at = ? WHERE hash = ?", (time.time(), digest))
+        return data
+
+    def open_image(self, digest):
+        """Blob'u çözülmüş bir PIL görseli olarak döndürür (LRU önbellekten)."""
+        with self._decoded_lock:
+            image = self._decoded.get(digest)
+            if image is not None:
+                self._decoded.move_to_end(digest)
+                metrics.incr("blob_store.decoded_hits")
+                return image
+        metrics.incr("blob_store.decoded_misses")
+
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(self.get(digest)))
+        image.load()
+        size = self._pixel_bytes(image)
+        # Sınırdan büyük görseller önbelleğe alınmaz; tek başına tüm önbelleği boşaltırdı
+        if size <= self.decoded_cache_bytes:
+            with self._decoded_lock:
+                if digest not in self._decoded:
+                    self._decoded[digest] = image
+                    self._decoded_bytes += size
+                while self._decoded_bytes > self.decoded_cache_bytes:
+                    _, evicted = self._decoded.popitem(last=False)
+                    self._decoded_bytes -= self._pixel_bytes(evicted)
+        return image
+
+    @staticmethod
+    def _pixel_bytes(image):
+        return image.size[0] * image.size[1] * len(image.getbands())
+
+    def thumbnail(self, digest, width):
+        """Görselin `width` genişliğine uygun, kodlanmış ekran kopyasını döndürür.
+
+        Genişlik DISPLAY_WIDTHS içindeki bir sonraki boyuta yuvarlanır; böylece
+        (özet, genişlik) başına tek bir kopya üretilir. Görsel zaten o boyuttan
+        küçükse saklanan baytlar olduğu gibi döndürülür.
+        """
+        width = next((w for w in DISPLAY_WIDTHS if w >= width), DISPLAY_WIDTHS[-1])
+        key = (digest, width)
+        with self._decoded_lock:
+            data = self._thumbnails.get(key)
+            if data is not None:
+                self._thumbnails.move_to_end(key)
+                metrics.incr("blob_store.thumbnail_hits")
+                return data
+        metrics.incr("blob_store.thumbnail_misses")
+
+        image = self.open_image(digest)
+        if image.size[0] <= width:
+            data = self.get(digest)
+        else:
+            from PIL import Image
+
+            variant = image.copy()
+            variant.thumbnail((width, width * image.size[1] // image.size[0] + 1), Image.LANCZOS)
+            if variant.mode not in ("RGB", "RGBA"):
+                variant = variant.convert("RGBA" if "A" in variant.getbands() else "RGB")
+            buffer = io.BytesIO()
+            variant.save(buffer, format="WEBP", quality=80, method=4)
+            data = buffer.getvalue()
+        with self._decoded_lock:
+            if key not in self._thumbnails:
+                self._thumbnails[key] = data
+                self._thumbnail_bytes += len(data)
+            while self._thumbnail_bytes > self.thumbnail_cache_bytes and len(self._thumbnails) > 1:
+                _, evicted = self._thumbnails.popitem(last=False)
+                self._thumbnail_bytes -= len(evicted)
+        return data
+
+    def release(self, digest):
+        """Referans sayısını bir azaltır; sıfıra inen blob'lar `gc()` ile silinir."""
+        self._connect().execute(
+            "UPDATE blobs SET refs = MAX(refs - 1, 0),"
+            " released_at = CASE WHEN refs <= 1 THEN ? ELSE released_at END WHERE hash = ?",
+            (time.time(), digest),
+        )
+
+    def release_parts(self, messages):
+        """Mesaj listesindeki tüm blob referanslarını bırakır."""
+        for message in messages:
+            for part in message.get("parts", []):
+                if is_blob_part(part):
+                    self.release(part["blob"])
+
+    def gc(self):
+        """Referansı kalmayan ya da uzun süredir okunmayan blob'ları siler; silinen sayıyı döndürür."""
+        now = time.time()
+        conn = self._connect()
+        condition = "(refs <= 0 AND released_at < ?) OR accessed_at < ?"
+        params = (now - self.gc_grace, now - self.max_idle if self.max_idle is not None else 0)
+        deleted = 0
+        for (digest,) in conn.execute(f"SELECT hash FROM blobs WHERE {condition}", params).fetchall():
+            # Satırın silinmesi ve dosyanın kaldırılması tek bir yazma işleminde yapılır (BEGIN IMMEDIATE, süreçler
+            # arası kilit); eşzamanlı bir put() satırı ancak dosya kaldırıldıktan sonra yeniden ekleyebilir
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Koşul yeniden denetlenir: seçimden sonra blob'a yeni bir referans eklenmiş olabilir
+                if conn.execute(f"DELETE FROM blobs WHERE hash = ? AND ({condition})", (digest, *params)).rowcount == 0:
+                    conn.execute("COMMIT")
+                    continue
+                try:
+                    os.remove(self._path(digest))
+                except FileNotFoundError:
+                    pass
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            with self._decoded_lock:
+                image = self._decoded.pop(digest, None)
+                if image is not None:
+                    self._decoded_bytes -= self._pixel_bytes(image)
+                for key in [k for k in self._thumbnails if k[0] == digest]:
+                    self._thumbnail_bytes -= len(self._thumbnails.pop(key))
+            deleted += 1
+        if deleted:
+            metrics.incr("blob_store.gc_deleted", deleted)
+            logger.info(f"Blob store garbage collection removed {deleted} blobs.")
+        return deleted
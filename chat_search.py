@@ -0,0 +1,152 @@
+# chat_search.py
+#
+# Tüm sohbetler üzerinde tam metin arama. Mesajlar geldikçe (artımlı olarak)
+# SQLite FTS5 ters dizinine eklenir; arama bm25 ile sıralanmış mesaj isabetleri
+# ve özgün metinden kesilmiş, eşleşmeleri vurgulanmış kısa alıntılar döndürür.
+#
+# Büyük/küçük harf katlaması Türkçe kurallarına göre yapılır (İ -> i, I -> ı);
+# FTS5'in kendi unicode61 katlaması "I"yı "i"ye çevirdiğinden metin dizine
+# yazılmadan önce burada katlanıp sözcüklere ayrılır ve sorgu da aynı yoldan geçer.
+# Sözcük başı önek eşleşmesi kullanılır: "kitap" araması "kitaplarımı"yı da bulur.
+
+import logging
+import os
+import re
+
+import metrics
+import sqlite_local
+from chat_store import DEFAULT_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_CHARS = 160 # Alıntının yaklaşık uzunluğu (karakter)
+
+_TURKISH_UPPER = str.maketrans({"İ": "i", "I": "ı"})
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def fold_case(text):
+    """Metni Türkçe kurallarıyla küçük harfe çevirir; uzunluk korunur (karakter konumları özgün metinle eşleşir)."""
+    text = text.translate(_TURKISH_UPPER)
+    folded = text.lower()
+    if len(folded) != len(text):
+        # Birkaç karakterin küçük hâli birden çok karakterdir; bunlar olduğu gibi bırakılır
+        folded = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    return folded
+
+
+def tokenize(text):
+    """Metni katlanmış sözcüklere ayırır."""
+    return _WORD_RE.findall(fold_case(text))
+
+
+def build_snippet(text, terms, width=SNIPPET_CHARS):
+    """Özgün metinden ilk eşleşmenin çevresini keser ve eşleşen sözcükleri **kalın** yapar."""
+    text = " ".join(text.split())
+    folded = fold_case(text)
+    pattern = re.compile(r"(?<![^\W_])(?:" + "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)) + r")[^\W_]*")
+    first = pattern.search(folded)
+    anchor = first.start() if first else 0
+    start = max(0, anchor - width // 3)
+    if start > 0:
+        # Alıntı bir sözcüğün ortasından başlamasın
+        space = text.find(" ", start, anchor)
+        start = space + 1 if space >= 0 else start
+    end = min(len(text), start + width)
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        end = space if space > start else end
+
+    parts, position = [], start
+    for match in pattern.finditer(folded, start, end):
+        parts.append(text[position:match.start()])
+        parts.append(f"**{text[match.start():match.end()]}**")
+        position = match.end()
+    parts.append(text[position:end])
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+class ChatSearchIndex:
+    """SQLite FTS5 tabanlı, artımlı sohbet arama dizini (WAL kipi, iş parçacığı başına bağlantı).
+
+    `search_docs` mesajın özgün metnini ve konumunu (oturum, sohbet, seq) tutar;
+    `search_fts` aynı rowid ile katlanmış sözcükleri ve oturum kimliğini dizinler.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_DATA_DIR, "chat_search.sqlite3")
+        self._connect = sqlite_local.ThreadLocalConnection(self.path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_docs ("
+            " id INTEGER PRIMARY KEY,"
+            " session_id TEXT NOT NULL,"
+            " chat_id TEXT NOT NULL,"
+            " seq INTEGER,"
+            " role TEXT NOT NULL,"
+            " text TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS search_docs_chat ON search_docs (session_id, chat_id)")
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(body, sid, tokenize = 'unicode61 remove_diacritics 0')")
+
+    def add(self, session_id, chat_id, role, text, seq=None):
+        """Bir metin mesajını dizine ekler."""
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        conn = self._connect()
+        with metrics.timed("chat_search.index_latency"):
+            conn.execute("BEGIN")
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO search_docs (session_id, chat_id, seq, role, text) VALUES (?, ?, ?, ?, ?)",
+                    (session_id, chat_id, seq, role, text),
+                )
+                conn.execute("INSERT INTO search_fts (rowid, body, sid) VALUES (?, ?, ?)", (cursor.lastrowid, " ".join(tokens), session_id))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        metrics.incr("chat_search.indexed")
+
+    def remove_chat(self, session_id, chat_id):
+        """Bir sohbetin tüm mesajlarını dizinden siler."""
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            conn.execute(
+                "DELETE FROM search_fts WHERE rowid IN (SELECT id FROM search_docs WHERE session_id = ? AND chat_id = ?)",
+                (session_id, chat_id),
+            )
+            conn.execute("DELETE FROM search_docs WHERE session_id = ? AND chat_id = ?", (session_id, chat_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def search(self, session_id, query, limit=20):
+        """Oturumun mesajlarında `query`'yi arar.
+
+        Tüm sorgu sözcüklerini (önek olarak) içeren mesajları bm25 sırasıyla,
+        {"chat_id", "seq", "role", "score", "snippet"} sözlükleri olarak döndürür.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        # Sözcükler yalnızca harf/rakam içerdiğinden tırnak içinde güvenle sorguya yazılabilir
+        sid = session_id.replace('"', '""')
+        match = f'sid : "{sid}" AND body : (' + " ".join(f'"{term}"*' for term in terms) + ")"
+        with metrics.timed("chat_search.latency"):
+            rows = self._connect().execute(
+                "SELECT d.chat_id, d.seq, d.role, d.text, bm25(search_fts, 1.0, 0.0) AS rank"
+                " FROM search_fts JOIN search_docs d ON d.id = search_fts.rowid"
+                " WHERE search_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match, limit),
+            ).fetchall()
+            hits = [
+                {"chat_id": chat_id, "seq": seq, "role": role, "score": -rank, "snippet": build_snippet(text, terms)}
+                for chat_id, seq, role, text, rank in rows
+            ]
+        metrics.incr("chat_search.queries")
+        return hits
@@ -0,0 +1,221 @@
+# chat_store.py
+#
+# Sohbet mesajları için kalıcı depolama. Varsayılan arka uç SQLite'tır;
+# `postgresql://` adresi verilirse Postgres (ör. Supabase) bir bağlantı havuzu
+# üzerinden kullanılır. Mesajlar yalnızca eklenir (append-only); oturum belleğine
+# sohbetin ilk turu ve son N mesaj yüklenir, daha eskiler istendiğinde sayfa
+# sayfa okunur.
+#
+# Mesaj parçaları JSON olarak saklanır: metin parçaları dize, görseller ise
+# blob_store referanslarıdır ({"blob": ..., "mime_type": ..., ...}). Sohbetin
+# süregelen özeti de sohbetle birlikte, kapsadığı son mesajın seq'iyle saklanır.
+
+import abc
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import sqlite_local
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.environ.get("HANOGT_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data"))
+
+
+def _row_to_message(row):
+    seq, role, parts = row
+    return {"seq": seq, "role": role, "parts": json.loads(parts)}
+
+
+def _dump_parts(parts):
+    return json.dumps(parts, ensure_ascii=False)
+
+
+class ChatStore(abc.ABC):
+    """Arka uçtan bağımsız sohbet deposu arayüzü.
+
+    Alt sınıflar `_execute(sql, params, fetch)` sağlar; SQL yer tutucuları `?`
+    ile yazılır ve gerekirse arka uca göre çevrilir. Sohbetler (oturum, sohbet)
+    çiftiyle anahtarlanır; oturum kimliği tarayıcı yenilemelerinde sabit kalır.
+    """
+
+    @abc.abstractmethod
+    def append(self, session_id, chat_id, role, parts):
+        """Mesajı ekler ve sıra numarasını (seq) döndürür."""
+
+    @abc.abstractmethod
+    def _execute(self, sql, params=(), fetch=False):
+        """`sql`'i çalıştırır; `fetch` ise tüm satırları döndürür."""
+
+    def load_first(self, session_id, chat_id, limit):
+        """Sohbetin ilk `limit` mesajını eskiden yeniye döndürür."""
+        rows = self._execute(
+            "SELECT id, role, parts FROM chat_messages WHERE session_id = ? AND chat_id = ? ORDER BY id LIMIT ?",
+            (session_id, chat_id, limit), fetch=True,
+        )
+        return [_row_to_message(row) for row in rows]
+
+    def load_recent(self, session_id, chat_id, limit, after_seq=0):
+        """Sohbetin son `limit` mesajını (seq > after_seq) eskiden yeniye döndürür."""
+        rows = self._execute(
+            "SELECT id, role, parts FROM chat_messages WHERE session_id = ? AND chat_id = ? AND id > ? ORDER BY id DESC LIMIT ?",
+            (session_id, chat_id, after_seq, limit), fetch=True,
+        )
+        return [_row_to_message(row) for row in reversed(rows)]
+
+    def load_before(self, session_id, chat_id, before_seq, limit, after_seq=0):
+        """`before_seq`'ten önceki (ve `after_seq`'ten sonraki) en fazla `limit` mesajı eskiden yeniye döndürür."""
+        rows = self._execute(
+            "SELECT id, role, parts FROM chat_messages"
+            " WHERE session_id = ? AND chat_id = ? AND id < ? AND id > ? ORDER BY id DESC LIMIT ?",
+            (session_id, chat_id, before_seq, after_seq, limit), fetch=True,
+        )
+        return [_row_to_message(row) for row in reversed(rows)]
+
+    def load_range(self, session_id, chat_id, after_seq, before_seq, limit):
+        """`after_seq` ile `before_seq` arasındaki ilk `limit` mesajı eskiden yeniye döndürür."""
+        rows = self._execute(
+            "SELECT id, role, parts FROM chat_messages"
+            " WHERE session_id = ? AND chat_id = ? AND id > ? AND id < ? ORDER BY id LIMIT ?",
+            (session_id, chat_id, after_seq, before_seq, limit), fetch=True,
+        )
+        return [_row_to_message(row) for row in rows]
+
+    def load_window(self, session_id, chat_id, keep_first, recent):
+        """Oturum belleği için ilk `keep_first` mesajı ve son `recent` mesajı döndürür."""
+        first = self.load_first(session_id, chat_id, keep_first)
+        after = first[-1]["seq"] if first else 0
+        return first + self.load_recent(session_id, chat_id, recent, after_seq=after)
+
+    def clear(self, session_id, chat_id):
+        """Sohbetin tüm mesajlarını siler ve silinen mesajları döndürür (blob referanslarını bırakmak için)."""
+        rows = self._execute(
+            "SELECT id, role, parts FROM chat_messages WHERE session_id = ? AND chat_id = ? ORDER BY id",
+            (session_id, chat_id), fetch=True,
+        )
+        self._execute("DELETE FROM chat_messages WHERE session_id = ? AND chat_id = ?", (session_id, chat_id))
+        self._execute("DELETE FROM chat_summaries WHERE session_id = ? AND chat_id = ?", (session_id, chat_id))
+        return [_row_to_message(row) for row in rows]
+
+    def save_summary(self, session_id, chat_id, text, covered_seq):
+        """Sohbetin özetini, kapsadığı son mesajın seq'iyle birlikte kaydeder (varsa üzerine yazar)."""
+        self._execute(
+            "INSERT INTO chat_summaries (session_id, chat_id, text, covered_seq, updated_at) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (session_id, chat_id) DO UPDATE SET"
+            " text = excluded.text, covered_seq = excluded.covered_seq, updated_at = excluded.updated_at",
+            (session_id, chat_id, text, covered_seq, time.time()),
+        )
+
+    def load_summary(self, session_id, chat_id):
+        """Sohbetin kayıtlı özetini {"text", "covered_seq"} olarak döndürür; yoksa None."""
+        rows = self._execute(
+            "SELECT text, covered_seq FROM chat_summaries WHERE session_id = ? AND chat_id = ?",
+            (session_id, chat_id), fetch=True,
+        )
+        return {"text": rows[0][0], "covered_seq": rows[0][1]} if rows else None
+
+
+class SQLiteChatStore(ChatStore):
+    """Tek dosyalı SQLite deposu (WAL kipi, iş parçacığı başına bağlantı)."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_DATA_DIR, "chats.sqlite3")
+        self._connect = sqlite_local.ThreadLocalConnection(self.path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_messages ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " session_id TEXT NOT NULL,"
+            " chat_id TEXT NOT NULL,"
+            " role TEXT NOT NULL,"
+            " parts TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS chat_messages_chat ON chat_messages (session_id, chat_id, id)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_summaries ("
+            " session_id TEXT NOT NULL,"
+            " chat_id TEXT NOT NULL,"
+            " text TEXT NOT NULL,"
+            " covered_seq INTEGER NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (session_id, chat_id))"
+        )
+
+    def _execute(self, sql, params=(), fetch=False):
+        cursor = self._connect().execute(sql, params)
+        return cursor.fetchall() if fetch else None
+
+    def append(self, session_id, chat_id, role, parts):
+        cursor = self._connect().execute(
+            "INSERT INTO chat_messages (session_id, chat_id, role, parts, created_at) VALUES (?, ?, ?, ?, ?)",
+            (session_id, chat_id, role, _dump_parts(parts), time.time()),
+        )
+        return cursor.lastrowid
+
+
+class PostgresChatStore(ChatStore):
+    """psycopg2 ThreadedConnectionPool üzerinden çalışan Postgres deposu."""
+
+    def __init__(self, dsn, min_connections=1, max_connections=10):
+        from psycopg2.pool import ThreadedConnectionPool
+
+        self._pool = ThreadedConnectionPool(min_connections, max_connections, dsn)
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS chat_messages ("
+            " id BIGSERIAL PRIMARY KEY,"
+            " session_id TEXT NOT NULL,"
+            " chat_id TEXT NOT NULL,"
+            " role TEXT NOT NULL,"
+            " parts TEXT NOT NULL,"
+            " created_at DOUBLE PRECISION NOT NULL)"
+        )
+        self._execute("CREATE INDEX IF NOT EXISTS chat_messages_chat ON chat_messages (session_id, chat_id, id)")
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS chat_summaries ("
+            " session_id TEXT NOT NULL,"
+            " chat_id TEXT NOT NULL,"
+            " text TEXT NOT NULL,"
+            " covered_seq BIGINT NOT NULL,"
+            " updated_at DOUBLE PRECISION NOT NULL,"
+            " PRIMARY KEY (session_id, chat_id))"
+        )
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    def _execute(self, sql, params=(), fetch=False):
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.execute(sql.replace("?", "%s"), params)
+            return cursor.fetchall() if fetch else None
+
+    def append(self, session_id, chat_id, role, parts):
+        rows = self._execute(
+            "INSERT INTO chat_messages (session_id, chat_id, role, parts, created_at) VALUES (?, ?, ?, ?, ?) RETURNING id",
+            (session_id, chat_id, role, _dump_parts(parts), time.time()), fetch=True,
+        )
+        return rows[0][0]
+
+    def close(self):
+        self._pool.closeall()
+
+
+def create_store(url=None):
+    """Adrese göre depo oluşturur: boş ya da `sqlite:///yol` -> SQLite, `postgres(ql)://...` -> Postgres."""
+    if url and url.startswith(("postgres://", "postgresql://")):
+        logger.info("Using Postgres chat store.")
+        return PostgresChatStore(url)
+    path = url[len("sqlite:///"):] if url and url.startswith("sqlite:///") else None
+    return SQLiteChatStore(path)
@@ -0,0 +1,77 @@
+# context_budget.py
+#
+# Sohbet geçmişi için token hesabı ve bütçe penceresi. Her mesajın token
+# sayısı bir kez hesaplanıp mesajın üzerinde ("tokens" alanı) saklanır.
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Gemini'nin kendi tokenizer'ı yerel olarak bulunmadığı için cl100k_base yaklaşık sayım için kullanılır
+TOKENIZER_ENCODING = "cl100k_base"
+IMAGE_TOKEN_COST = 258 # Gemini'nin görsel başına saydığı sabit token
+MESSAGE_OVERHEAD_TOKENS = 4 # Rol ve ayırıcılar için mesaj başına ek maliyet
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken kodlamasını ilk kullanımda yükler; yüklenemezse False döndürür."""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+                except Exception as e:
+                    logger.warning(f"tiktoken unavailable, falling back to character-based estimate: {e}")
+                    _encoding = False
+    return _encoding
+
+
+def count_text_tokens(text):
+    """Bir metnin token sayısını döndürür."""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def count_part_tokens(part):
+    """Bir mesaj parçasının (metin ya da görsel) token sayısını döndürür."""
+    if isinstance(part, str):
+        return count_text_tokens(part)
+    return IMAGE_TOKEN_COST
+
+
+def count_message_tokens(message):
+    """Mesajın token sayısını döndürür; sonuç mesajın "tokens" alanında önbelleğe alınır."""
+    tokens = message.get("tokens")
+    if tokens is None:
+        tokens = MESSAGE_OVERHEAD_TOKENS + sum(count_part_tokens(part) for part in message["parts"])
+        message["tokens"] = tokens
+    return tokens
+
+
+def select_window(messages, budget, keep_first=2):
+    """Bütçeye sığan mesajların indekslerini ve toplam token sayısını döndürür.
+
+    İlk `keep_first` mesaj her zaman tutulur; kalan bütçe en yeni mesajlardan
+    geriye doğru doldurulur. Pencere, rol sırası bozulmasın diye bir kullanıcı
+    mesajıyla başlar.
+    """
+    head = list(range(min(keep_first, len(messages))))
+    used = sum(count_message_tokens(messages[i]) for i in head)
+
+    start = len(messages)
+    while start > len(head) and used + count_message_tokens(messages[start - 1]) <= budget:
+        start -= 1
+        used += count_message_tokens(messages[start])
+    while start < len(messages) and messages[start]["role"] != "user":
+        used -= count_message_tokens(messages[start])
+        start += 1
+
+    return head + list(range(start, len(messages))), used
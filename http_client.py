@@ -0,0 +1,158 @@
+# http_client.py
+#
+# Dış HTTP çağrıları için süreç genelinde paylaşılan, havuzlu requests oturumu.
+# Keep-alive bağlantıları yeniden kullanılır, her isteğin varsayılan bir zaman
+# aşımı vardır ve 429/5xx yanıtlarında rastgele gecikmeli (jitter) yeniden
+# deneme yapılır. Sunucu başına bağlantı sınırı gerçekten uygulanır: havuz
+# doluysa istek en fazla POOL_TIMEOUT kadar bekler, sonra EmptyPoolError ile
+# hemen başarısız olur (sonsuza dek asılı kalmaz).
+
+import logging
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import PoolManager
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (3.05, 10) # (bağlantı, okuma) saniye
+POOL_CONNECTIONS = 10 # Havuzda tutulan farklı sunucu sayısı
+POOL_MAXSIZE = 16 # Sunucu başına en fazla eşzamanlı bağlantı
+POOL_BLOCK = True # Havuz doluysa yeni bağlantı açmak yerine boşalan bağlantıyı bekle (sunucu başı sınır gerçekten uygulanır)
+POOL_TIMEOUT = DEFAULT_TIMEOUT[0] # Dolu havuzda bağlantı için en fazla bekleme (saniye); sonra EmptyPoolError
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+USER_AGENT = "HanogtAI/5.1 (+https://github.com/Hanstudios1/hanogt-ai)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class JitteredRetry(Retry):
+    """Üstel geri çekilmeyi [0, gecikme] aralığında rastgele dağıtır (full jitter).
+
+    Aynı anda başarısız olan istekler sunucuya aynı anda yeniden yüklenmez.
+    """
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+
+class _FailFastPoolMixin:
+    """requests `pool_timeout` geçirmez; bu karışım onu havuzun kendi değerinden doldurur."""
+
+    pool_timeout = None
+
+    def urlopen(self, method, url, *args, **kwargs):
+        kwargs.setdefault("pool_timeout", self.pool_timeout)
+        return super().urlopen(method, url, *args, **kwargs)
+
+
+class _FailFastHTTPConnectionPool(_FailFastPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _FailFastHTTPSConnectionPool(_FailFastPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _FailFastPoolManager(PoolManager):
+    """Oluşturduğu her havuza `pool_timeout` atayan PoolManager."""
+
+    def __init__(self, pool_timeout, **kwargs):
+        super().__init__(**kwargs)
+        self.pool_timeout = pool_timeout
+        self.pool_classes_by_scheme = {"http": _FailFastHTTPConnectionPool, "https": _FailFastHTTPSConnectionPool}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.pool_timeout = self.pool_timeout
+        return pool
+
+
+class FailFastAdapter(HTTPAdapter):
+    """pool_block=True ile dolu havuzda sonsuza dek beklemek yerine `pool_timeout` sonra hata veren adaptör.
+
+    requests'in HTTPAdapter.send'i urllib3'e `pool_timeout` geçirmediğinden, engelleyen
+    bir havuz tükendiğinde istek zaman aşımını yok sayarak süresiz beklerdi.
+    """
+
+    def __init__(self, pool_timeout=POOL_TIMEOUT, **kwargs):
+        self.pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _FailFastPoolManager(self.pool_timeout, num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs)
+
+
+class TimeoutSession(requests.Session):
+    """Zaman aşımı verilmeyen isteklere DEFAULT_TIMEOUT uygulayan oturum."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_session(timeout=DEFAULT_TIMEOUT, retries=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF_FACTOR,
+                  pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=POOL_BLOCK, pool_timeout=POOL_TIMEOUT):
+    """Havuz, zaman aşımı ve yeniden deneme ayarlarıyla yeni bir oturum oluşturur."""
+    retry = JitteredRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # pool_block=False olsaydı havuz dolunca fazladan (havuza geri konmayan) bağlantılar açılırdı
+    adapter = FailFastAdapter(
+        pool_timeout=pool_timeout,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=retry,
+    )
+    session = TimeoutSession(timeout=timeout)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+    })
+    return session
+
+
+def get_session():
+    """Paylaşılan oturumu döndürür (ilk çağrıda oluşturulur)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+                logger.info("Shared HTTP session created.")
+    return _session
+
+
+def close_session():
+    """Paylaşılan oturumu kapatır; sonraki get_session() yeni bir oturum açar."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,80 @@
+# i18n.py
+#
+# Arayüz metinleri için çeviri kataloğu. Çeviriler `locales/<dil>.json`
+# dosyalarında tutulur; her dil ilk kullanıldığında bir kez okunur ve salt
+# okunur, düz bir sözlük (MappingProxyType) olarak süreç boyunca saklanır.
+# Eksik anahtarlar çalışma anında değil, başlangıçta `check_catalogs` ile bulunur.
+
+import functools
+import json
+import logging
+import os
+import re
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+DEFAULT_LANGUAGE = "TR" # Anahtar listesinin referansı ve eksik çeviriler için yedek dil
+MISSING_TEXT = "TEXT_MISSING"
+
+# Kaynak koddaki sabit anahtarlı `get_text("anahtar")` çağrıları
+_TEXT_KEY_RE = re.compile(r"""\bget_text\(\s*(["'])(\w+)\1\s*\)""")
+
+
+def available_languages():
+    """Katalog dosyası bulunan dil kodlarını döndürür."""
+    return sorted(name[:-5].upper() for name in os.listdir(LOCALE_DIR) if name.endswith(".json"))
+
+
+@functools.lru_cache(maxsize=None)
+def load_catalog(language):
+    """Dilin çevirilerini salt okunur bir sözlük olarak döndürür; dosya yoksa yedek dil kullanılır."""
+    path = os.path.join(LOCALE_DIR, f"{language.lower()}.json")
+    if not os.path.exists(path):
+        if language == DEFAULT_LANGUAGE:
+            raise FileNotFoundError(path)
+        logger.warning(f"No locale file for '{language}', falling back to {DEFAULT_LANGUAGE}.")
+        return load_catalog(DEFAULT_LANGUAGE)
+    with open(path, encoding="utf-8") as f:
+        texts = json.load(f)
+    if language != DEFAULT_LANGUAGE:
+        # Eksik anahtarlar yedek dilden doldurulur, böylece arama her zaman tek bir sözlükte biter
+        texts = {**load_catalog(DEFAULT_LANGUAGE), **texts}
+    return MappingProxyType(texts)
+
+
+def get_text(language, key):
+    """Anahtarın seçili dildeki metnini döndürür."""
+    return load_catalog(language).get(key, MISSING_TEXT)
+
+
+def find_text_keys(*paths):
+    """Kaynak dosyalarda `get_text("...")` ile kullanılan anahtarları döndürür (başlangıç denetimi için)."""
+    keys = set()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            keys.update(match.group(2) for match in _TEXT_KEY_RE.finditer(f.read()))
+    return keys
+
+
+def check_catalogs(languages=None, required_keys=()):
+    """Tüm dillerin anahtarlarını yedek dille (ve `required_keys` ile) karşılaştırır.
+
+    {dil: eksik anahtarlar} döndürür ve her eksikliği bir kez günlüğe yazar.
+    Yalnızca dosyadaki anahtarlara bakılır; yedek dilden doldurulanlar eksik sayılır.
+    """
+    reference = set(load_catalog(DEFAULT_LANGUAGE)) | set(required_keys)
+    problems = {}
+    for language in languages or available_languages():
+        path = os.path.join(LOCALE_DIR, f"{language.lower()}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                keys = set(json.load(f))
+        except FileNotFoundError:
+            keys = set()
+        missing = sorted(reference - keys)
+        if missing:
+            problems[language] = missing
+            logger.warning(f"Locale '{language}' is missing {len(missing)} keys: {', '.join(missing)}")
+    return problems
@@ -0,0 +1,142 @@
+# image_pipeline.py
+#
+# Görsel modele gönderilmeden ve sohbet geçmişine yazılmadan önce görseli tek
+# bir çözme (decode) geçişinde hazırlayan katman:
+#
+# - JPEG'ler `draft()` ile doğrudan küçültülmüş ölçekte çözülür
+# - EXIF yönlendirmesi piksellere uygulanır (telefon fotoğrafları yan görünmez)
+# - Uzun kenar modelin kullanabildiği çözünürlüğe indirilir
+# - Sonuç kalite ayarıyla WebP/JPEG olarak yeniden kodlanır (meta veriler atılır)
+# - Aynı geçişte görsel yanıt önbelleği için algısal özet (dHash) hesaplanır
+#
+# PIL ilk görselde yüklenir; modülü içe aktarmak uygulamanın açılışını yavaşlatmaz.
+
+import io
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_SIDE = 1536 # Piksel; model daha büyük görselleri zaten bu ölçeğe indirir
+DEFAULT_FORMAT = "WEBP"
+DEFAULT_QUALITY = 80
+
+# Pillow çözme ve yeniden boyutlandırma sırasında GIL'i bırakır; görseller paralel hazırlanabilir
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-prep")
+
+MIME_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg", "PNG": "image/png"}
+
+PreparedImage = namedtuple(
+    "PreparedImage", ["data", "mime_type", "width", "height", "original_size", "perceptual_hash"], defaults=(None,)
+)
+
+
+def sniff_mime_type(data):
+    """Kodlanmış görsel baytlarının MIME türünü imzasından tahmin eder."""
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def _flatten(image, image_format):
+    """Görseli hedef biçimin desteklediği renk kipine çevirir."""
+    from PIL import Image
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if not has_alpha:
+        return image if image.mode == "RGB" else image.convert("RGB")
+    image = image.convert("RGBA")
+    if image_format != "JPEG":
+        return image
+    # JPEG saydamlık desteklemez; beyaz zemine yerleştir
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def encode_image(image, image_format=DEFAULT_FORMAT, quality=DEFAULT_QUALITY):
+    """Açık bir PIL görselini meta verisiz olarak kodlar; (baytlar, MIME türü) döndürür."""
+    image = _flatten(image, image_format)
+    buffer = io.BytesIO()
+    if image_format == "WEBP":
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    elif image_format == "JPEG":
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, format=image_format, optimize=True)
+    return buffer.getvalue(), MIME_TYPES.get(image_format, "application/octet-stream")
+
+
+def draft_size(size, max_side=MAX_SIDE):
+    """`draft()` için en-boy oranını koruyan hedef kutuyu döndürür.
+
+    Pillow ölçeği `min(w // kutu_w, h // kutu_h)` ile seçer; kare kutu 4:3 bir
+    fotoğrafta ölçeği 1'e düşürür. Kutu, uzun kenar `max_side` olacak şekilde kurulur.
+    """
+    width, height = size
+    if width >= height:
+        return max_side, max(1, max_side * height // width)
+    return max(1, max_side * width // height), max_side
+
+
+def has_metadata(image):
+    """Görselde EXIF/XMP/yorum gibi (konum bilgisi taşıyabilecek) meta veri olup olmadığını döndürür."""
+    return bool(image.getexif()) or any(key in image.info for key in ("exif", "xmp", "XML:com.adobe.xmp", "comment"))
+
+
+def shrink_image(image, max_side=MAX_SIDE):
+    """EXIF yönlendirmesini uygular ve uzun kenarı `max_side` ile sınırlar."""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    return image
+
+
+def prepare_image(data, max_side=MAX_SIDE, image_format=DEFAULT_FORMAT, quality=DEFAULT_QUALITY):
+    """Yüklenen görsel baytlarını modele ve geçmişe uygun, küçük bir kopyaya dönüştürür.
+
+    Görsel küçültme ya da döndürme gerektirmiyorsa, meta veri taşımıyorsa ve yeniden
+    kodlama dosyayı büyütecekse orijinal baytlar olduğu gibi korunur.
+    """
+    from PIL import Image
+
+    import vision_cache
+
+    with metrics.timed("image_pipeline.latency"):
+        with Image.open(io.BytesIO(data)) as source:
+            source_format = source.format
+            original_size = source.size
+            if source_format == "JPEG" and max(original_size) > max_side:
+                # DCT ölçekleme: yalnızca gereken çözünürlük çözülür (1/2, 1/4, 1/8)
+                source.draft("RGB", draft_size(original_size, max_side))
+            orientation = source.getexif().get(0x0112, 1)
+            metadata = has_metadata(source)
+            image = shrink_image(source, max_side=max_side)
+            if image is source:
+                image.load()
+            encoded, mime_type = encode_image(image, image_format=image_format, quality=quality)
+            perceptual_hash = vision_cache.dhash(image)
+
+        # Orijinal baytlar yalnızca meta verisizse korunur; EXIF/GPS hiçbir zaman geçmişe ya da modele gitmez
+        untouched = image.size == original_size and orientation == 1 and not metadata
+        if untouched and source_format in MIME_TYPES and len(data) <= len(encoded):
+            encoded, mime_type = data, MIME_TYPES[source_format]
+
+    metrics.incr("image_pipeline.bytes_in", len(data))
+    metrics.incr("image_pipeline.bytes_out", len(encoded))
+    logger.info(f"Prepared image: {len(data)} -> {len(encoded)} bytes, {image.size[0]}x{image.size[1]} {mime_type}")
+    return PreparedImage(encoded, mime_type, image.size[0], image.size[1], len(data), perceptual_hash)
+
+
+def prepare_images(datas, max_side=MAX_SIDE, image_format=DEFAULT_FORMAT, quality=DEFAULT_QUALITY):
+    """Birden çok görseli iş parçacığı havuzunda hazırlar; giriş sırasıyla Future listesi döndürür."""
+    return [_executor.submit(prepare_image, data, max_side, image_format, quality) for data in datas]
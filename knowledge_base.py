@@ -1,12 +1,38 @@
 # knowledge_base.py
 
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
 import numpy as np
 
-# Modeli yükle
-# Burada dikkat: Eğer internet yoksa, modeli yerel indirip kullanmalısın!
-model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+import vector_search
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+# Model ilk kullanımda bir kez yüklenir ve süreç boyunca paylaşılır
+_model = None
+_model_lock = threading.Lock()
+
+# Anahtar gömmeleri knowledge.json'un yanında saklanır
+EMBEDDING_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge_embeddings.npz")
+
+# Eşik değer (kalite için)
+SIMILARITY_THRESHOLD = 0.45
+
+# Vektör arama arka ucu: "exact", "ivf" ya da "auto" (boyuta göre seçer)
+SEARCH_BACKEND = os.environ.get("KB_SEARCH_BACKEND", "auto")
+
+# Süreç içi önbellekler: id(bilgi tabanı) -> indeks kaydı, (içerik özeti, arka uç) -> arama indeksi.
+# Sorgu başına anahtarları yeniden dolaşmamak için kayıt nesne kimliğiyle bulunur; önbellekler sınırlıdır (LRU).
+INDEX_CACHE_SIZE = 4
+_index_cache = OrderedDict()
+_search_index_cache = OrderedDict()
+_index_lock = threading.RLock()
 
 # Bilgi tabanını yükle
 def load_knowledge():
@@ -19,27 +45,172 @@ def load_knowledge():
     }
     return knowledge
 
-# Kullanıcıdan gelen mesaja cevap veren fonksiyon
-def chatbot_response(user_input, knowledge):
-    # Bilgi tabanındaki anahtar kelimeleri encode et
-    keys = list(knowledge.keys())
-    key_embeddings = model.encode(keys)
+def get_model():
+    """Paylaşılan SentenceTransformer modelini döndürür, gerekirse yükler.
+
+    Aynı anda gelen çağrılar tek bir yüklemeyi bekler; model süreç başına bir kez oluşturulur.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                # Burada dikkat: Eğer internet yoksa, modeli yerel indirip kullanmalısın!
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(MODEL_NAME)
+                logger.info(f"SentenceTransformer loaded: {MODEL_NAME}")
+    return _model
+
+def warm_up(background=False):
+    """Modeli ve bilgi tabanı indeksini önceden yükler (sunucu açılışında isteğe bağlı)."""
+    def _load():
+        try:
+            get_search_index(load_knowledge())
+        except Exception as e:
+            logger.error(f"Knowledge base warm-up failed: {e}")
+
+    if background:
+        thread = threading.Thread(target=_load, name="kb-warmup", daemon=True)
+        thread.start()
+        return thread
+    _load()
+    return None
+
+def _normalize(embeddings):
+    """Gömmeleri L2 normuna göre birim uzunluğa getirir."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+def encode(texts):
+    """Metin(ler)i paylaşılan modelle encode eder ve L2-normalize gömmeleri döndürür."""
+    return _normalize(get_model().encode(texts))
+
+def _key_hash(key):
+    """Bir anahtarın gömmesini belirleyen özet (model adı + metin)."""
+    return hashlib.sha256(f"{MODEL_NAME}\0{key}".encode("utf-8")).hexdigest()
+
+def _content_hash(key_hashes):
+    """Bütün anahtar kümesinin özeti; indeksin güncel olup olmadığını gösterir."""
+    return hashlib.sha256("\n".join(key_hashes).encode("utf-8")).hexdigest()
+
+def _read_index_file(path):
+    """Diskteki indeksi {anahtar özeti: gömme} sözlüğü olarak okur."""
+    if not os.path.exists(path):
+        return None, {}
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            stored = dict(zip(data["key_hashes"].tolist(), data["embeddings"]))
+            return str(data["content_hash"]), stored
+    except Exception as e:
+        logger.warning(f"Embedding index could not be read, rebuilding: {e}")
+        return None, {}
+
+def _write_index_file(path, content_hash, key_hashes, embeddings):
+    """İndeksi atomik olarak diske yazar."""
+    tmp_path = f"{path}.tmp.npz"
+    try:
+        np.savez(
+            tmp_path,
+            content_hash=np.array(content_hash),
+            key_hashes=np.array(key_hashes),
+            embeddings=embeddings,
+        )
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Embedding index could not be saved: {e}")
+
+def _cache_put(cache, key, value):
+    """LRU önbelleğe ekler; en eski kayıtlar INDEX_CACHE_SIZE'ı aşınca atılır (kilit altında çağrılır)."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > INDEX_CACHE_SIZE:
+        cache.popitem(last=False)
+
+def _load_index_entry(knowledge, path):
+    """(anahtarlar, normalize gömmeler, içerik özeti) üçlüsünü döndürür.
+
+    Kayıt bilgi tabanı nesnesinin kimliğiyle ve boyutuyla eşlenir; nesnenin kendisi
+    kayıtta tutulduğundan id yeniden kullanılamaz. Bilgi tabanı yerinde değiştirilirse
+    yeni bir sözlük olarak yüklenmelidir.
+    """
+    cache_key = (id(knowledge), len(knowledge), path)
+    cached = _index_cache.get(cache_key)
+    if cached is not None and cached[0] is knowledge:
+        return cached[1]
+
+    with _index_lock:
+        cached = _index_cache.get(cache_key)
+        if cached is None or cached[0] is not knowledge:
+            cached = (knowledge, _build_index_entry(list(knowledge), path))
+        _cache_put(_index_cache, cache_key, cached)
+    return cached[1]
+
+def _build_index_entry(keys, path):
+    """Eksik anahtarları encode eder, indeksi diske yazar ve kaydı döndürür."""
+    key_hashes = [_key_hash(k) for k in keys]
+    content_hash = _content_hash(key_hashes)
+
+    stored_hash, stored = _read_index_file(path)
+    missing = [i for i, h in enumerate(key_hashes) if h not in stored]
+    if missing:
+        new_embeddings = encode([keys[i] for i in missing])
+        for i, emb in zip(missing, new_embeddings):
+            stored[key_hashes[i]] = emb
+        logger.info(f"Encoded {len(missing)} new knowledge keys ({len(keys)} total).")
+
+    dim = get_model().get_sentence_embedding_dimension() if not stored else len(next(iter(stored.values())))
+    key_embeddings = np.array([stored[h] for h in key_hashes], dtype=np.float32).reshape(len(keys), dim)
+    if stored_hash != content_hash:
+        _write_index_file(path, content_hash, key_hashes, key_embeddings)
+
+    return keys, key_embeddings, content_hash
+
+def load_embedding_index(knowledge, path=EMBEDDING_INDEX_PATH):
+    """Bilgi tabanı anahtarlarının normalize gömmelerini döndürür.
+
+    Gömmeler bir kez hesaplanır ve içerik özetiyle birlikte diske yazılır.
+    Sonraki açılışlarda yalnızca yeni ya da değişen anahtarlar encode edilir.
+    """
+    keys, key_embeddings, _ = _load_index_entry(knowledge, path)
+    return keys, key_embeddings
+
+def get_search_index(knowledge, backend=None):
+    """Bilgi tabanı için (anahtarlar, arama indeksi) çiftini döndürür."""
+    keys, key_embeddings, content_hash = _load_index_entry(knowledge, EMBEDDING_INDEX_PATH)
+    backend = backend or SEARCH_BACKEND
+    cache_key = (content_hash, backend)
+    cached = _search_index_cache.get(cache_key)
+    if cached is None:
+        with _index_lock:
+            cached = _search_index_cache.get(cache_key)
+            if cached is None:
+                cached = (keys, vector_search.build_index(key_embeddings, backend=backend))
+                _cache_put(_search_index_cache, cache_key, cached)
+    return cached
+
+def search_knowledge(user_input, knowledge, k=1):
+    """Kullanıcı girdisine en yakın k anahtarı [(anahtar, skor), ...] olarak döndürür."""
+    keys, index = get_search_index(knowledge)
+    if not keys:
+        return []
 
     # Kullanıcının sorusunu encode et
-    user_embedding = model.encode(user_input)
+    user_embedding = encode(user_input)
 
-    # Benzerlik hesapla
-    similarities = cosine_similarity([user_embedding], key_embeddings)[0]
+    # Benzerlik hesapla (normalize vektörlerde iç çarpım = kosinüs benzerliği)
+    indices, scores = index.search(user_embedding, k=k)
+    return [(keys[i], float(s)) for i, s in zip(indices, scores)]
 
+# Kullanıcıdan gelen mesaja cevap veren fonksiyon
+def chatbot_response(user_input, knowledge):
     # En yakın anahtar kelimeyi bul
-    best_idx = np.argmax(similarities)
-    best_similarity = similarities[best_idx]
-
-    # Eşik değer (kalite için)
-    threshold = 0.45
+    matches = search_knowledge(user_input, knowledge, k=1)
+    if not matches:
+        return None
+    best_key, best_similarity = matches[0]
 
-    if best_similarity >= threshold:
-        best_key = keys[best_idx]
+    if best_similarity >= SIMILARITY_THRESHOLD:
         return knowledge[best_key]
     else:
         return None
@@ -0,0 +1,100 @@
+# metrics.py
+#
+# Süreç genelinde paylaşılan basit sayaçlar ve gecikme ölçümleri.
+# Streamlit her etkileşimde app.py'yi yeniden çalıştırdığı için sayaçlar
+# ayrı bir modülde tutulur; böylece oturumlar ve yeniden çalıştırmalar
+# arasında korunurlar.
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Her ölçüm için saklanan son örnek sayısı (yüzdelikler bunlardan hesaplanır)
+TIMING_WINDOW = 1000
+
+_lock = threading.Lock()
+_counters = {}
+_timings = {}
+_values = {}
+
+
+def incr(name, amount=1):
+    """Bir sayacı artırır."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def get(name):
+    """Bir sayacın güncel değerini döndürür."""
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def observe(name, seconds):
+    """Bir süre ölçümünü (saniye) kaydeder."""
+    with _lock:
+        samples = _timings.get(name)
+        if samples is None:
+            samples = _timings[name] = deque(maxlen=TIMING_WINDOW)
+        samples.append(seconds)
+
+
+def record(name, value):
+    """Süre dışındaki bir ölçümü (ör. istek başına token) kaydeder."""
+    with _lock:
+        samples = _values.get(name)
+        if samples is None:
+            samples = _values[name] = deque(maxlen=TIMING_WINDOW)
+        samples.append(value)
+
+
+@contextmanager
+def timed(name):
+    """Bloğun çalışma süresini `name` altında kaydeder."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def hit_rate(prefix):
+    """`<prefix>.hits` / (`<prefix>.hits` + `<prefix>.misses`) oranını döndürür."""
+    hits = get(f"{prefix}.hits")
+    total = hits + get(f"{prefix}.misses")
+    return hits / total if total else 0.0
+
+
+def _percentile(sorted_samples, q):
+    index = min(len(sorted_samples) - 1, int(round(q / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def snapshot():
+    """Sayaçların, gecikme özetlerinin (ms) ve diğer ölçümlerin bir kopyasını döndürür."""
+    with _lock:
+        counters = dict(_counters)
+        timings = {name: sorted(samples) for name, samples in _timings.items()}
+        values = {name: sorted(samples) for name, samples in _values.items()}
+    summary = {}
+    for name, samples in timings.items():
+        if not samples:
+            continue
+        summary[name] = {
+            "count": len(samples),
+            "p50_ms": round(_percentile(samples, 50) * 1000, 2),
+            "p99_ms": round(_percentile(samples, 99) * 1000, 2),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+        }
+    value_summary = {}
+    for name, samples in values.items():
+        if not samples:
+            continue
+        value_summary[name] = {
+            "count": len(samples),
+            "p50": _percentile(samples, 50),
+            "p99": _percentile(samples, 99),
+            "mean": round(sum(samples) / len(samples), 2),
+        }
+    return {"counters": counters, "timings": summary, "values": value_summary}
@@ -0,0 +1,214 @@
+# passage_retrieval.py
+#
+# Araştırma sonuçlarından tam metin çekip pasajlara bölen ve pasajları sorguya
+# göre çok dilli SentenceTransformer gömmeleriyle sıralayan katman.
+#
+# - Wikipedia özetleri birkaç başlık için tek bir `prop=extracts` çağrısıyla alınır
+# - Web sayfaları eşzamanlı indirilir
+# - Metinler, pasaj gömmeleri ve sıralanmış sonuçlar önbelleğe alınır
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from urllib.parse import quote
+
+import numpy as np
+
+import context_budget
+import http_client
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PASSAGE_WORDS = 120 # Pasaj başına hedef kelime sayısı
+PASSAGE_OVERLAP_WORDS = 20 # Ardışık pasajlar arasındaki örtüşme
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+PAGE_TIMEOUT = (3.05, 5)
+FETCH_DEADLINE = 6.0 # Tüm tam metin indirmeleri için ortak süre sınırı (saniye); geç kalan sayfalar atlanır
+WIKI_EXTRACT_BATCH = 20 # API, giriş özetlerini tek çağrıda en fazla 20 başlık için döndürür
+EMBEDDING_CACHE_SIZE = 5000
+
+_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="passages")
+_embedding_cache = OrderedDict()
+_embedding_lock = threading.Lock()
+
+
+def fetch_wikipedia_extracts(titles, api_url, timeout=PAGE_TIMEOUT):
+    """Birden çok başlığın düz metin özetlerini tek istekte alır; {başlık: metin} döndürür."""
+    extracts = {}
+    for start in range(0, len(titles), WIKI_EXTRACT_BATCH):
+        batch = titles[start:start + WIKI_EXTRACT_BATCH]
+        response = http_client.get_session().get(api_url, params={
+            "action": "query",
+            "prop": "extracts",
+            "explaintext": 1,
+            "exintro": 1,
+            "exlimit": len(batch),
+            "redirects": 1,
+            "titles": "|".join(batch),
+            "format": "json",
+        }, timeout=timeout)
+        response.raise_for_status()
+        data = response.json().get("query", {})
+        # Yönlendirilen başlıkları istenen başlığa geri eşle
+        redirects = {r["to"]: r["from"] for r in data.get("redirects", [])}
+        for page in data.get("pages", {}).values():
+            if page.get("extract"):
+                extracts[redirects.get(page["title"], page["title"])] = page["extract"]
+    return extracts
+
+
+def fetch_page_text(url, timeout=PAGE_TIMEOUT):
+    """Bir web sayfasını indirir ve paragraf metinlerini döndürür."""
+    from bs4 import BeautifulSoup
+
+    # Akışlı yanıt her yolda (hata, HTML olmayan içerik) kapatılır; aksi halde bağlantı havuza geri dönmez
+    with http_client.get_session().get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "html"):
+            return ""
+        html = response.raw.read(MAX_PAGE_BYTES, decode_content=True)
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer", "aside"]):
+        tag.decompose()
+    paragraphs = (p.get_text(" ", strip=True) for p in soup.find_all("p"))
+    return "\n".join(p for p in paragraphs if len(p) > 40)
+
+
+def split_passages(text, words=PASSAGE_WORDS, overlap=PASSAGE_OVERLAP_WORDS):
+    """Metni örtüşen, yaklaşık `words` kelimelik pasajlara böler."""
+    tokens = re.findall(r"\S+", text)
+    if not tokens:
+        return []
+    step = max(1, words - overlap)
+    return [" ".join(tokens[i:i + words]) for i in range(0, max(1, len(tokens) - overlap), step)]
+
+
+def _cached_fetch(cache, key, fetch):
+    if cache is None:
+        return fetch()
+    value, _ = cache.get_or_fetch(key, fetch)
+    return value
+
+
+def collect_documents(research_results, wikipedia_api_url, cache=None, language="", max_pages=4, deadline=FETCH_DEADLINE):
+    """Araştırma sonuçları için tam metinleri toplar; belge sözlükleri listesi döndürür.
+
+    Tüm indirmeler `deadline` saniyelik ortak bir süre içinde beklenir (yeniden denemeler
+    ve sayfa başı zaman aşımları birikse bile); süresi dolan sayfalar için arama özeti kullanılır.
+    """
+    start = time.monotonic()
+    documents = []
+    futures = []
+
+    wiki_titles = [r["title"] for r in research_results.get("wiki") or []]
+    if wiki_titles:
+        key = cache.make_key("wiki_extracts", "|".join(wiki_titles), language) if cache else None
+        futures.append(("wiki", _executor.submit(
+            _cached_fetch, cache, key, lambda: fetch_wikipedia_extracts(wiki_titles, wikipedia_api_url))))
+
+    for result in (research_results.get("web") or [])[:max_pages]:
+        url = result.get("href")
+        if url:
+            key = cache.make_key("page", url, "") if cache else None
+            futures.append((result, _executor.submit(_cached_fetch, cache, key, lambda url=url: fetch_page_text(url))))
+
+    article_base_url = wikipedia_api_url.replace("/w/api.php", "/wiki/")
+    for origin, future in futures:
+        remaining = deadline - (time.monotonic() - start)
+        try:
+            value = future.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            future.cancel()
+            metrics.incr("passages.fetch_timeouts")
+            logger.warning(f"Passage source fetch skipped after the {deadline:.1f}s deadline.")
+            value = None
+        except Exception as e:
+            metrics.incr("passages.fetch_errors")
+            logger.warning(f"Passage source fetch failed: {e}")
+            value = None
+        if origin == "wiki":
+            if not value:
+                continue
+            for title, text in value.items():
+                documents.append({"title": title, "url": article_base_url + quote(title.replace(" ", "_")), "source": "wiki", "text": text})
+        elif value:
+            documents.append({"title": origin.get("title", ""), "url": origin["href"], "source": "web", "text": value})
+        elif origin.get("body"):
+            # Sayfa metni alınamazsa arama özetiyle devam et
+            documents.append({"title": origin.get("title", ""), "url": origin["href"], "source": "web", "text": origin["body"]})
+    return documents
+
+
+def embed_passages(texts, encoder):
+    """Pasaj gömmelerini döndürür; yalnızca önbellekte olmayanlar toplu olarak encode edilir."""
+    keys = [hashlib.sha1(t.encode("utf-8")).hexdigest() for t in texts]
+    with _embedding_lock:
+        missing = [i for i, k in enumerate(keys) if k not in _embedding_cache]
+    if missing:
+        new_embeddings = encoder([texts[i] for i in missing])
+        with _embedding_lock:
+            for i, embedding in zip(missing, new_embeddings):
+                _embedding_cache[keys[i]] = embedding
+            while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+    metrics.incr("passages.embedding_hits", len(texts) - len(missing))
+    metrics.incr("passages.embedding_misses", len(missing))
+    with _embedding_lock:
+        embeddings = []
+        for k, t in zip(keys, texts):
+            embedding = _embedding_cache.get(k)
+            if embedding is None: # Aradaki bir çıkarma işlemi kaydı silmiş olabilir
+                embedding = encoder([t])[0]
+            else:
+                _embedding_cache.move_to_end(k)
+            embeddings.append(embedding)
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def rank_passages(query, documents, encoder, top_k=5, token_budget=1500):
+    """Belgeleri pasajlara böler, sorguya göre sıralar ve bütçeye sığan en iyi k pasajı döndürür."""
+    passages = []
+    for document in documents:
+        for text in split_passages(document["text"]):
+            passages.append({"title": document["title"], "url": document["url"], "source": document["source"], "text": text})
+    if not passages:
+        return []
+
+    scores = embed_passages([p["text"] for p in passages], encoder) @ np.asarray(encoder(query), dtype=np.float32)
+    selected = []
+    used_tokens = 0
+    for i in np.argsort(-scores):
+        tokens = context_budget.count_text_tokens(passages[i]["text"])
+        if used_tokens + tokens > token_budget:
+            continue
+        selected.append(dict(passages[i], score=round(float(scores[i]), 4)))
+        used_tokens += tokens
+        if len(selected) >= top_k:
+            break
+    return selected
+
+
+def retrieve_passages(query, research_results, encoder, wikipedia_api_url, cache=None, language="", top_k=5, token_budget=1500,
+                      fetch_deadline=FETCH_DEADLINE):
+    """Araştırma sonuçlarından sorguya en uygun pasajları döndürür (tekrarlanan sorgular önbellekten gelir)."""
+    key = cache.make_key("passages", f"{query}\x1f{top_k}\x1f{token_budget}", language) if cache else None
+    if cache is not None:
+        cached, _ = cache.get(key)
+        if cached:
+            metrics.incr("passages.hits")
+            return cached
+    metrics.incr("passages.misses")
+
+    with metrics.timed("passages.latency"):
+        documents = collect_documents(research_results, wikipedia_api_url, cache=cache, language=language, deadline=fetch_deadline)
+        passages = rank_passages(query, documents, encoder, top_k=top_k, token_budget=token_budget)
+    # Boş sonuçlar (ör. tüm kaynaklar hata verdiyse) önbelleğe alınmaz
+    if cache is not None and passages:
+        cache.set(key, passages)
+    return passages
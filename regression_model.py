@@ -1,16 +1,14 @@
 # regression_model.py
-
-import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.pipeline import make_pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
-import streamlit as st
+#
+# sklearn, numpy, matplotlib ve streamlit yalnızca ilgili metot ilk kez
+# çağrıldığında içe aktarılır; modülü içe aktarmak açılışı yavaşlatmaz.
 
 class RegressionModel:
     def __init__(self, degree=1):
+        from sklearn.linear_model import LinearRegression
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import PolynomialFeatures
+
         self.degree = degree
         if degree == 1:
             self.model = LinearRegression()
@@ -19,6 +17,8 @@ class RegressionModel:
         self.is_trained = False
 
     def train(self, X, y, test_size=0.2, random_state=42):
+        from sklearn.model_selection import train_test_split
+
         self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
             X, y, test_size=test_size, random_state=random_state
         )
@@ -28,7 +28,8 @@ class RegressionModel:
     def evaluate(self):
         if not self.is_trained:
             raise Exception("Model önce eğitilmelidir!")
-        
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
         y_train_pred = self.model.predict(self.X_train)
         y_test_pred = self.model.predict(self.X_test)
 
@@ -48,6 +49,9 @@ class RegressionModel:
     def plot(self, resolution=100):
         if not self.is_trained:
             raise Exception("Model önce eğitilmelidir!")
+        import matplotlib.pyplot as plt
+        import numpy as np
+        import streamlit as st
 
         plt.figure(figsize=(8,6))
         plt.scatter(self.X_train, self.y_train, color='blue', label='Eğitim Verisi')
@@ -0,0 +1,131 @@
+# research.py
+#
+# Araştırma kaynaklarını (web, Wikipedia, ...) eşzamanlı çalıştıran katman.
+# Her kaynağın kendi süre sınırı vardır; yavaş ya da hatalı bir kaynak diğer
+# kaynakların sonuçlarını bekletmez. Yeni kaynaklar `register_source` ile eklenir.
+
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE_TIMEOUT = 5.0 # Saniye
+
+ResearchSource = namedtuple("ResearchSource", ["name", "fetch", "timeout"])
+
+# Kayıtlı kaynaklar, sonuçların gösterileceği sırayla tutulur
+SOURCES = OrderedDict()
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="research")
+# Kaynakları bekleyen üst düzey işler ayrı havuzda çalışır; aynı havuzu beklemek kilitlenmeye yol açabilir
+_pipeline_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="research-pipeline")
+
+
+class SourceTimeout(Exception):
+    """Bir kaynak kendi süre sınırı içinde yanıt vermedi."""
+
+
+def register_source(name, fetch, timeout=DEFAULT_SOURCE_TIMEOUT):
+    """Bir araştırma kaynağı ekler ya da aynı adlı kaynağı değiştirir.
+
+    `fetch(query)` bir sonuç listesi döndürmeli ya da hata fırlatmalıdır;
+    arka plan iş parçacığında çalıştığı için arayüz çağrısı yapmamalıdır.
+    """
+    SOURCES[name] = ResearchSource(name, fetch, timeout)
+    return fetch
+
+
+def _fetch_source(source, query):
+    with metrics.timed(f"research.{source.name}.latency"):
+        return source.fetch(query)
+
+
+def _run_source(source, query, language, cache):
+    """Kaynağı (varsa önbellek üzerinden) çalıştırır; (sonuç, önbellek durumu) döndürür."""
+    if cache is None:
+        return _fetch_source(source, query), None
+    key = cache.make_key(source.name, query, language)
+    return cache.get_or_fetch(key, lambda: _fetch_source(source, query))
+
+
+def run_sources(query, sources=None, language="", cache=None):
+    """Kaynakları eşzamanlı çalıştırır ve (sonuçlar, hatalar, önbellek durumları) döndürür.
+
+    Süresi dolan ya da hata veren kaynaklar `hatalar` içinde yer alır ve
+    sonuçlarda boş liste olarak görünür; diğer kaynakların sonuçları korunur.
+    `cache` verilirse (bkz. research_cache.ResearchCache) sonuçlar sorgu ve dile
+    göre önbellekten sunulur.
+    """
+    selected = [SOURCES[name] for name in sources] if sources is not None else list(SOURCES.values())
+    start = time.monotonic()
+    futures = [(source, _executor.submit(_run_source, source, query, language, cache)) for source in selected]
+
+    results = OrderedDict()
+    errors = {}
+    cache_states = {}
+    for source, future in futures:
+        remaining = source.timeout - (time.monotonic() - start)
+        try:
+            value, cache_states[source.name] = future.result(timeout=max(0.0, remaining))
+            results[source.name] = value or []
+        except FutureTimeoutError:
+            future.cancel()
+            results[source.name] = []
+            errors[source.name] = SourceTimeout(f"{source.name} did not respond within {source.timeout:.1f}s")
+            metrics.incr(f"research.{source.name}.timeouts")
+            logger.warning(f"Research source '{source.name}' timed out for query: {query}")
+        except Exception as e:
+            results[source.name] = []
+            errors[source.name] = e
+            metrics.incr(f"research.{source.name}.errors")
+            logger.error(f"Research source '{source.name}' failed: {e}")
+    metrics.observe("research.total_latency", time.monotonic() - start)
+    return results, errors, cache_states
+
+
+def submit_background(fn, *args):
+    """Kaynakları kendisi çalıştıran bir işi (ör. araştırma + sıralama) arka planda başlatır; Future döndürür."""
+    return _pipeline_executor.submit(fn, *args)
+
+
+class BackgroundPrefetcher:
+    """Kullanıcı butona basmadan önce araştırmayı düşük öncelikle başlatan yardımcı.
+
+    Ayrı ve küçük bir havuz kullanır, böylece asıl araştırma isteklerini
+    geciktirmez. Bekleyen iş sayısı `max_pending` sınırına ulaştığında yeni
+    önceden getirme istekleri düşürülür; henüz başlamamış işler iptal edilebilir.
+    """
+
+    def __init__(self, max_workers=2, max_pending=4):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="research-prefetch")
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def submit(self, fn, *args):
+        """İşi sıraya alır ve Future döndürür; sistem yoğunsa None döndürür (iş düşürülür)."""
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                metrics.incr("prefetch.dropped")
+                return None
+            future = self._executor.submit(fn, *args)
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        metrics.incr("prefetch.submitted")
+        return future
+
+    @staticmethod
+    def cancel(future):
+        """Henüz başlamamış bir işi iptal eder."""
+        if future is not None and future.cancel():
+            metrics.incr("prefetch.cancelled")
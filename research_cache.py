@@ -0,0 +1,148 @@
+# research_cache.py
+#
+# Araştırma sonuçları için SQLite tabanlı, süreçler arası paylaşılan önbellek.
+# Aynı disk dosyasını kullanan tüm süreçler (replikalar) sonuçları paylaşır ve
+# yeniden başlatmalarda önbellek kaybolmaz.
+#
+# Kayıt durumları:
+#   taze  (yaş < ttl)              -> doğrudan döndürülür
+#   bayat (ttl <= yaş < stale_ttl) -> hemen döndürülür, arka planda yenilenir
+#   yok / çok eski                 -> kaynaktan alınır
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import sqlite_local
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get("HANOGT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def normalize_query(query):
+    """Sorguyu anahtar için sadeleştirir (küçük harf, tek boşluk)."""
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+class ResearchCache:
+    """Kaynak + dil + normalize sorgu ile anahtarlanan kalıcı önbellek.
+
+    - `ttl`: bir sonucun taze sayıldığı süre (saniye)
+    - `stale_ttl`: bu süreye kadar bayat sonuç sunulup arka planda yenilenir
+    - `max_entries`: kayıt sınırı; aşıldığında en uzun süredir kullanılmayanlar silinir
+    """
+
+    def __init__(self, path=None, ttl=3600, stale_ttl=7 * 24 * 3600, max_entries=20000):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "research_cache.sqlite3")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._connect = sqlite_local.ThreadLocalConnection(self.path)
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="research-refresh")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS research_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS research_cache_accessed ON research_cache (accessed_at)")
+
+    @staticmethod
+    def make_key(source, query, language):
+        return f"{source}\x1f{language}\x1f{normalize_query(query)}"
+
+    def get(self, key):
+        """(değer, durum) döndürür; durum FRESH, STALE ya da MISS'tir."""
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT value, created_at FROM research_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, MISS
+        age = now - row[1]
+        if age >= self.stale_ttl:
+            return None, MISS
+        conn.execute("UPDATE research_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), FRESH if age < self.ttl else STALE
+
+    def set(self, key, value):
+        """Değeri kaydeder ve gerekirse en eski kayıtları siler."""
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO research_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now, now),
+        )
+        self._evict(conn)
+
+    def _evict(self, conn):
+        count = conn.execute("SELECT COUNT(*) FROM research_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM research_cache WHERE key IN ("
+                " SELECT key FROM research_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            metrics.incr("research_cache.evictions", overflow)
+
+    def _refresh(self, key, fetch):
+        try:
+            self.set(key, fetch())
+            metrics.incr("research_cache.refreshes")
+        except Exception as e:
+            metrics.incr("research_cache.refresh_errors")
+            logger.warning(f"Background research refresh failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+    def refresh_in_background(self, key, fetch):
+        """Anahtarı arka planda yeniler; aynı anahtar için yalnızca bir yenileme çalışır."""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresh_executor.submit(self._refresh, key, fetch)
+
+    def get_or_fetch(self, key, fetch):
+        """Önbellekten sunar ya da `fetch()` ile alıp kaydeder; (değer, durum) döndürür.
+
+        Bayat kayıtlar hemen döndürülür ve arka planda yenilenir (stale-while-revalidate).
+        """
+        try:
+            value, state = self.get(key)
+        except sqlite3.Error as e:
+            logger.error(f"Research cache read error: {e}")
+            value, state = None, MISS
+
+        if state == FRESH:
+            metrics.incr("research_cache.hits")
+            return value, state
+        if state == STALE:
+            metrics.incr("research_cache.stale_hits")
+            self.refresh_in_background(key, fetch)
+            return value, state
+
+        metrics.incr("research_cache.misses")
+        value = fetch()
+        try:
+            self.set(key, value)
+        except sqlite3.Error as e:
+            logger.error(f"Research cache write error: {e}")
+        return value, MISS
@@ -0,0 +1,115 @@
+# semantic_cache.py
+#
+# Anlamsal yanıt önbelleği: bağlamsız (ilk tur) istemlerin yanıtlarını,
+# normalize edilmiş istem gömmelerine göre saklar. Yakın anlamlı bir istem
+# geldiğinde model çağrısı yapılmadan önbellekteki yanıt döndürülür.
+
+import functools
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt):
+    """İstemi karşılaştırma için sadeleştirir (küçük harf, tek boşluk)."""
+    return re.sub(r"\s+", " ", prompt).strip().casefold()
+
+
+class SemanticResponseCache:
+    """Kapsam (dil + model ayarları) başına anlamsal yanıt önbelleği.
+
+    - `threshold`: isabet için gereken en düşük kosinüs benzerliği
+    - `ttl`: bir yanıtın geçerli kaldığı süre (saniye)
+    - `max_entries`: toplam kayıt sınırı; aşıldığında en az kullanılan silinir (LRU)
+
+    `encoder` metin(ler)i L2-normalize gömmelere çeviren bir fonksiyondur.
+    """
+
+    def __init__(self, encoder, threshold=0.95, ttl=6 * 3600, max_entries=2000, name="semantic_cache"):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._encoder = encoder
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (kapsam, normalize istem) -> (gömme, yanıt, oluşturulma zamanı)
+        self._matrices = {}  # kapsam -> (anahtarlar, gömme matrisi); kayıtlar değişince silinir
+        self._embed = functools.lru_cache(maxsize=256)(self._encode)
+
+    def _encode(self, normalized_prompt):
+        return np.asarray(self._encoder(normalized_prompt), dtype=np.float32)
+
+    def _scope_matrix(self, scope):
+        cached = self._matrices.get(scope)
+        if cached is None:
+            keys = [key for key in self._entries if key[0] == scope]
+            matrix = np.stack([self._entries[key][0] for key in keys]) if keys else None
+            cached = self._matrices[scope] = (keys, matrix)
+        return cached
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._matrices.pop(key[0], None)
+
+    def _prune_expired(self, scope, now):
+        expired = [key for key, (_, _, created) in self._entries.items() if key[0] == scope and now - created > self.ttl]
+        for key in expired:
+            self._remove(key)
+        if expired:
+            metrics.incr(f"{self.name}.expired", len(expired))
+
+    def lookup(self, prompt, scope):
+        """Yeterince benzer ve süresi dolmamış bir yanıt varsa döndürür, yoksa None."""
+        normalized = normalize_prompt(prompt)
+        now = time.time()
+        with self._lock:
+            exact = self._entries.get((scope, normalized))
+        try:
+            embedding = exact[0] if exact is not None else self._embed(normalized)
+        except Exception as e:
+            logger.error(f"Semantic cache encode error: {e}")
+            metrics.incr(f"{self.name}.errors")
+            return None
+
+        with self._lock:
+            self._prune_expired(scope, now)
+            keys, matrix = self._scope_matrix(scope)
+            if matrix is not None:
+                scores = matrix @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._entries.move_to_end(keys[best])
+                    metrics.incr(f"{self.name}.hits")
+                    return self._entries[keys[best]][1]
+        metrics.incr(f"{self.name}.misses")
+        return None
+
+    def store(self, prompt, scope, response):
+        """Bir yanıtı önbelleğe ekler; sınır aşılırsa en eski kayıtları siler."""
+        normalized = normalize_prompt(prompt)
+        try:
+            embedding = self._embed(normalized)
+        except Exception as e:
+            logger.error(f"Semantic cache encode error: {e}")
+            return
+        with self._lock:
+            key = (scope, normalized)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (embedding, response, time.time())
+            self._matrices.pop(scope, None)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                metrics.incr(f"{self.name}.evictions")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,28 @@
+# sqlite_local.py
+#
+# SQLite tabanlı depoların (sohbetler, arama dizini, blob'lar, araştırma
+# önbelleği) ortak bağlantı yardımcısı. sqlite3 bağlantıları iş parçacıkları
+# arasında paylaşılamaz; her iş parçacığı kendi bağlantısını açar. Bağlantılar
+# otomatik işlem açmaz (işlemler açıkça BEGIN/COMMIT ile yönetilir) ve WAL
+# kipinde çalışır, böylece okuyucular yazıcıyı beklemez.
+
+import sqlite3
+import threading
+
+
+class ThreadLocalConnection:
+    """Çağrıldığında o iş parçacığına ait (gerekirse yeni açılan) bağlantıyı döndürür."""
+
+    def __init__(self, path, timeout=10):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def __call__(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,77 @@
+# streaming.py
+#
+# Akış halinde gelen model yanıtları için kısıtlanmış (throttled) görüntüleyici.
+# Parçalar bir liste tamponunda biriktirilir ve ekrana her parçada değil,
+# belirli bir süre ya da karakter sayısı dolduğunda yansıtılır.
+
+import time
+
+import context_budget
+import metrics
+
+
+class StreamRenderer:
+    """Metin parçalarını toplar ve `placeholder` içine aralıklı olarak çizer.
+
+    - `min_interval`: iki çizim arasındaki en kısa süre (saniye)
+    - `min_chars`: süre dolmasa bile çizimi tetikleyen bekleyen karakter sayısı
+    - `name`: ölçümlerin kaydedileceği önek (`<name>.ttft`, `<name>.tokens_per_second`)
+
+    `placeholder` None ise yalnızca metin biriktirilir (arayüze çizim yapılmaz).
+    """
+
+    def __init__(self, placeholder=None, min_interval=0.1, min_chars=400, name="stream", start_time=None):
+        self.placeholder = placeholder
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self.name = name
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.first_chunk_time = None
+        self.renders = 0
+        self._parts = []
+        self._rendered_parts = 0
+        self._pending_chars = 0
+        self._last_render = 0.0
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    def feed(self, chunk_text):
+        """Bir parça ekler; süre ya da boyut eşiği aşıldıysa ekranı günceller."""
+        if not chunk_text:
+            return
+        now = time.perf_counter()
+        if self.first_chunk_time is None:
+            self.first_chunk_time = now
+        self._parts.append(chunk_text)
+        self._pending_chars += len(chunk_text)
+        if self._pending_chars >= self.min_chars or now - self._last_render >= self.min_interval:
+            self.flush()
+
+    def flush(self):
+        """Bekleyen parçaları ekrana yansıtır."""
+        if self.placeholder is None or self._rendered_parts == len(self._parts):
+            return
+        self.placeholder.markdown(self.text)
+        self.renders += 1
+        self._rendered_parts = len(self._parts)
+        self._pending_chars = 0
+        self._last_render = time.perf_counter()
+
+    def finish(self):
+        """Son çizimi yapar, ilk parça süresini ve token/saniye hızını kaydeder, tam metni döndürür."""
+        self.flush()
+        text = self.text
+        if self.first_chunk_time is not None:
+            metrics.observe(f"{self.name}.ttft", self.first_chunk_time - self.start_time)
+            elapsed = time.perf_counter() - self.first_chunk_time
+            if elapsed > 0:
+                metrics.record(f"{self.name}.tokens_per_second", round(context_budget.count_text_tokens(text) / elapsed, 1))
+        return text
+
+    def consume(self, chunks):
+        """Bir parça yineleyicisini sonuna kadar tüketir ve tam metni döndürür."""
+        for chunk_text in chunks:
+            self.feed(chunk_text)
+        return self.finish()
@@ -0,0 +1,57 @@
+# summarizer.py
+#
+# Uzun sohbetler için arka planda çalışan, artımlı konuşma özeti.
+# Pencere dışında kalan eski mesajlar, önceki özetle birlikte daha ucuz bir
+# modele gönderilir; özet hiçbir zaman baştan hesaplanmaz.
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an AI assistant.\n"
+    "Update the existing summary with the new messages below. Keep names, facts, decisions, "
+    "open questions and the user's preferences; drop greetings and filler. "
+    "Write in the language of the conversation, at most {max_words} words.\n\n"
+    "Existing summary:\n{summary}\n\n"
+    "New messages:\n{transcript}\n\n"
+    "Updated summary:"
+)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="summarizer")
+
+
+def format_transcript(messages):
+    """Mesajları "rol: metin" satırlarına çevirir; görseller yer tutucuyla gösterilir."""
+    lines = []
+    for message in messages:
+        role = "User" if message["role"] == "user" else "Assistant"
+        text = " ".join(part if isinstance(part, str) else "[image]" for part in message["parts"])
+        lines.append(f"{role}: {text}")
+    return "\n".join(lines)
+
+
+def build_summary_prompt(previous_summary, messages, max_words=250):
+    """Önceki özet ve yeni mesajlardan güncelleme istemini oluşturur."""
+    return SUMMARY_PROMPT.format(
+        max_words=max_words,
+        summary=previous_summary or "(none yet)",
+        transcript=format_transcript(messages),
+    )
+
+
+def _summarize(model, prompt):
+    with metrics.timed("summary.latency"):
+        response = model.generate_content(prompt)
+    metrics.incr("summary.updates")
+    return response.text.strip()
+
+
+def summarize_async(model, previous_summary, messages, max_words=250):
+    """Özeti arka planda günceller; güncellenmiş özet metnini veren bir Future döndürür."""
+    prompt = build_summary_prompt(previous_summary, messages, max_words=max_words)
+    logger.info(f"Scheduling conversation summary update for {len(messages)} messages.")
+    return _executor.submit(_summarize, model, prompt)
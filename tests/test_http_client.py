@@ -0,0 +1,75 @@
+# tests/test_http_client.py
+#
+# Paylaşılan HTTP oturumunun bağlantı havuzu davranışı, yerel bir yedek
+# (stand-in) sunucuya karşı sınanır: havuz doluyken yeni istek sonsuza dek
+# beklemek yerine pool_timeout sonunda hata vermelidir.
+#
+# Kullanım:
+#   python -m unittest discover tests
+
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from urllib3.exceptions import EmptyPoolError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client  # noqa: E402
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    """Başlıkları hemen gönderir, gövdeyi `release` olayı tetiklenene kadar bekletir."""
+
+    release = threading.Event()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.flush()
+        self.release.wait(10)
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SaturatedPoolTest(unittest.TestCase):
+    def setUp(self):
+        _SlowHandler.release.clear()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        self.session = http_client.build_session(timeout=(1, 5), retries=0, pool_connections=1, pool_maxsize=1, pool_timeout=0.2)
+
+    def tearDown(self):
+        _SlowHandler.release.set()
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_saturated_pool_raises_instead_of_hanging(self):
+        # Tek bağlantılık havuzu, gövdesi okunmamış akış yanıtıyla doldur
+        held = self.session.get(self.url, stream=True)
+        try:
+            start = time.monotonic()
+            with self.assertRaises(EmptyPoolError):
+                self.session.get(self.url)
+            self.assertLess(time.monotonic() - start, 2)
+        finally:
+            _SlowHandler.release.set()
+            held.close()
+
+    def test_released_connection_is_reused(self):
+        _SlowHandler.release.set()
+        for _ in range(3):
+            self.assertEqual(self.session.get(self.url).content, b"ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+# vector_search.py
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "auto" seçildiğinde bu boyuttan büyük indeksler yaklaşık aramaya geçer
+AUTO_APPROXIMATE_MIN_SIZE = 50000
+
+# k-means eğitiminde bellek kullanımını sınırlamak için satır parçası boyutu
+_ASSIGN_CHUNK_ROWS = 65536
+
+
+def _top_k(scores, k):
+    """Skor dizisindeki en büyük k değerin indekslerini sıralı döndürür."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class ExactIndex:
+    """Kaba kuvvet iç çarpım araması (normalize vektörlerde kosinüs benzerliği)."""
+
+    def __init__(self, embeddings):
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def search(self, query, k=1):
+        """En benzer k vektörün (indeksler, skorlar) çiftini döndürür."""
+        scores = self.embeddings @ np.asarray(query, dtype=np.float32)
+        top = _top_k(scores, k)
+        return top, scores[top]
+
+
+class IVFIndex:
+    """Ters dosya (IVF) indeksi: vektörler küresel k-means ile kümelere ayrılır,
+    sorgu yalnızca en yakın `n_probe` kümenin içinde aranır.
+
+    `n_probe` arttıkça isabet (recall) artar, gecikme de artar; arama anında
+    değiştirilebilir.
+    """
+
+    def __init__(self, embeddings, n_lists=None, n_probe=8, n_iter=10, train_size=None, seed=0):
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        n = len(embeddings)
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(n)))
+        self.n_lists = min(n_lists, n)
+        self.n_probe = n_probe
+        if n == 0:
+            # Boş indeks: eğitilecek nokta yok; arama boş sonuç döndürür
+            self.centroids = np.empty((0, embeddings.shape[1] if embeddings.ndim == 2 else 0), dtype=np.float32)
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._vectors = embeddings
+            self._ids = np.empty(0, dtype=np.int64)
+            return
+
+        rng = np.random.default_rng(seed)
+        if train_size is None:
+            train_size = min(n, 64 * self.n_lists)
+        train = embeddings[rng.choice(n, size=train_size, replace=False)] if train_size < n else embeddings
+        self.centroids = self._train(train, n_iter, rng)
+
+        assignments = self._assign(embeddings)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=self.n_lists)
+        self._offsets = np.concatenate(([0], np.cumsum(counts)))
+        self._vectors = embeddings[order]
+        self._ids = order
+        logger.info(f"IVF index built: {n} vectors, {self.n_lists} lists.")
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _assign(self, vectors):
+        """Her vektörü en yakın merkeze atar (parça parça, bellek dostu)."""
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), _ASSIGN_CHUNK_ROWS):
+            chunk = vectors[start:start + _ASSIGN_CHUNK_ROWS]
+            assignments[start:start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignments
+
+    def _train(self, train, n_iter, rng):
+        """Küresel k-means: merkezler her adımda yeniden normalize edilir."""
+        self.centroids = train[rng.choice(len(train), size=self.n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assignments = self._assign(train)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assignments, train)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Boş kalan kümeleri rastgele noktalarla yeniden başlat
+            if empty.any():
+                sums[empty] = train[rng.choice(len(train), size=int(empty.sum()))]
+                norms[empty] = np.linalg.norm(sums[empty], axis=1, keepdims=True)
+            self.centroids = sums / norms
+        return self.centroids
+
+    def search(self, query, k=1, n_probe=None):
+        """En benzer k vektörün (indeksler, skorlar) çiftini döndürür."""
+        query = np.asarray(query, dtype=np.float32)
+        if len(self._ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probe = _top_k(self.centroids @ query, n_probe)
+
+        ranges = [(self._offsets[c], self._offsets[c + 1]) for c in probe]
+        positions = np.concatenate([np.arange(a, b) for a, b in ranges]) if ranges else np.empty(0, dtype=np.int64)
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self._vectors[positions] @ query
+        top = _top_k(scores, k)
+        return self._ids[positions[top]], scores[top]
+
+
+BACKENDS = {
+    "exact": ExactIndex,
+    "ivf": IVFIndex,
+}
+
+
+def build_index(embeddings, backend="auto", **options):
+    """Verilen gömmeler için bir arama indeksi oluşturur.
+
+    `backend` "exact", "ivf" ya da "auto" olabilir; "auto" küçük indekslerde
+    tam aramayı, büyüklerde IVF'i seçer. Ek seçenekler arka uca iletilir.
+    """
+    if backend == "auto":
+        backend = "ivf" if len(embeddings) >= AUTO_APPROXIMATE_MIN_SIZE else "exact"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector search backend: {backend}")
+    return BACKENDS[backend](embeddings, **options)
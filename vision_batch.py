@@ -0,0 +1,61 @@
+# vision_batch.py
+#
+# Birden çok görseli Gemini'nin asenkron API'siyle eşzamanlı analiz eden katman.
+# İstekler arka planda sürekli çalışan tek bir olay döngüsünde (event loop)
+# yürütülür; eşzamanlılık bir semafor ile sınırlanır. Her görsel için bir
+# concurrent.futures.Future döndürülür, böylece çağıran taraf sonuçları
+# bittikleri sırayla (`as_completed`) işleyebilir.
+
+import asyncio
+import logging
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    """Arka plan olay döngüsünü döndürür (ilk çağrıda başlatılır).
+
+    Asenkron istemciler oluşturuldukları döngüye bağlı kaldığından her toplu
+    işlemde yeni döngü açmak yerine aynı döngü yeniden kullanılır.
+    """
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="vision-batch-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+async def _make_semaphore(limit):
+    return asyncio.Semaphore(limit)
+
+
+async def _analyze(model, image_part, prompt, semaphore):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            response = await model.generate_content_async([image_part, prompt])
+            return response.text
+        finally:
+            metrics.observe("vision_batch.latency", time.perf_counter() - start)
+
+
+def analyze_images(model, image_parts, prompt, max_concurrency=4):
+    """Her görsel için `prompt` ile bir analiz isteği başlatır; giriş sırasıyla Future listesi döndürür.
+
+    `image_parts` Gemini'nin kabul ettiği parçalardır (ör. {"mime_type": ..., "data": ...}).
+    En fazla `max_concurrency` istek aynı anda çalışır.
+    """
+    loop = _get_loop()
+    semaphore = asyncio.run_coroutine_threadsafe(_make_semaphore(max_concurrency), loop).result()
+    metrics.incr("vision_batch.images", len(image_parts))
+    return [asyncio.run_coroutine_threadsafe(_analyze(model, part, prompt, semaphore), loop) for part in image_parts]
@@ -0,0 +1,102 @@
+# vision_cache.py
+#
+# Görsel analiz yanıtları için algısal özet (dHash) tabanlı önbellek. Aynı ya da
+# neredeyse aynı görsel (ör. yeniden alınmış bir ekran görüntüsü) aynı istem ve
+# dille tekrar yüklendiğinde model çağrısı yapılmadan önceki yanıt döndürülür.
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+from semantic_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8 # 8x8 karşılaştırma -> 64 bitlik özet
+
+
+def dhash(image, hash_size=HASH_SIZE):
+    """Görselin fark özetini (dHash) tamsayı olarak döndürür.
+
+    Görsel gri tonlamalı (hash_size + 1) x hash_size boyuta küçültülür ve her
+    pikselin sağ komşusundan parlak olup olmadığı bir bit olarak yazılır.
+    Yeniden boyutlandırma ve yeniden kodlama özeti çok az değiştirir.
+    """
+    from PIL import Image
+
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class VisionAnswerCache:
+    """Algısal özet + istem + kapsam (dil, model ayarları) ile anahtarlanan yanıt önbelleği.
+
+    - `threshold`: isabet için izin verilen en büyük Hamming uzaklığı (64 bit üzerinden)
+    - `ttl`: bir yanıtın geçerli kaldığı süre (saniye)
+    - `max_entries`: kayıt sınırı; aşıldığında en az kullanılan silinir (LRU)
+    """
+
+    def __init__(self, threshold=6, ttl=24 * 3600, max_entries=1000, name="vision_cache"):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (kapsam, normalize istem, özet) -> (yanıt, oluşturulma zamanı)
+
+    def lookup(self, image_hash, prompt, scope, record_metrics=True):
+        """En yakın özeti eşik içindeyse ve süresi dolmamışsa onun yanıtını döndürür, yoksa None.
+
+        `record_metrics=False` isabet/ıska sayacını artırmaz; aynı görsel için birden çok
+        kapsam yoklanıyorsa sonucu çağıran tek bir kez sayar.
+        """
+        if image_hash is None:
+            return None
+        normalized = normalize_prompt(prompt)
+        now = time.time()
+        with self._lock:
+            best_key, best_distance = None, self.threshold + 1
+            for key, (_, created) in list(self._entries.items()):
+                if key[0] != scope or key[1] != normalized:
+                    continue
+                if now - created > self.ttl:
+                    del self._entries[key]
+                    metrics.incr(f"{self.name}.expired")
+                    continue
+                distance = hamming_distance(key[2], image_hash)
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+            if best_key is None:
+                if record_metrics:
+                    metrics.incr(f"{self.name}.misses")
+                return None
+            self._entries.move_to_end(best_key)
+            answer = self._entries[best_key][0]
+        if record_metrics:
+            metrics.incr(f"{self.name}.hits")
+        logger.info(f"Vision cache hit (Hamming distance {best_distance}).")
+        return answer
+
+    def store(self, image_hash, prompt, scope, answer):
+        """Yanıtı kaydeder; sınır aşılırsa en eski kayıtları siler."""
+        if image_hash is None or not answer:
+            return
+        with self._lock:
+            key = (scope, normalize_prompt(prompt), image_hash)
+            self._entries[key] = (answer, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.incr(f"{self.name}.evictions")